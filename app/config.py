@@ -10,6 +10,70 @@ AWS_ACCESS_KEY = os.getenv('AWS_ACCESS_KEY')
 AWS_SECRET_KEY = os.getenv('AWS_SECRET_KEY')
 AWS_BUCKET_NAME = os.getenv('AWS_BUCKET_NAME')
 AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
+AWS_TRANSFER_MAX_WORKERS = int(os.getenv('AWS_TRANSFER_MAX_WORKERS', '8'))
+UPLOAD_MAX_SIZE = int(os.getenv('UPLOAD_MAX_SIZE', str(100 * 1024 * 1024)))
+PRESIGNED_URL_EXPIRATION = int(os.getenv('PRESIGNED_URL_EXPIRATION', '900'))
+PRESIGNED_DOWNLOAD_EXPIRATION = int(os.getenv('PRESIGNED_DOWNLOAD_EXPIRATION', '300'))
+PRESIGNED_DOWNLOAD_CACHE_SIZE = int(os.getenv('PRESIGNED_DOWNLOAD_CACHE_SIZE', '10000'))
+DOWNLOAD_CHUNK_SIZE = int(os.getenv('DOWNLOAD_CHUNK_SIZE', str(256 * 1024)))
+DOWNLOAD_READ_AHEAD_CHUNKS = int(os.getenv('DOWNLOAD_READ_AHEAD_CHUNKS', '4'))
+UPLOAD_SPOOL_MAX_SIZE = int(os.getenv('UPLOAD_SPOOL_MAX_SIZE', str(1024 * 1024)))
+UPLOAD_REQUEST_MAX_SIZE = int(os.getenv('UPLOAD_REQUEST_MAX_SIZE', str(UPLOAD_MAX_SIZE)))
+UPLOAD_INFLIGHT_BUDGET = int(os.getenv('UPLOAD_INFLIGHT_BUDGET', str(512 * 1024 * 1024)))
+UPLOAD_BUDGET_WAIT = float(os.getenv('UPLOAD_BUDGET_WAIT', '10'))
+UPLOAD_CONCURRENCY_LIMIT = int(os.getenv('UPLOAD_CONCURRENCY_LIMIT', '32'))
+UPLOAD_PER_USER_CONCURRENCY = int(os.getenv('UPLOAD_PER_USER_CONCURRENCY', '4'))
+UPLOAD_QUEUE_SIZE = int(os.getenv('UPLOAD_QUEUE_SIZE', '128'))
+UPLOAD_CHUNK_MIN_SIZE = int(os.getenv('UPLOAD_CHUNK_MIN_SIZE', str(5 * 1024 * 1024)))
+UPLOAD_CHUNK_MAX_SIZE = int(os.getenv('UPLOAD_CHUNK_MAX_SIZE', str(64 * 1024 * 1024)))
+UPLOAD_SESSION_TTL = int(os.getenv('UPLOAD_SESSION_TTL', str(24 * 3600)))
+UPLOAD_SESSION_SWEEP_BATCH_SIZE = int(os.getenv('UPLOAD_SESSION_SWEEP_BATCH_SIZE', '100'))
+UPLOAD_SESSION_SWEEP_INTERVAL = float(os.getenv('UPLOAD_SESSION_SWEEP_INTERVAL', '300'))
+BULK_DELETE_MAX_IDS = int(os.getenv('BULK_DELETE_MAX_IDS', '5000'))
+UPLOAD_BATCH_MAX_FILES = int(os.getenv('UPLOAD_BATCH_MAX_FILES', '200'))
+UPLOAD_BATCH_CONCURRENCY = int(os.getenv('UPLOAD_BATCH_CONCURRENCY', '4'))
+DELETION_BATCH_SIZE = int(os.getenv('DELETION_BATCH_SIZE', '1000'))
+DELETION_POLL_INTERVAL = float(os.getenv('DELETION_POLL_INTERVAL', '5'))
+DELETION_BASE_BACKOFF = int(os.getenv('DELETION_BASE_BACKOFF', '10'))
+DELETION_MAX_BACKOFF = int(os.getenv('DELETION_MAX_BACKOFF', '3600'))
+DOCUMENT_VERSIONS_KEEP = int(os.getenv('DOCUMENT_VERSIONS_KEEP', '20'))
+DOCUMENT_VERSIONS_MAX_AGE_DAYS = int(os.getenv('DOCUMENT_VERSIONS_MAX_AGE_DAYS', '0'))
+VERSION_PRUNE_BATCH_SIZE = int(os.getenv('VERSION_PRUNE_BATCH_SIZE', '500'))
+VERSION_PRUNE_INTERVAL = float(os.getenv('VERSION_PRUNE_INTERVAL', '300'))
+METADATA_BACKFILL_BATCH_SIZE = int(os.getenv('METADATA_BACKFILL_BATCH_SIZE', '200'))
+METADATA_BACKFILL_CONCURRENCY = int(os.getenv('METADATA_BACKFILL_CONCURRENCY', '8'))
+METADATA_BACKFILL_RATE = float(os.getenv('METADATA_BACKFILL_RATE', '50'))
+PREVIEW_SIZE = int(os.getenv('PREVIEW_SIZE', '256'))
+PREVIEW_PROCESS_WORKERS = int(os.getenv('PREVIEW_PROCESS_WORKERS', str(os.cpu_count() or 1)))
+PREVIEW_CONCURRENCY = int(os.getenv('PREVIEW_CONCURRENCY', '4'))
+PREVIEW_BATCH_SIZE = int(os.getenv('PREVIEW_BATCH_SIZE', '16'))
+PREVIEW_MAX_SOURCE_SIZE = int(os.getenv('PREVIEW_MAX_SOURCE_SIZE', str(50 * 1024 * 1024)))
+PREVIEW_POLL_INTERVAL = float(os.getenv('PREVIEW_POLL_INTERVAL', '2'))
+STORAGE_COMPRESSION = os.getenv('STORAGE_COMPRESSION', 'zstd').lower()
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '4096'))
+COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', '3'))
+SEARCH_LANGUAGE = os.getenv('SEARCH_LANGUAGE', 'english')
+SEARCH_PROCESS_WORKERS = int(os.getenv('SEARCH_PROCESS_WORKERS', str(os.cpu_count() or 1)))
+SEARCH_CONCURRENCY = int(os.getenv('SEARCH_CONCURRENCY', '4'))
+SEARCH_BATCH_SIZE = int(os.getenv('SEARCH_BATCH_SIZE', '16'))
+SEARCH_MAX_SOURCE_SIZE = int(os.getenv('SEARCH_MAX_SOURCE_SIZE', str(20 * 1024 * 1024)))
+SEARCH_MAX_TEXT_SIZE = int(os.getenv('SEARCH_MAX_TEXT_SIZE', str(512 * 1024)))
+SEARCH_POLL_INTERVAL = float(os.getenv('SEARCH_POLL_INTERVAL', '2'))
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 's3').lower()
+LOCAL_STORAGE_ROOT = os.getenv('LOCAL_STORAGE_ROOT', 'storage')
+LOCAL_STORAGE_BASE_URL = os.getenv('LOCAL_STORAGE_BASE_URL', '/storage')
+PROJECT_MAX_DOCUMENTS = int(os.getenv('PROJECT_MAX_DOCUMENTS', '0'))
+PROJECT_MAX_BYTES = int(os.getenv('PROJECT_MAX_BYTES', '0'))
+QUOTA_RESERVATION_TTL = int(os.getenv('QUOTA_RESERVATION_TTL', '3600'))
+EVENTS_RETENTION = int(os.getenv('EVENTS_RETENTION', str(24 * 3600)))
+EVENTS_PRUNE_INTERVAL = float(os.getenv('EVENTS_PRUNE_INTERVAL', '300'))
+EVENTS_PRUNE_BATCH_SIZE = int(os.getenv('EVENTS_PRUNE_BATCH_SIZE', '5000'))
+EVENTS_REPLAY_LIMIT = int(os.getenv('EVENTS_REPLAY_LIMIT', '1000'))
+EVENTS_KEEPALIVE_INTERVAL = float(os.getenv('EVENTS_KEEPALIVE_INTERVAL', '15'))
+EVENTS_SUBSCRIBER_QUEUE_SIZE = int(os.getenv('EVENTS_SUBSCRIBER_QUEUE_SIZE', '256'))
+EVENTS_LISTENER_RETRY = float(os.getenv('EVENTS_LISTENER_RETRY', '5'))
+TAG_MAX_LENGTH = int(os.getenv('TAG_MAX_LENGTH', '64'))
+TAGS_BULK_MAX_IDS = int(os.getenv('TAGS_BULK_MAX_IDS', '5000'))
 INIT_DB_METHOD = os.getenv("INIT_DB_METHOD", "ORM")
 
 
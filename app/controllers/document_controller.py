@@ -1,10 +1,71 @@
-from fastapi import HTTPException, File
+from fastapi import HTTPException, File, Response
+from fastapi.responses import RedirectResponse, StreamingResponse
+from urllib.parse import quote
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user_model import User
 from app.crud import document_crud as crud_document
-from app.crud import user_project_crud as crud_user_project
-from app.schemas.document_schema import DocumentUpdate
-from app.crud.aws_crud import delete_file_from_s3, upload_file_to_s3
+from app.crud import blob_crud as crud_blob
+from app.crud import storage_deletion_crud as crud_deletion
+from app.crud import document_version_crud as crud_version
+from app.crud import project_usage_crud as crud_usage
+from app.schemas.document_schema import (
+    DocumentTransfer,
+    DocumentUpdate,
+    RecentDocumentsQuery,
+)
+from app.services.compression import accepts_encoding, decompress_stream
+from app.services.previews import initial_preview_status
+from app.services.storage_backend import InvalidRangeError
+from app.services.text_extraction import initial_search_status
+from app.crud.aws_crud import (
+    build_project_object_key,
+    copy_file,
+    create_presigned_download,
+    iter_file_stream,
+    open_file_stream,
+    parse_range_header,
+    preview_object_key,
+)
+
+
+async def get_recent_documents(
+    query: RecentDocumentsQuery, response: Response, user: User, db: AsyncSession
+):
+    """List the newest documents across all projects the authenticated user is a member of.
+
+    Documents are returned newest first. When more documents may follow, the
+    cursor for the next page is sent in the ``X-Next-Cursor`` response header.
+
+    Args:
+        query: Cursor and page size.
+        response: Response whose headers receive the next-page cursor.
+        user: Authenticated user requesting the documents.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        documents: The page of documents, each with its project ID.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed; 500 on unexpected errors.
+    """
+    try:
+        after = crud_document.decode_document_cursor(query.cursor) if query.cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        documents = await crud_document.get_recent_documents_for_user(
+            db, user.id, after=after, limit=query.limit + 1
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to retrieve recent documents: {str(e)}"
+        )
+    if len(documents) > query.limit:
+        documents = documents[:query.limit]
+        response.headers["X-Next-Cursor"] = crud_document.encode_document_cursor(
+            documents[-1]
+        )
+    return documents
 
 
 async def get_document(
@@ -26,14 +87,10 @@ async def get_document(
         HTTPException: 404 if the document does not exist or does not belong to the user; 500 on unexpected errors.
     """
     try:
-        db_document = await crud_document.get_document_by_id(db, document_id)
-        if not db_document:
-            raise HTTPException(status_code=404, detail="Document not found")
-        db_user_project = await crud_user_project.is_project_from_user(
-            db, user.id, db_document.project_id
-        )
-        if not db_user_project:
+        result = await crud_document.get_document_for_user(db, document_id, user.id)
+        if not result:
             raise HTTPException(status_code=404, detail="Document not found")
+        db_document, _ = result
     except HTTPException:
         raise
     except Exception as e:
@@ -43,6 +100,173 @@ async def get_document(
     return db_document
 
 
+async def download_document(
+    document_id: int,
+    user: User,
+    db: AsyncSession,
+    accept_encoding: str | None = None,
+):
+    """Redirect to a short-lived presigned URL for the document's stored file.
+
+    Compressed files are only handed out directly to clients that accept their
+    encoding; other clients are sent to the streaming endpoint, which decodes them.
+
+    Args:
+        document_id: ID of the document to download.
+        user: Authenticated user requesting the download.
+        db: Async SQLAlchemy session used for database access.
+        accept_encoding: Optional Accept-Encoding header sent by the client.
+
+    Returns:
+        response: A 302 redirect to the presigned URL, cacheable by the client while the URL is reusable,
+        or to the document's content endpoint.
+
+    Raises:
+        HTTPException: 404 if the document does not exist or does not belong to the user; 500 on unexpected errors.
+    """
+    try:
+        result = await crud_document.get_document_for_user(db, document_id, user.id)
+        if not result:
+            raise HTTPException(status_code=404, detail="Document not found")
+        db_document, _ = result
+        encoding = db_document.content_encoding
+        if encoding and not accepts_encoding(accept_encoding, encoding):
+            return RedirectResponse(
+                f"/document/{document_id}/content",
+                status_code=302,
+                headers={"Vary": "Accept-Encoding"},
+            )
+        url, max_age = create_presigned_download(db_document.object_key)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to download document: {str(e)}"
+        )
+    headers = {"Cache-Control": f"private, max-age={max_age}"}
+    if db_document.content_encoding:
+        headers["Vary"] = "Accept-Encoding"
+    return RedirectResponse(url, status_code=302, headers=headers)
+
+
+async def preview_document(
+    document_id: int,
+    user: User,
+    db: AsyncSession,
+):
+    """Redirect to a short-lived presigned URL for the document's preview image.
+
+    Args:
+        document_id: ID of the document whose preview is requested.
+        user: Authenticated user requesting the preview.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        response: A 302 redirect to the presigned preview URL, cacheable by the client while the URL is reusable.
+
+    Raises:
+        HTTPException: 404 if the document does not exist, does not belong to the user or has no
+        preview yet; 500 on unexpected errors.
+    """
+    try:
+        result = await crud_document.get_document_for_user(db, document_id, user.id)
+        if not result:
+            raise HTTPException(status_code=404, detail="Document not found")
+        db_document, _ = result
+        if db_document.preview_status != "ready":
+            raise HTTPException(status_code=404, detail="Preview not available")
+        url, max_age = create_presigned_download(
+            preview_object_key(db_document.object_key)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to download preview: {str(e)}"
+        )
+    return RedirectResponse(
+        url, status_code=302, headers={"Cache-Control": f"private, max-age={max_age}"}
+    )
+
+
+async def stream_document(
+    document_id: int,
+    range_header: str | None,
+    if_range: str | None,
+    user: User,
+    db: AsyncSession,
+    accept_encoding: str | None = None,
+):
+    """Stream the document's stored file through the API, honoring Range and If-Range.
+
+    Compressed files are sent as stored with a Content-Encoding header when the
+    client accepts it; otherwise they are decompressed on the fly, without
+    length, range or ETag headers since those describe the stored bytes.
+
+    Args:
+        document_id: ID of the document to stream.
+        range_header: Optional Range header sent by the client.
+        if_range: Optional If-Range header sent by the client.
+        user: Authenticated user requesting the file.
+        db: Async SQLAlchemy session used for database access.
+        accept_encoding: Optional Accept-Encoding header sent by the client.
+
+    Returns:
+        response: A 200 (full) or 206 (partial) streaming response with length, ETag and range headers.
+
+    Raises:
+        HTTPException: 404 if the document or its file does not exist or does not belong to the user;
+        416 if the range cannot be satisfied; 500 on unexpected errors.
+    """
+    try:
+        result = await crud_document.get_document_for_user(db, document_id, user.id)
+        if not result:
+            raise HTTPException(status_code=404, detail="Document not found")
+        db_document, _ = result
+        encoding = db_document.content_encoding
+        decode = bool(encoding) and not accepts_encoding(accept_encoding, encoding)
+        if decode:
+            range_header = None
+        stream = await open_file_stream(
+            db_document.object_key, parse_range_header(range_header), if_range
+        )
+        if not stream:
+            raise HTTPException(status_code=404, detail="Document file not found")
+    except InvalidRangeError:
+        raise HTTPException(status_code=416, detail="Requested range not satisfiable")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to stream document: {str(e)}"
+        )
+    disposition = f"inline; filename*=UTF-8''{quote(db_document.name)}"
+    if decode:
+        return StreamingResponse(
+            decompress_stream(iter_file_stream(stream["body"])),
+            media_type=stream["content_type"],
+            headers={"Content-Disposition": disposition, "Vary": "Accept-Encoding"},
+        )
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(stream["content_length"]),
+        "Content-Disposition": disposition,
+    }
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        headers["Vary"] = "Accept-Encoding"
+    if stream["etag"]:
+        headers["ETag"] = stream["etag"]
+    if stream["content_range"]:
+        headers["Content-Range"] = stream["content_range"]
+    return StreamingResponse(
+        iter_file_stream(stream["body"]),
+        status_code=206 if stream["content_range"] else 200,
+        media_type=stream["content_type"],
+        headers=headers,
+    )
+
+
 async def update_document(
     document_id: int,
     file: File,
@@ -51,6 +275,10 @@ async def update_document(
 ):
     """Return the updated document after replacing its stored file and metadata.
 
+    The new file is stored before the row changes, so the document always
+    references a live object. The previous name and file are kept as a past
+    version, archived in the same transaction as the row update.
+
     Args:
         document_id: ID of the document to update.
         file: Uploaded file used to replace the existing document content.
@@ -58,29 +286,280 @@ async def update_document(
         db: Async SQLAlchemy session used for database access.
 
     Returns:
-        db_document: The updated document instance with new name and URL.
+        db_document: The updated document instance with new name, object key and version.
+
+    Raises:
+        HTTPException: 404 if the document does not exist or does not belong to the user;
+        507 if the larger file does not fit in the project quota; 500 on unexpected errors.
+    """
+    try:
+        result = await crud_document.get_document_for_user(db, document_id, user.id)
+        if not result:
+            raise HTTPException(status_code=404, detail="Document not found")
+        db_document, _ = result
+        growth = crud_blob.upload_size(file) - (db_document.size or 0)
+        reservation_id = await crud_usage.reserve_usage(
+            db, db_document.project_id, 0, max(growth, 0)
+        )
+        try:
+            stored = await crud_blob.store_file(db, file)
+            await crud_version.archive_document(db, db_document)
+            document = DocumentUpdate(
+                name=file.filename,
+                object_key=stored["object_key"],
+                content_type=stored["content_type"],
+                size=stored["size"],
+                checksum=stored["checksum"],
+                content_encoding=stored["content_encoding"],
+                preview_status=initial_preview_status(stored["content_type"]),
+                search_status=initial_search_status(stored["content_type"]),
+                version=db_document.version + 1,
+            )
+            db_document = await crud_document.update_document(
+                db, document_id, document, reservation_id=reservation_id
+            )
+        except Exception:
+            await crud_usage.release_reservation(db, reservation_id)
+            raise
+    except HTTPException:
+        raise
+    except crud_usage.QuotaExceededError as e:
+        raise HTTPException(status_code=507, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to update document: {str(e)}"
+        )
+    return db_document
+
+
+async def get_document_versions(
+    document_id: int,
+    before: int | None,
+    limit: int,
+    user: User,
+    db: AsyncSession,
+):
+    """Return a page of the document's past versions, newest first.
+
+    Args:
+        document_id: ID of the document whose history is requested.
+        before: Optional version ID to continue after (the last ID of the previous page).
+        limit: Maximum number of versions to return.
+        user: Authenticated user requesting the history.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        versions: The list of past versions for the page.
 
     Raises:
         HTTPException: 404 if the document does not exist or does not belong to the user; 500 on unexpected errors.
     """
     try:
-        db_document = await crud_document.get_document_by_id(db, document_id)
-        if not db_document:
+        result = await crud_document.get_document_for_user(db, document_id, user.id)
+        if not result:
             raise HTTPException(status_code=404, detail="Document not found")
-        db_user_project = await crud_user_project.is_project_from_user(
-            db, user.id, db_document.project_id
+        db_document, _ = result
+        versions = await crud_version.get_document_versions(
+            db, document_id, before, limit
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to retrieve document versions: {str(e)}"
         )
-        if not db_user_project:
+    return versions
+
+
+async def restore_document_version(
+    document_id: int,
+    version_id: int,
+    user: User,
+    db: AsyncSession,
+):
+    """Make a past version current again, archiving the current one.
+
+    The restored version stays in the history. Content-addressed objects are
+    shared by adding a reference; objects owned by a single version are
+    copied server-side so every row keeps its own object.
+
+    Args:
+        document_id: ID of the document to restore.
+        version_id: ID of the version to restore.
+        user: Authenticated user requesting the restore.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        db_document: The updated document instance.
+
+    Raises:
+        HTTPException: 404 if the document or version does not exist or does not belong to the user;
+        507 if the restored file does not fit in the project quota; 500 on unexpected errors.
+    """
+    try:
+        result = await crud_document.get_document_for_user(db, document_id, user.id)
+        if not result:
             raise HTTPException(status_code=404, detail="Document not found")
-        await delete_file_from_s3(db_document.url)
-        url = await upload_file_to_s3(file)
-        document = DocumentUpdate(name=file.filename, url=url)
+        db_document, _ = result
+        db_version = await crud_version.get_document_version(db, document_id, version_id)
+        if not db_version:
+            raise HTTPException(status_code=404, detail="Version not found")
+        await crud_usage.check_quota(
+            db,
+            db_document.project_id,
+            0,
+            max((db_version.size or 0) - (db_document.size or 0), 0),
+        )
+        object_key = db_version.object_key
+        if not await crud_blob.retain_blob(db, object_key):
+            object_key = await copy_file(
+                object_key,
+                build_project_object_key(db_document.project_id, db_version.name),
+            )
+        await crud_version.archive_document(db, db_document)
+        document = DocumentUpdate(
+            name=db_version.name,
+            object_key=object_key,
+            content_type=db_version.content_type,
+            size=db_version.size,
+            checksum=db_version.checksum,
+            content_encoding=db_version.content_encoding,
+            preview_status=initial_preview_status(db_version.content_type),
+            search_status=initial_search_status(db_version.content_type),
+            version=db_document.version + 1,
+        )
         db_document = await crud_document.update_document(db, document_id, document)
     except HTTPException:
         raise
+    except crud_usage.QuotaExceededError as e:
+        raise HTTPException(status_code=507, detail=str(e))
     except Exception as e:
         raise HTTPException(
-            status_code=500, detail=f"Failed to update document: {str(e)}"
+            status_code=500, detail=f"Failed to restore document version: {str(e)}"
+        )
+    return db_document
+
+
+async def move_document(
+    document_id: int,
+    transfer: DocumentTransfer,
+    user: User,
+    db: AsyncSession,
+):
+    """Move a document to another project without touching its file.
+
+    Only the document's project changes; its object key and version history
+    stay as they are.
+
+    Args:
+        document_id: ID of the document to move.
+        transfer: Payload with the destination project ID.
+        user: Authenticated user requesting the move.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        db_document: The moved document instance.
+
+    Raises:
+        HTTPException: 404 if the document or destination project does not exist or does not belong to the user;
+        507 if the document does not fit in the destination project's quota; 500 on unexpected errors.
+    """
+    try:
+        result = await crud_document.get_document_for_transfer(
+            db, document_id, user.id, transfer.project_id
+        )
+        if not result:
+            raise HTTPException(status_code=404, detail="Document not found")
+        db_document, is_destination_member = result
+        if not is_destination_member:
+            raise HTTPException(status_code=404, detail="Project not found")
+        if transfer.project_id == db_document.project_id:
+            return db_document
+        # Both counters change; locking them in a fixed order up front keeps
+        # opposite moves from deadlocking
+        await crud_usage.lock_project_usages(
+            db, [db_document.project_id, transfer.project_id]
+        )
+        await crud_usage.check_quota(
+            db, transfer.project_id, 1, db_document.size or 0
+        )
+        db_document = await crud_document.move_document(
+            db, document_id, transfer.project_id
+        )
+    except HTTPException:
+        raise
+    except crud_usage.QuotaExceededError as e:
+        raise HTTPException(status_code=507, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to move document: {str(e)}"
+        )
+    return db_document
+
+
+async def copy_document(
+    document_id: int,
+    transfer: DocumentTransfer,
+    user: User,
+    db: AsyncSession,
+):
+    """Copy a document into another project without streaming its file through the API.
+
+    Content-addressed objects are shared by adding a reference; objects owned
+    by a single document are copied server-side. Version history is not copied.
+
+    Args:
+        document_id: ID of the document to copy.
+        transfer: Payload with the destination project ID.
+        user: Authenticated user requesting the copy.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        db_document: The new document instance in the destination project.
+
+    Raises:
+        HTTPException: 404 if the document or destination project does not exist or does not belong to the user;
+        507 if the document does not fit in the destination project's quota; 500 on unexpected errors.
+    """
+    try:
+        result = await crud_document.get_document_for_transfer(
+            db, document_id, user.id, transfer.project_id
+        )
+        if not result:
+            raise HTTPException(status_code=404, detail="Document not found")
+        db_document, is_destination_member = result
+        if not is_destination_member:
+            raise HTTPException(status_code=404, detail="Project not found")
+        await crud_usage.check_quota(
+            db, transfer.project_id, 1, db_document.size or 0
+        )
+        object_key = db_document.object_key
+        preview_status = db_document.preview_status
+        if not await crud_blob.retain_blob(db, object_key):
+            object_key = await copy_file(
+                object_key,
+                build_project_object_key(transfer.project_id, db_document.name),
+            )
+            preview_status = initial_preview_status(db_document.content_type)
+        db_document = await crud_document.create_document(
+            db,
+            transfer.project_id,
+            db_document.name,
+            object_key,
+            content_type=db_document.content_type,
+            size=db_document.size,
+            checksum=db_document.checksum,
+            preview_status=preview_status,
+            content_encoding=db_document.content_encoding,
+            search_status=initial_search_status(db_document.content_type),
+        )
+    except HTTPException:
+        raise
+    except crud_usage.QuotaExceededError as e:
+        raise HTTPException(status_code=507, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to copy document: {str(e)}"
         )
     return db_document
 
@@ -90,7 +569,10 @@ async def delete_document(
     user: User,
     db: AsyncSession,
 ):
-    """Delete a document and its associated file from storage.
+    """Delete a document and its history, and queue their files for deletion from storage.
+
+    The queue entries are committed together with the row delete; the files
+    themselves are removed later by the storage deletion worker.
 
     Args:
         document_id: ID of the document to delete.
@@ -104,15 +586,16 @@ async def delete_document(
         HTTPException: 404 if the document does not exist or does not belong to the user; 500 on unexpected errors.
     """
     try:
-        db_document = await crud_document.get_document_by_id(db, document_id)
-        if not db_document:
-            raise HTTPException(status_code=404, detail="Document not found")
-        db_user_project = await crud_user_project.is_project_from_user(
-            db, user.id, db_document.project_id
-        )
-        if not db_user_project:
+        result = await crud_document.get_document_for_user(db, document_id, user.id)
+        if not result:
             raise HTTPException(status_code=404, detail="Document not found")
-        await delete_file_from_s3(db_document.url)
+        db_document, _ = result
+        object_keys = [
+            db_document.object_key,
+            *await crud_version.get_document_version_keys(db, document_id),
+        ]
+        unreferenced = await crud_blob.release_blobs(db, object_keys)
+        await crud_deletion.enqueue_deletions(db, unreferenced)
         await crud_document.delete_document(db, document_id)
     except HTTPException:
         raise
@@ -0,0 +1,107 @@
+import asyncio
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import EVENTS_KEEPALIVE_INTERVAL, EVENTS_REPLAY_LIMIT
+from app.crud import project_event_crud as crud_events
+from app.crud import user_project_crud as crud_user_project
+from app.models.user_model import User
+from app.services.project_events import Subscription, format_event, project_event_hub
+
+# Tells the client its view is stale (events were pruned or too many were
+# missed) and it should reload the document list instead of replaying.
+RESET_MESSAGE = "event: reset\ndata: {}\n\n"
+
+
+async def event_stream(subscription: Subscription, replay: list, reset: bool):
+    """Yield SSE messages: a reset or the missed events, then live events until the client leaves.
+
+    Args:
+        subscription: Subscription to the project's live events, opened before the replay was loaded.
+        replay: Events recorded after the client's Last-Event-ID.
+        reset: Whether the client must reload instead of replaying.
+
+    Yields:
+        message: Server-Sent Events messages and keep-alive comments.
+    """
+    try:
+        if reset:
+            yield RESET_MESSAGE
+        replayed = {event.id for event in replay}
+        for event in replay:
+            yield format_event(event)
+        while True:
+            if subscription.lagged and subscription.queue.empty():
+                # Events were dropped; the client reconnects with its Last-Event-ID
+                return
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), EVENTS_KEEPALIVE_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event.id not in replayed:
+                yield format_event(event)
+    finally:
+        project_event_hub.unsubscribe(subscription)
+
+
+async def stream_project_events(
+    project_id: int, last_event_id: int | None, user: User, db: AsyncSession
+):
+    """Open a Server-Sent Events stream of a project's document and membership changes.
+
+    The subscription is taken before missed events are loaded, so nothing
+    falls between the replay and the live stream. The database session is
+    released before streaming starts; live events come from the shared
+    listener of this worker.
+
+    Args:
+        project_id: ID of the project to follow.
+        last_event_id: ID of the last event the client received, from the Last-Event-ID header.
+        user: Authenticated user following the project.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        response: A ``text/event-stream`` streaming response.
+
+    Raises:
+        HTTPException: 404 if the project is not found for the user; 500 on unexpected errors.
+    """
+    try:
+        db_user_project = await crud_user_project.is_project_from_user(
+            db, user.id, project_id
+        )
+        if not db_user_project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        subscription = project_event_hub.subscribe(project_id)
+        try:
+            replay = []
+            reset = False
+            if last_event_id is not None:
+                oldest_id = await crud_events.get_oldest_event_id(db)
+                if oldest_id is None or last_event_id < oldest_id - 1:
+                    # Events after last_event_id may have been pruned
+                    reset = True
+                else:
+                    replay = await crud_events.get_project_events_after(
+                        db, project_id, last_event_id, EVENTS_REPLAY_LIMIT + 1
+                    )
+                    if len(replay) > EVENTS_REPLAY_LIMIT:
+                        replay, reset = [], True
+            await db.close()
+        except Exception:
+            project_event_hub.unsubscribe(subscription)
+            raise
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to open event stream: {str(e)}"
+        )
+    return StreamingResponse(
+        event_stream(subscription, replay, reset),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
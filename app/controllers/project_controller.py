@@ -1,4 +1,6 @@
-from fastapi import HTTPException, File
+import asyncio
+from fastapi import HTTPException, File, Response, UploadFile
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user_model import User
 from app.schemas.project_schema import (
@@ -6,10 +8,38 @@ from app.schemas.project_schema import (
     ProjectUpdate,
 )
 from app.schemas.user_project_schema import UserProjectCreate
-from app.crud.aws_crud import upload_file_to_s3
+from app.schemas.document_schema import (
+    DocumentBulkDelete,
+    DocumentListQuery,
+    DocumentSearchQuery,
+    DocumentTagsUpdate,
+    DocumentUploadComplete,
+    DocumentUploadRequest,
+)
+from app.crud.aws_crud import (
+    build_project_object_key,
+    create_presigned_upload,
+    delete_file,
+    head_object,
+)
+from app.config import (
+    PRESIGNED_URL_EXPIRATION,
+    PROJECT_MAX_BYTES,
+    PROJECT_MAX_DOCUMENTS,
+    UPLOAD_BATCH_CONCURRENCY,
+    UPLOAD_BATCH_MAX_FILES,
+    UPLOAD_MAX_SIZE,
+)
 from app.crud import project_crud as crud_project
 from app.crud import user_project_crud as crud_user_project
 from app.crud import document_crud as crud_documents
+from app.crud import blob_crud as crud_blob
+from app.crud import document_version_crud as crud_version
+from app.crud import storage_deletion_crud as crud_deletion
+from app.crud import project_usage_crud as crud_usage
+from app.services.previews import initial_preview_status
+from app.services.storage_backend import UnsupportedOperationError
+from app.services.text_extraction import initial_search_status
 
 
 async def get_project(user: User, db: AsyncSession):
@@ -103,6 +133,41 @@ async def get_project_info(project_id: int, user: User, db: AsyncSession):
     return db_project.project
 
 
+async def get_project_usage(project_id: int, user: User, db: AsyncSession):
+    """Report a project's storage usage and limits from its usage counters.
+
+    Args:
+        project_id: ID of the project.
+        user: Authenticated user requesting the usage.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        usage: Document count and bytes used, the part reserved by uploads in progress,
+        and the configured limits (None when unlimited).
+
+    Raises:
+        HTTPException: 404 if the project is not found for the user; 500 on unexpected errors.
+    """
+    try:
+        db_project = await crud_user_project.is_project_from_user(
+            db, user.id, project_id
+        )
+        if not db_project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        usage = await crud_usage.get_project_usage(db, project_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to retrieve project usage: {str(e)}"
+        )
+    return {
+        **usage,
+        "max_documents": PROJECT_MAX_DOCUMENTS or None,
+        "max_bytes": PROJECT_MAX_BYTES or None,
+    }
+
+
 async def update_project(
     project_id: int, project: ProjectUpdate, user: User, db: AsyncSession
 ):
@@ -143,6 +208,9 @@ async def update_project(
 async def delete_project(project_id: int, user: User, db: AsyncSession):
     """Delete a project if the authenticated user is the owner.
 
+    The files of its documents and their past versions are released and, once
+    nothing references them, queued for deletion in the same transaction.
+
     Args:
         project_id: ID of the project to delete.
         user: Authenticated user performing the deletion (must be owner).
@@ -160,6 +228,10 @@ async def delete_project(project_id: int, user: User, db: AsyncSession):
         )
         if not db_user_project or not db_user_project.is_owner:
             raise HTTPException(status_code=404, detail="Project not found")
+        document_keys = await crud_documents.lock_project_document_keys(db, project_id)
+        version_keys = await crud_version.get_project_version_keys(db, project_id)
+        unreferenced = await crud_blob.release_blobs(db, [*document_keys, *version_keys])
+        await crud_deletion.enqueue_deletions(db, unreferenced)
         deleted_project = await crud_project.delete_project(db, project_id)
         if not deleted_project:
             raise HTTPException(status_code=404, detail="Project not found")
@@ -172,40 +244,241 @@ async def delete_project(project_id: int, user: User, db: AsyncSession):
     return {"message": f"Project with ID {deleted_project.id} deleted successfully"}
 
 
-async def get_project_documents(project_id: int, user: User, db: AsyncSession):
-    """List all documents belonging to a project the authenticated user is a member of.
+async def get_project_documents(
+    project_id: int,
+    query: DocumentListQuery,
+    response: Response,
+    user: User,
+    db: AsyncSession,
+):
+    """List a page of the documents of a project the authenticated user is a member of.
+
+    Documents are returned newest first. When more documents match, the
+    cursor for the next page is sent in the ``X-Next-Cursor`` response header;
+    a page past the last document, or with no match, is empty.
 
     Args:
         project_id: ID of the project whose documents are requested.
+        query: Filters, cursor and page size.
+        response: Response whose headers receive the next-page cursor.
         user: Authenticated user requesting the documents.
         db: Async SQLAlchemy session used for database access.
 
     Returns:
-        documents: The list of documents associated with the project.
+        documents: The page of documents associated with the project.
 
     Raises:
-        HTTPException: 404 if the project is not found for the user or no documents exist; 500 on unexpected errors.
+        HTTPException: 400 if the cursor is malformed; 404 if the project is not found for the user;
+        500 on unexpected errors.
     """
+    try:
+        after = crud_documents.decode_document_cursor(query.cursor) if query.cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     try:
         db_user_project = await crud_user_project.is_project_from_user(
             db, user.id, project_id
         )
         if not db_user_project:
             raise HTTPException(status_code=404, detail="Project not found")
-        documents = await crud_documents.get_documents_by_project(db, project_id)
-        if not documents:
-            raise HTTPException(
-                status_code=404, detail="No documents found for project"
-            )
+        documents = await crud_documents.get_documents_by_project(
+            db,
+            project_id,
+            name_prefix=query.name_prefix,
+            created_after=query.created_after,
+            created_before=query.created_before,
+            content_type=query.content_type,
+            tags=list(dict.fromkeys(query.tag)) if query.tag else None,
+            after=after,
+            limit=query.limit + 1,
+        )
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to retrieve documents: {str(e)}"
         )
+    if len(documents) > query.limit:
+        documents = documents[:query.limit]
+        response.headers["X-Next-Cursor"] = crud_documents.encode_document_cursor(
+            documents[-1]
+        )
+    return documents
+
+
+async def search_project_documents(
+    project_id: int,
+    query: DocumentSearchQuery,
+    user: User,
+    db: AsyncSession,
+):
+    """Full-text search the documents of a project the authenticated user is a member of.
+
+    Only documents whose text has already been indexed are matched on content;
+    names are searchable as soon as a document is stored.
+
+    Args:
+        project_id: ID of the project to search.
+        query: Search terms and maximum number of results.
+        user: Authenticated user searching.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        documents: Matching documents, best first, each with its rank and a highlighted snippet.
+
+    Raises:
+        HTTPException: 404 if the project is not found for the user; 500 on unexpected errors.
+    """
+    try:
+        db_user_project = await crud_user_project.is_project_from_user(
+            db, user.id, project_id
+        )
+        if not db_user_project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        documents = await crud_documents.search_documents(
+            db, project_id, query.q, query.limit
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to search documents: {str(e)}"
+        )
     return documents
 
 
+async def delete_project_documents(
+    project_id: int, request: DocumentBulkDelete, user: User, db: AsyncSession
+):
+    """Delete many documents of a project at once.
+
+    Membership is checked once; documents and their past versions are deleted
+    with one statement each, and their files are queued for the deletion
+    worker, which removes them with batched DeleteObjects calls.
+
+    Args:
+        project_id: ID of the project the documents belong to.
+        request: IDs of the documents to delete.
+        user: Authenticated user deleting the documents.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        result: IDs that were ``deleted`` and IDs ``not_found`` in the project.
+
+    Raises:
+        HTTPException: 404 if the project is not found for the user; 500 on unexpected errors.
+    """
+    document_ids = list(dict.fromkeys(request.ids))
+    try:
+        db_user_project = await crud_user_project.is_project_from_user(
+            db, user.id, project_id
+        )
+        if not db_user_project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        version_keys = await crud_version.delete_versions_of_documents(
+            db, project_id, document_ids
+        )
+        deleted = await crud_documents.delete_project_documents(
+            db, project_id, document_ids
+        )
+        unreferenced = await crud_blob.release_blobs(
+            db, [*(object_key for _, object_key in deleted), *version_keys]
+        )
+        await crud_deletion.enqueue_deletions(db, unreferenced)
+        await db.commit()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to delete documents: {str(e)}"
+        )
+    deleted_ids = {document_id for document_id, _ in deleted}
+    return {
+        "deleted": [i for i in document_ids if i in deleted_ids],
+        "not_found": [i for i in document_ids if i not in deleted_ids],
+    }
+
+
+async def add_project_document_tags(
+    project_id: int, request: DocumentTagsUpdate, user: User, db: AsyncSession
+):
+    """Add tags to many documents of a project at once.
+
+    Args:
+        project_id: ID of the project the documents belong to.
+        request: IDs of the documents and the tags to add.
+        user: Authenticated user tagging the documents.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        result: IDs of the documents that were ``updated``; documents that already
+        had every tag or are not in the project are left out.
+
+    Raises:
+        HTTPException: 404 if the project is not found for the user; 500 on unexpected errors.
+    """
+    try:
+        db_user_project = await crud_user_project.is_project_from_user(
+            db, user.id, project_id
+        )
+        if not db_user_project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        updated = await crud_documents.add_document_tags(
+            db,
+            project_id,
+            list(dict.fromkeys(request.ids)),
+            list(dict.fromkeys(request.tags)),
+        )
+        await db.commit()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to update tags: {str(e)}"
+        )
+    return {"updated": updated}
+
+
+async def remove_project_document_tags(
+    project_id: int, request: DocumentTagsUpdate, user: User, db: AsyncSession
+):
+    """Remove tags from many documents of a project at once.
+
+    Args:
+        project_id: ID of the project the documents belong to.
+        request: IDs of the documents and the tags to remove.
+        user: Authenticated user untagging the documents.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        result: IDs of the documents that were ``updated``; documents that had none
+        of the tags or are not in the project are left out.
+
+    Raises:
+        HTTPException: 404 if the project is not found for the user; 500 on unexpected errors.
+    """
+    try:
+        db_user_project = await crud_user_project.is_project_from_user(
+            db, user.id, project_id
+        )
+        if not db_user_project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        updated = await crud_documents.remove_document_tags(
+            db,
+            project_id,
+            list(dict.fromkeys(request.ids)),
+            list(dict.fromkeys(request.tags)),
+        )
+        await db.commit()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to update tags: {str(e)}"
+        )
+    return {"updated": updated}
+
+
 async def create_project_document(
     project_id: int, file: File, user: User, db: AsyncSession
 ):
@@ -218,23 +491,274 @@ async def create_project_document(
         db: Async SQLAlchemy session used for database access.
 
     Returns:
-        new_document: The created document instance with name and URL.
+        new_document: The created document instance with name and object key.
+
+    Raises:
+        HTTPException: 404 if the project is not found for the user; 507 if the project quota
+        is exhausted; 500 on upload or persistence errors.
+    """
+    try:
+        db_user_project = await crud_user_project.is_project_from_user(
+            db, user.id, project_id
+        )
+        if not db_user_project:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+        # Reserved before the transfer so concurrent uploads cannot overshoot the quota
+        reservation_id = await crud_usage.reserve_usage(
+            db, project_id, 1, crud_blob.upload_size(file)
+        )
+        try:
+            stored = await crud_blob.store_file(db, file)
+
+            new_document = await crud_documents.create_document(
+                db,
+                project_id,
+                file.filename,
+                stored["object_key"],
+                content_type=stored["content_type"],
+                size=stored["size"],
+                checksum=stored["checksum"],
+                content_encoding=stored["content_encoding"],
+                preview_status=initial_preview_status(stored["content_type"]),
+                search_status=initial_search_status(stored["content_type"]),
+                reservation_id=reservation_id,
+            )
+        except Exception:
+            await crud_usage.release_reservation(db, reservation_id)
+            raise
+        if not new_document:
+            raise HTTPException(status_code=500, detail="Failed to create document")
+    except HTTPException:
+        raise
+    except crud_usage.QuotaExceededError as e:
+        raise HTTPException(status_code=507, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to create document: {str(e)}"
+        )
+    return new_document
+
+
+async def create_project_documents(
+    project_id: int, files: list[UploadFile], user: User, db: AsyncSession
+):
+    """Upload several files to a project concurrently and store their metadata in one INSERT.
+
+    Membership is checked once for the whole batch. Uploads run with at most
+    UPLOAD_BATCH_CONCURRENCY transfers in flight, and a failed upload only
+    marks its own file as failed. Files whose content is already stored are
+    not transferred again.
+
+    Args:
+        project_id: ID of the project where the documents will be created.
+        files: Uploaded files to store and reference in the documents.
+        user: Authenticated user creating the documents.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        results: One entry per file, in request order, with its status and created document or error.
+
+    Raises:
+        HTTPException: 400 if no files or too many files are sent; 404 if the project is not found
+        for the user; 507 if the batch does not fit in the project quota; 500 if the documents
+        cannot be persisted.
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="At least one file is required")
+    if len(files) > UPLOAD_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many files, the limit is {UPLOAD_BATCH_MAX_FILES}",
+        )
+    try:
+        db_user_project = await crud_user_project.is_project_from_user(
+            db, user.id, project_id
+        )
+        if not db_user_project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        reservation_id = await crud_usage.reserve_usage(
+            db,
+            project_id,
+            len(files),
+            sum(crud_blob.upload_size(file) for file in files),
+        )
+    except HTTPException:
+        raise
+    except crud_usage.QuotaExceededError as e:
+        raise HTTPException(status_code=507, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to create documents: {str(e)}"
+        )
+
+    semaphore = asyncio.Semaphore(UPLOAD_BATCH_CONCURRENCY)
+    db_lock = asyncio.Lock()
+
+    async def upload(file: UploadFile):
+        async with semaphore:
+            return await crud_blob.store_file(db, file, db_lock)
+
+    uploads = await asyncio.gather(
+        *(upload(file) for file in files), return_exceptions=True
+    )
+    uploaded = [
+        {
+            "name": file.filename,
+            "preview_status": initial_preview_status(stored["content_type"]),
+            "search_status": initial_search_status(stored["content_type"]),
+            **stored,
+        }
+        for file, stored in zip(files, uploads)
+        if not isinstance(stored, BaseException)
+    ]
+    documents = []
+    try:
+        if uploaded:
+            documents = await crud_documents.create_documents(
+                db, project_id, uploaded, reservation_id=reservation_id
+            )
+        else:
+            await crud_usage.release_reservation(db, reservation_id)
+    except Exception as e:
+        # Blob references roll back with the insert; the objects are kept
+        # because another upload of the same content may already use them.
+        await crud_usage.release_reservation(db, reservation_id)
+        raise HTTPException(
+            status_code=500, detail=f"Failed to create documents: {str(e)}"
+        )
+
+    created = iter(documents)
+    results = []
+    for file, stored in zip(files, uploads):
+        if isinstance(stored, BaseException):
+            results.append(
+                {"filename": file.filename, "status": "failed", "error": str(stored)}
+            )
+        else:
+            results.append(
+                {"filename": file.filename, "status": "created", "document": next(created)}
+            )
+    return results
+
+
+async def create_document_upload(
+    project_id: int, upload: DocumentUploadRequest, user: User, db: AsyncSession
+):
+    """Start a direct-to-storage upload by issuing a presigned POST for the project.
+
+    Args:
+        project_id: ID of the project where the document will be created.
+        upload: Declared filename, content type and size of the file.
+        user: Authenticated user creating the document.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        ticket: The presigned URL, form fields, object key and expiration in seconds.
 
     Raises:
-        HTTPException: 404 if the project is not found for the user; 500 on upload or persistence errors.
+        HTTPException: 400 if the declared size is invalid; 404 if the project is not found for the user;
+        413 if the file exceeds the upload limit; 501 if the storage backend does not accept
+        direct uploads; 500 on unexpected errors.
     """
+    if upload.size <= 0:
+        raise HTTPException(status_code=400, detail="File size must be positive")
+    if upload.size > UPLOAD_MAX_SIZE:
+        raise HTTPException(status_code=413, detail="File too large")
     try:
         db_user_project = await crud_user_project.is_project_from_user(
             db, user.id, project_id
         )
         if not db_user_project:
             raise HTTPException(status_code=404, detail="Project not found")
+        key = build_project_object_key(project_id, upload.filename)
+        presigned = await create_presigned_upload(key, upload.content_type, upload.size)
+    except HTTPException:
+        raise
+    except UnsupportedOperationError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to create upload: {str(e)}"
+        )
+    return {
+        "url": presigned["url"],
+        "fields": presigned["fields"],
+        "key": key,
+        "expires_in": PRESIGNED_URL_EXPIRATION,
+    }
 
-        url = await upload_file_to_s3(file)
 
-        new_document = await crud_documents.create_document(
-            db, project_id, file.filename, url
+async def complete_document_upload(
+    project_id: int, upload: DocumentUploadComplete, user: User, db: AsyncSession
+):
+    """Finish a direct-to-storage upload by verifying the object and recording the document.
+
+    Completing the same upload again returns the document it created instead
+    of a second one sharing its file; concurrent completions are settled by the
+    unique index on object keys.
+
+    Args:
+        project_id: ID of the project where the document will be created.
+        upload: Object key returned by the upload ticket and the document name.
+        user: Authenticated user creating the document.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        new_document: The created (or previously created) document instance with name and object key.
+
+    Raises:
+        HTTPException: 400 if the key does not belong to the project or the object was not uploaded;
+        404 if the project is not found for the user; 409 if another project's document uses the key;
+        413 if the stored object exceeds the upload limit; 507 if the project quota is exhausted;
+        500 on unexpected errors.
+    """
+    if not upload.key.startswith(f"projects/{project_id}/"):
+        raise HTTPException(status_code=400, detail="Invalid upload key")
+    try:
+        db_user_project = await crud_user_project.is_project_from_user(
+            db, user.id, project_id
         )
+        if not db_user_project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        metadata = await head_object(upload.key)
+        if not metadata:
+            raise HTTPException(status_code=400, detail="Upload not found")
+        db_document = await crud_documents.get_document_by_object_key(db, upload.key)
+        if db_document:
+            if db_document.project_id != project_id:
+                raise HTTPException(status_code=409, detail="Upload already completed")
+            return db_document
+        if metadata["size"] > UPLOAD_MAX_SIZE:
+            await delete_file(upload.key)
+            raise HTTPException(status_code=413, detail="File too large")
+        try:
+            # The usage row stays locked until create_document commits
+            await crud_usage.check_quota(db, project_id, 1, metadata["size"])
+        except crud_usage.QuotaExceededError as e:
+            await db.rollback()
+            await delete_file(upload.key)
+            raise HTTPException(status_code=507, detail=str(e))
+        try:
+            new_document = await crud_documents.create_document(
+                db,
+                project_id,
+                upload.name,
+                upload.key,
+                content_type=metadata["content_type"],
+                size=metadata["size"],
+                preview_status=initial_preview_status(metadata["content_type"]),
+                search_status=initial_search_status(metadata["content_type"]),
+            )
+        except IntegrityError:
+            # A concurrent completion of the same upload inserted the key first
+            await db.rollback()
+            db_document = await crud_documents.get_document_by_object_key(db, upload.key)
+            if not db_document:
+                raise
+            if db_document.project_id != project_id:
+                raise HTTPException(status_code=409, detail="Upload already completed")
+            return db_document
         if not new_document:
             raise HTTPException(status_code=500, detail="Failed to create document")
     except HTTPException:
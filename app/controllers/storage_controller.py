@@ -0,0 +1,54 @@
+import os
+import time
+from fastapi import HTTPException
+from fastapi.responses import FileResponse
+from app.crud import aws_crud
+from app.services.local_storage import LocalStorageBackend
+
+
+async def get_local_object(key: str, expires: int, signature: str):
+    """Serve an object of the local storage backend to the holder of a signed URL.
+
+    This is the local counterpart of an S3 presigned URL: the signature
+    replaces authentication, and the file is sent with a zero-copy file
+    response that also answers Range requests.
+
+    Args:
+        key: Object key from the URL path.
+        expires: Unix time the URL expires at.
+        signature: Signature created by LocalStorageBackend.presign_download.
+
+    Returns:
+        FileResponse: The object's file with its stored Content-Type and Content-Encoding.
+
+    Raises:
+        HTTPException: 404 if local storage is not in use or the object does not exist;
+        403 if the signature is invalid or expired; 500 on unexpected errors.
+    """
+    storage = aws_crud.storage
+    if not isinstance(storage, LocalStorageBackend):
+        raise HTTPException(status_code=404, detail="Not found")
+    try:
+        if not storage.verify_download(key, expires, signature):
+            raise HTTPException(status_code=403, detail="Invalid or expired signature")
+        try:
+            path = storage.object_path(key)
+        except ValueError:
+            raise HTTPException(status_code=404, detail="Not found")
+        if not os.path.isfile(path):
+            raise HTTPException(status_code=404, detail="Not found")
+        metadata = storage.read_metadata(key)
+        headers = {"Cache-Control": f"private, max-age={max(expires - int(time.time()), 0)}"}
+        if metadata.get("content_encoding"):
+            headers["Content-Encoding"] = metadata["content_encoding"]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to read stored file: {str(e)}"
+        )
+    return FileResponse(
+        path,
+        media_type=metadata.get("content_type") or "application/octet-stream",
+        headers=headers,
+    )
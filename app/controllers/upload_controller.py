@@ -0,0 +1,346 @@
+import mimetypes
+from tempfile import SpooledTemporaryFile
+import uuid
+from fastapi import HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import (
+    UPLOAD_CHUNK_MAX_SIZE,
+    UPLOAD_CHUNK_MIN_SIZE,
+    UPLOAD_MAX_SIZE,
+    UPLOAD_SPOOL_MAX_SIZE,
+)
+from app.models.user_model import User
+from app.crud import document_crud as crud_documents
+from app.crud import upload_session_crud as crud_upload
+from app.crud import project_usage_crud as crud_usage
+from app.crud import user_project_crud as crud_user_project
+from app.crud.aws_crud import (
+    abort_multipart_upload,
+    build_project_object_key,
+    complete_multipart_upload,
+    create_multipart_upload,
+    upload_part,
+)
+from app.schemas.document_schema import ResumableUploadCreate
+from app.services.content_type import SNIFF_SIZE, detect_content_type
+from app.services.previews import initial_preview_status
+from app.services.text_extraction import initial_search_status
+
+# S3 accepts at most 10,000 parts per multipart upload.
+MAX_PARTS = 10000
+
+
+def upload_session_info(db_session) -> dict:
+    """Return the client-facing state of an upload session."""
+    return {
+        "id": db_session.id,
+        "filename": db_session.filename,
+        "size": db_session.size,
+        "upload_offset": db_session.upload_offset,
+        "expires_at": db_session.expires_at,
+        "chunk_min_size": UPLOAD_CHUNK_MIN_SIZE,
+        "chunk_max_size": UPLOAD_CHUNK_MAX_SIZE,
+    }
+
+
+async def get_user_upload_session(
+    project_id: int, upload_id: str, user: User, db: AsyncSession
+):
+    """Return an upload session if it belongs to the user and project and the user is still a member.
+
+    Raises:
+        HTTPException: 404 if the session does not exist or is not the user's.
+    """
+    db_session = await crud_upload.get_upload_session(db, upload_id)
+    if (
+        not db_session
+        or db_session.project_id != project_id
+        or db_session.user_id != user.id
+    ):
+        raise HTTPException(status_code=404, detail="Upload not found")
+    db_user_project = await crud_user_project.is_project_from_user(
+        db, user.id, project_id
+    )
+    if not db_user_project:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return db_session
+
+
+async def create_upload_session(
+    project_id: int,
+    upload: ResumableUploadCreate,
+    response: Response,
+    user: User,
+    db: AsyncSession,
+):
+    """Start a resumable upload backed by an S3 multipart upload.
+
+    Args:
+        project_id: ID of the project where the document will be created.
+        upload: Filename, total size and optional content type of the file.
+        response: Response whose headers receive the session location.
+        user: Authenticated user uploading the file.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        upload_session: The session ID, offset (0), expiry and accepted chunk sizes.
+
+    Raises:
+        HTTPException: 404 if the project is not found for the user; 413 if the file exceeds
+        the upload limit or needs too many chunks; 507 if the file does not fit in the project
+        quota; 500 on unexpected errors.
+    """
+    if upload.size > UPLOAD_MAX_SIZE:
+        raise HTTPException(status_code=413, detail="File too large")
+    if -(-upload.size // UPLOAD_CHUNK_MAX_SIZE) > MAX_PARTS:
+        raise HTTPException(status_code=413, detail="File needs too many chunks")
+    try:
+        db_user_project = await crud_user_project.is_project_from_user(
+            db, user.id, project_id
+        )
+        if not db_user_project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        key = build_project_object_key(project_id, upload.filename)
+        content_type = (
+            upload.content_type
+            or mimetypes.guess_type(upload.filename)[0]
+            or "application/octet-stream"
+        )
+        s3_upload_id = await create_multipart_upload(key, content_type)
+        try:
+            # The open session counts against the quota until it completes or expires
+            await crud_usage.check_quota(db, project_id, 1, upload.size)
+        except crud_usage.QuotaExceededError as e:
+            await db.rollback()
+            await abort_multipart_upload(key, s3_upload_id)
+            raise HTTPException(status_code=507, detail=str(e))
+        db_session = await crud_upload.create_upload_session(
+            db,
+            uuid.uuid4().hex,
+            project_id,
+            user.id,
+            upload.filename,
+            key,
+            s3_upload_id,
+            upload.size,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to create upload: {str(e)}"
+        )
+    response.headers["Location"] = (
+        f"/project/{project_id}/documents/resumable/{db_session.id}"
+    )
+    return upload_session_info(db_session)
+
+
+async def get_upload_session(
+    project_id: int, upload_id: str, user: User, db: AsyncSession
+):
+    """Report how much of a resumable upload the server has, so the client can resume.
+
+    Args:
+        project_id: ID of the project the upload belongs to.
+        upload_id: ID of the upload session.
+        user: Authenticated user who started the upload.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        response: An empty 200 response with ``Upload-Offset`` and ``Upload-Length`` headers.
+
+    Raises:
+        HTTPException: 404 if the session does not exist or is not the user's; 500 on unexpected errors.
+    """
+    try:
+        db_session = await get_user_upload_session(project_id, upload_id, user, db)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to retrieve upload: {str(e)}"
+        )
+    return Response(
+        status_code=200,
+        headers={
+            "Upload-Offset": str(db_session.upload_offset),
+            "Upload-Length": str(db_session.size),
+            "Cache-Control": "no-store",
+        },
+    )
+
+
+async def read_chunk(request: Request, limit: int):
+    """Spool a request body to a temporary file, refusing bodies larger than limit.
+
+    Returns:
+        chunk: The file positioned at its start.
+        length: Number of bytes read.
+
+    Raises:
+        HTTPException: 413 if the body is larger than limit.
+    """
+    chunk = SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_SIZE)
+    length = 0
+    async for data in request.stream():
+        length += len(data)
+        if length > limit:
+            chunk.close()
+            raise HTTPException(status_code=413, detail="Chunk too large")
+        chunk.write(data)
+    chunk.seek(0)
+    return chunk, length
+
+
+async def upload_chunk(
+    project_id: int,
+    upload_id: str,
+    upload_offset: int | None,
+    request: Request,
+    user: User,
+    db: AsyncSession,
+):
+    """Append a chunk to a resumable upload, creating the document once the file is complete.
+
+    Each chunk is stored as one S3 part. The client sends the offset it
+    believes the server has; a mismatch means the previous chunk was (or was
+    not) stored and the client must ask for the offset again.
+
+    Args:
+        project_id: ID of the project the upload belongs to.
+        upload_id: ID of the upload session.
+        upload_offset: Value of the client's ``Upload-Offset`` header.
+        request: Incoming request whose body is the chunk.
+        user: Authenticated user who started the upload.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        response: A 204 response with the new ``Upload-Offset``, or the created document
+        once the last chunk is stored.
+
+    Raises:
+        HTTPException: 400 if the offset header is missing or a non-final chunk is too small;
+        404 if the session does not exist or is not the user's; 409 if the offset does not match;
+        413 if the chunk is too large; 500 on unexpected errors.
+    """
+    if upload_offset is None:
+        raise HTTPException(status_code=400, detail="Upload-Offset header is required")
+    try:
+        db_session = await get_user_upload_session(project_id, upload_id, user, db)
+        if upload_offset != db_session.upload_offset:
+            raise HTTPException(status_code=409, detail="Upload offset mismatch")
+        parts, content_type = db_session.parts, db_session.content_type
+        remaining = db_session.size - upload_offset
+        if remaining:
+            chunk, length = await read_chunk(
+                request, min(remaining, UPLOAD_CHUNK_MAX_SIZE)
+            )
+            try:
+                if length < min(remaining, UPLOAD_CHUNK_MIN_SIZE):
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Chunks must be at least {UPLOAD_CHUNK_MIN_SIZE} bytes except the last",
+                    )
+                if upload_offset == 0:
+                    content_type = detect_content_type(
+                        chunk.read(SNIFF_SIZE), db_session.filename
+                    )
+                    chunk.seek(0)
+                part_number = len(parts) + 1
+                etag = await upload_part(
+                    db_session.object_key,
+                    db_session.s3_upload_id,
+                    part_number,
+                    chunk,
+                    length,
+                )
+            finally:
+                chunk.close()
+            part = {"PartNumber": part_number, "ETag": etag}
+            advanced = await crud_upload.advance_upload_session(
+                db, upload_id, upload_offset, length, part, content_type
+            )
+            if not advanced:
+                raise HTTPException(status_code=409, detail="Upload offset mismatch")
+            if upload_offset + length < db_session.size:
+                return Response(
+                    status_code=204,
+                    headers={"Upload-Offset": str(upload_offset + length)},
+                )
+            # The session advanced from exactly the state loaded above
+            parts = [*parts, part]
+        new_document = await complete_upload_session(db_session, parts, content_type, db)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to upload chunk: {str(e)}"
+        )
+    return new_document
+
+
+async def complete_upload_session(
+    db_session, parts: list[dict], content_type: str | None, db: AsyncSession
+):
+    """Assemble the uploaded parts and create the document, removing the session in the same commit.
+
+    Args:
+        db_session: Upload session whose file is complete.
+        parts: All parts of the upload, in order.
+        content_type: Detected MIME type of the file.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        new_document: The created document instance.
+
+    Raises:
+        HTTPException: 409 if another request already completed the upload.
+    """
+    await complete_multipart_upload(
+        db_session.object_key, db_session.s3_upload_id, parts
+    )
+    if not await crud_upload.delete_upload_session(db, db_session.id):
+        raise HTTPException(status_code=409, detail="Upload already completed")
+    # create_document commits, so the session removal and the new row land together
+    return await crud_documents.create_document(
+        db,
+        db_session.project_id,
+        db_session.filename,
+        db_session.object_key,
+        content_type=content_type,
+        size=db_session.size,
+        preview_status=initial_preview_status(content_type),
+        search_status=initial_search_status(content_type),
+    )
+
+
+async def delete_upload_session(
+    project_id: int, upload_id: str, user: User, db: AsyncSession
+):
+    """Cancel a resumable upload and discard the parts stored so far.
+
+    Args:
+        project_id: ID of the project the upload belongs to.
+        upload_id: ID of the upload session.
+        user: Authenticated user who started the upload.
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        None: A 204 response on success.
+
+    Raises:
+        HTTPException: 404 if the session does not exist or is not the user's; 500 on unexpected errors.
+    """
+    try:
+        db_session = await get_user_upload_session(project_id, upload_id, user, db)
+        await abort_multipart_upload(db_session.object_key, db_session.s3_upload_id)
+        await crud_upload.delete_upload_session(db, upload_id)
+        await db.commit()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to cancel upload: {str(e)}"
+        )
+    return
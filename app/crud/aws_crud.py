@@ -1,61 +1,486 @@
+import asyncio
+from collections import OrderedDict
+import io
+import re
+import time
 from fastapi import UploadFile
-from app.services.aws_setup import s3_client
-from app.config import AWS_BUCKET_NAME, AWS_REGION
+from app.services.aws_setup import s3_executor
+from app.services.compression import compressing_reader
+from app.services.local_storage import LocalStorageBackend
+from app.services.metrics import increment
+from app.services.s3_storage import S3StorageBackend, run_in_transfer_pool
+from app.services.storage_backend import StorageBackend, UnsupportedOperationError
+from app.config import (
+    DOWNLOAD_CHUNK_SIZE,
+    DOWNLOAD_READ_AHEAD_CHUNKS,
+    LOCAL_STORAGE_BASE_URL,
+    LOCAL_STORAGE_ROOT,
+    PRESIGNED_DOWNLOAD_CACHE_SIZE,
+    PRESIGNED_DOWNLOAD_EXPIRATION,
+    PRESIGNED_URL_EXPIRATION,
+    SECRET_KEY,
+    STORAGE_BACKEND,
+)
 import uuid
 
+_SINGLE_BYTE_RANGE = re.compile(r"^bytes=(\d+-\d*|-\d+)$")
 
-async def upload_file_to_s3(file: UploadFile) -> str:
-    """Upload a file to Amazon S3 with a unique name and return its public URL.
+# Presigned download URLs by object key: key -> (url, reusable_until).
+_presigned_download_cache: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+
+def create_storage_backend(name: str) -> StorageBackend:
+    """Build the storage backend selected by configuration.
 
     Args:
-        file: Incoming uploaded file to store in S3.
+        name: ``s3`` for the S3 bucket or ``local`` for files under LOCAL_STORAGE_ROOT.
 
     Returns:
-        url: The public URL of the uploaded file.
+        storage: The storage backend instance.
 
     Raises:
-        Exception: On any failure during upload or URL generation.
+        ValueError: If the name is not a known backend.
     """
-    try:
-        # Generate unique filename
-        file_extension = file.filename.split(".")[-1]
-        unique_filename = f"{uuid.uuid4()}.{file_extension}"
-
-        # Upload file
-        s3_client.upload_fileobj(
-            file.file,
-            AWS_BUCKET_NAME,
-            unique_filename,
-            ExtraArgs={"ACL": "public-read"},
+    if name == "s3":
+        return S3StorageBackend()
+    if name == "local":
+        return LocalStorageBackend(
+            LOCAL_STORAGE_ROOT, LOCAL_STORAGE_BASE_URL, SECRET_KEY, s3_executor
         )
+    raise ValueError(f"Unknown STORAGE_BACKEND: {name!r}")
+
+
+storage = create_storage_backend(STORAGE_BACKEND)
 
-        # Generate URL
-        url = f"https://{AWS_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/{unique_filename}"
-        return url
 
+def create_presigned_download(key: str) -> tuple[str, int]:
+    """Return a short-lived presigned GET URL for an object, reusing cached signatures.
+
+    Signatures are reused for the first 80% of their lifetime so hot documents
+    are signed once per window instead of once per request.
+
+    Args:
+        key: Object key inside the bucket.
+
+    Returns:
+        url: The presigned URL.
+        max_age: Seconds the URL can still be handed out (and cached by clients).
+
+    Raises:
+        Exception: On any failure while signing the request.
+    """
+    now = time.monotonic()
+    cached = _presigned_download_cache.get(key)
+    if cached and cached[1] > now:
+        _presigned_download_cache.move_to_end(key)
+        return cached[0], int(cached[1] - now)
+    try:
+        url = storage.presign_download(key, PRESIGNED_DOWNLOAD_EXPIRATION)
     except Exception as e:
-        raise Exception(f"Error uploading file to S3: {str(e)}")
+        raise Exception(f"Error creating presigned download: {str(e)}")
+    reuse_window = int(PRESIGNED_DOWNLOAD_EXPIRATION * 0.8)
+    _presigned_download_cache[key] = (url, now + reuse_window)
+    if len(_presigned_download_cache) > PRESIGNED_DOWNLOAD_CACHE_SIZE:
+        _presigned_download_cache.popitem(last=False)
+    return url, reuse_window
 
 
-async def delete_file_from_s3(url: str) -> bool:
-    """Delete a file from Amazon S3 using its public URL.
+def forget_presigned_download(key: str) -> None:
+    """Drop a cached presigned URL, e.g. once its object is deleted.
 
     Args:
-        url: The public URL of the file to delete.
+        key: Object key inside the bucket.
+    """
+    _presigned_download_cache.pop(key, None)
+
+
+def build_project_object_key(project_id: int, filename: str) -> str:
+    """Build a unique object key scoped to a project.
+
+    Args:
+        project_id: ID of the project the object belongs to.
+        filename: Original filename, used for its extension.
 
     Returns:
-        True: Indicates the file was successfully deleted.
+        key: A key of the form ``projects/<project_id>/<uuid>.<ext>``.
+    """
+    file_extension = filename.split(".")[-1]
+    return f"projects/{project_id}/{uuid.uuid4()}.{file_extension}"
+
+
+async def create_presigned_upload(key: str, content_type: str, size: int) -> dict:
+    """Create a presigned POST that lets a client upload one object directly to S3.
+
+    The policy pins the key, the content type and the exact byte size, so the
+    client cannot upload anything other than what it declared.
+
+    Args:
+        key: Object key the client is allowed to write.
+        content_type: Content-Type the upload must carry.
+        size: Exact size in bytes the upload must have.
+
+    Returns:
+        presigned: Dict with the target ``url`` and the form ``fields`` to send.
+
+    Raises:
+        UnsupportedOperationError: If the storage backend does not accept direct uploads.
+        Exception: On any other failure while signing the request.
+    """
+    try:
+        return await storage.presign_upload(key, content_type, size, PRESIGNED_URL_EXPIRATION)
+    except UnsupportedOperationError:
+        raise
+    except Exception as e:
+        raise Exception(f"Error creating presigned upload: {str(e)}")
+
+
+async def head_object(key: str) -> dict | None:
+    """Fetch the metadata of an object without downloading it.
+
+    Args:
+        key: Object key inside the bucket.
+
+    Returns:
+        metadata: Dict with ``size``, ``content_type`` and ``etag``; None if the object does not exist.
+
+    Raises:
+        Exception: On any failure other than a missing object.
+    """
+    return await storage.head(key)
+
+
+def parse_range_header(range_header: str | None) -> str | None:
+    """Return the Range header if it is a single byte range S3 can serve, else None.
+
+    Multi-range and malformed values are ignored, which means the full
+    object is served, as allowed by RFC 9110.
+
+    Args:
+        range_header: Raw value of the request's Range header.
+
+    Returns:
+        range_header: The normalized range, or None to serve the whole object.
+    """
+    if not range_header:
+        return None
+    range_header = range_header.replace(" ", "")
+    if not _SINGLE_BYTE_RANGE.match(range_header):
+        return None
+    return range_header
+
+
+async def open_file_stream(
+    key: str, range_header: str | None = None, if_range: str | None = None
+) -> dict | None:
+    """Start reading an object (or a byte range of it) without loading it in memory.
+
+    Args:
+        key: Object key inside the bucket.
+        range_header: Optional single byte range, as returned by parse_range_header.
+        if_range: Optional If-Range validator (ETag or HTTP date); when it no longer
+            matches the object, the whole object is returned instead of the range.
+
+    Returns:
+        stream: Dict with the streaming ``body``, ``content_length``, ``content_range``
+        (None for full reads), ``etag`` and ``content_type``; None if the object does not exist.
 
     Raises:
-        Exception: On any failure during key extraction or deletion.
+        InvalidRangeError: If the range starts past the end of the object.
+        Exception: On any other failure while opening the object.
     """
+    return await storage.open(key, range_header, if_range)
+
+
+async def iter_file_stream(body, chunk_size: int = None, read_ahead: int = None):
+    """Yield an S3 body in fixed-size chunks with bounded read-ahead.
+
+    A producer reads at most ``read_ahead`` chunks ahead of the consumer; when
+    the client is slow the queue fills up and reading from S3 pauses, so memory
+    per connection stays at roughly ``(read_ahead + 1) * chunk_size``.
+
+    Args:
+        body: Streaming body returned by open_file_stream.
+        chunk_size: Bytes per chunk; defaults to DOWNLOAD_CHUNK_SIZE.
+        read_ahead: Maximum buffered chunks; defaults to DOWNLOAD_READ_AHEAD_CHUNKS.
+
+    Yields:
+        chunk: The next block of bytes of the object.
+    """
+    chunk_size = chunk_size or DOWNLOAD_CHUNK_SIZE
+    queue = asyncio.Queue(maxsize=read_ahead or DOWNLOAD_READ_AHEAD_CHUNKS)
+
+    async def produce():
+        try:
+            while True:
+                chunk = await run_in_transfer_pool(body.read, chunk_size)
+                await queue.put(chunk)
+                if not chunk:
+                    return
+        except Exception as e:
+            await queue.put(e)
+
+    producer = asyncio.create_task(produce())
     try:
-        # Extract key from URL
-        key = url.split("/")[-1]
+        while True:
+            chunk = await queue.get()
+            if isinstance(chunk, Exception):
+                raise chunk
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        producer.cancel()
+        body.close()
 
-        # Delete file
-        s3_client.delete_object(Bucket=AWS_BUCKET_NAME, Key=key)
-        return True
 
+async def read_file(key: str, max_size: int) -> bytes | None:
+    """Download a whole object into memory, refusing objects above a size limit.
+
+    Args:
+        key: Object key inside the bucket.
+        max_size: Largest object size in bytes that will be read.
+
+    Returns:
+        data: The object's content; None if it does not exist or is larger than max_size.
+
+    Raises:
+        Exception: On any other failure while reading the object.
+    """
+    stream = await open_file_stream(key)
+    if not stream:
+        return None
+    try:
+        if stream["content_length"] > max_size:
+            return None
+        return await run_in_transfer_pool(stream["body"].read)
     except Exception as e:
-        raise Exception(f"Error deleting file from S3: {str(e)}")
+        raise Exception(f"Error reading file from storage: {str(e)}")
+    finally:
+        stream["body"].close()
+
+
+async def put_file(key: str, data: bytes, content_type: str) -> str:
+    """Store generated content (e.g. a preview image) as a private object.
+
+    Args:
+        key: Object key to write.
+        data: Content of the object.
+        content_type: Content-Type to store with the object.
+
+    Returns:
+        key: The object key that was written.
+
+    Raises:
+        Exception: On any failure during upload.
+    """
+    await storage.put(key, io.BytesIO(data), content_type)
+    return key
+
+
+def content_object_key(sha256: str) -> str:
+    """Return the content-addressed object key for a SHA-256 digest.
+
+    Args:
+        sha256: Hex digest of the object's content.
+
+    Returns:
+        key: A key of the form ``blobs/<sha256>``.
+    """
+    return f"blobs/{sha256}"
+
+
+def preview_object_key(key: str) -> str:
+    """Return the key of the preview image stored alongside an object.
+
+    Args:
+        key: Object key of the original file.
+
+    Returns:
+        key: A key of the form ``<key>.preview.jpg``.
+    """
+    return f"{key}.preview.jpg"
+
+
+def content_object_checksum(key: str) -> str | None:
+    """Return the SHA-256 digest encoded in a content-addressed key.
+
+    Args:
+        key: Object key inside the bucket.
+
+    Returns:
+        sha256: The digest for ``blobs/<sha256>`` keys; None for any other key.
+    """
+    prefix, _, sha256 = key.partition("/")
+    if prefix == "blobs" and len(sha256) == 64:
+        return sha256
+    return None
+
+
+async def upload_file(
+    file: UploadFile,
+    key: str | None = None,
+    content_type: str | None = None,
+    content_encoding: str | None = None,
+) -> str:
+    """Upload a file to storage as a private object.
+
+    With a content encoding the file is compressed while it is streamed to
+    storage, and the object carries a matching Content-Encoding.
+
+    Args:
+        file: Incoming uploaded file to store.
+        key: Optional object key; a unique one is generated when omitted.
+        content_type: Optional Content-Type to store; defaults to the one sent by the client.
+        content_encoding: Optional encoding to store the file with (only ``zstd`` is supported).
+
+    Returns:
+        key: The object key of the uploaded file.
+
+    Raises:
+        Exception: On any failure during upload.
+    """
+    if key is None:
+        file_extension = file.filename.split(".")[-1]
+        key = f"{uuid.uuid4()}.{file_extension}"
+
+    body = file.file
+    if content_encoding:
+        body = compressing_reader(file.file)
+
+    # Upload file without blocking the event loop
+    await storage.put(
+        key,
+        body,
+        content_type or file.content_type or "application/octet-stream",
+        content_encoding,
+    )
+    if content_encoding:
+        increment("compression_input_bytes_total", file.file.tell())
+        increment("compression_output_bytes_total", body.tell())
+    return key
+
+
+async def create_multipart_upload(key: str, content_type: str) -> str:
+    """Start a multipart upload that parts can later be added to.
+
+    Args:
+        key: Object key the completed upload is stored under.
+        content_type: Content-Type to store with the object.
+
+    Returns:
+        upload_id: ID of the multipart upload.
+
+    Raises:
+        Exception: On any failure while starting the upload.
+    """
+    return await storage.create_multipart_upload(key, content_type)
+
+
+async def upload_part(
+    key: str, upload_id: str, part_number: int, fileobj, size: int
+) -> str:
+    """Upload one part of a multipart upload.
+
+    Args:
+        key: Object key of the multipart upload.
+        upload_id: ID of the multipart upload.
+        part_number: 1-based position of the part.
+        fileobj: Readable binary file object holding the part, positioned at its start.
+        size: Size of the part in bytes.
+
+    Returns:
+        etag: ETag of the stored part, needed to complete the upload.
+
+    Raises:
+        Exception: On any failure while uploading the part.
+    """
+    return await storage.upload_part(key, upload_id, part_number, fileobj, size)
+
+
+async def complete_multipart_upload(key: str, upload_id: str, parts: list[dict]) -> str:
+    """Assemble the parts of a multipart upload into the final object.
+
+    Completing an upload that was already completed (e.g. the request was
+    retried after a crash) succeeds as long as the object exists.
+
+    Args:
+        key: Object key of the multipart upload.
+        upload_id: ID of the multipart upload.
+        parts: ``{"PartNumber", "ETag"}`` dicts in part order.
+
+    Returns:
+        key: The object key of the completed object.
+
+    Raises:
+        Exception: On any failure while completing the upload.
+    """
+    await storage.complete_multipart_upload(key, upload_id, parts)
+    return key
+
+
+async def abort_multipart_upload(key: str, upload_id: str) -> bool:
+    """Abort a multipart upload and free the storage held by its parts.
+
+    Args:
+        key: Object key of the multipart upload.
+        upload_id: ID of the multipart upload.
+
+    Returns:
+        True: Once the upload is aborted or no longer exists.
+
+    Raises:
+        Exception: On any other failure while aborting the upload.
+    """
+    await storage.abort_multipart_upload(key, upload_id)
+    return True
+
+
+async def copy_file(source_key: str, key: str) -> str:
+    """Copy an object to a new key inside the bucket without downloading it.
+
+    Args:
+        source_key: Object key to copy from.
+        key: Object key to copy to.
+
+    Returns:
+        key: The object key of the copy.
+
+    Raises:
+        Exception: On any failure during the copy.
+    """
+    await storage.copy(source_key, key)
+    return key
+
+
+async def delete_files(keys: list[str]) -> dict[str, str]:
+    """Delete many objects at once (on S3, in DeleteObjects calls of up to 1,000 keys).
+
+    Args:
+        keys: Object keys to delete.
+
+    Returns:
+        errors: Error message by key for the objects that could not be deleted.
+    """
+    errors = await storage.delete_many(keys)
+    for key in keys:
+        if key not in errors:
+            forget_presigned_download(key)
+    return errors
+
+
+async def delete_file(key: str) -> bool:
+    """Delete a file from storage using its object key.
+
+    Args:
+        key: The object key of the file to delete.
+
+    Returns:
+        True: Indicates the file was successfully deleted.
+
+    Raises:
+        Exception: On any failure during deletion.
+    """
+    # Delete file without blocking the event loop
+    await storage.delete(key)
+    forget_presigned_download(key)
+    return True
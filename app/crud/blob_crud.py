@@ -0,0 +1,235 @@
+import asyncio
+from collections import Counter
+from contextlib import nullcontext
+import hashlib
+import io
+from fastapi import UploadFile
+from sqlalchemy import Integer, String, any_, delete, func, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.blob_model import Blob
+from app.crud.aws_crud import content_object_key, upload_file
+from app.crud.storage_deletion_crud import cancel_deletions
+from app.services.compression import choose_content_encoding
+from app.services.content_type import SNIFF_SIZE, detect_content_type
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _inspect_fileobj(fileobj) -> tuple[str, int, bytes]:
+    """Return the SHA-256 hex digest, size and first bytes of a file object in one pass."""
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    fileobj.seek(0)
+    while chunk := fileobj.read(HASH_CHUNK_SIZE):
+        if len(head) < SNIFF_SIZE:
+            head += chunk[:SNIFF_SIZE - len(head)]
+        digest.update(chunk)
+        size += len(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest(), size, head
+
+
+def upload_size(file: UploadFile) -> int:
+    """Return the size of an uploaded file in bytes without reading it; the file is rewound."""
+    size = file.file.seek(0, io.SEEK_END)
+    file.file.seek(0)
+    return size
+
+
+async def inspect_file(file: UploadFile) -> dict:
+    """Compute the checksum, size and MIME type of an uploaded file off the event loop.
+
+    The file is read once; the MIME type is detected from its first bytes.
+
+    Args:
+        file: Incoming uploaded file; it is rewound afterwards.
+
+    Returns:
+        metadata: Dict with ``checksum`` (SHA-256 hex digest), ``size`` in bytes and ``content_type``.
+    """
+    checksum, size, head = await asyncio.to_thread(_inspect_fileobj, file.file)
+    return {
+        "checksum": checksum,
+        "size": size,
+        "content_type": detect_content_type(head, file.filename, file.content_type),
+    }
+
+
+async def acquire_blob(db: AsyncSession, sha256: str):
+    """Add a reference to an existing blob.
+
+    The change is not committed; it is persisted with the caller's document change.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        sha256: Hex digest of the content.
+
+    Returns:
+        blob: ``(object_key, content_encoding)`` if the blob already exists; otherwise None.
+    """
+    result = await db.execute(
+        update(Blob)
+        .where(Blob.sha256 == sha256)
+        .values(ref_count=Blob.ref_count + 1)
+        .returning(Blob.object_key, Blob.content_encoding)
+    )
+    return result.first()
+
+
+async def register_blob(
+    db: AsyncSession,
+    sha256: str,
+    object_key: str,
+    size: int,
+    content_encoding: str | None = None,
+):
+    """Record a newly uploaded blob with one reference (or add one if it raced in).
+
+    The change is not committed; it is persisted with the caller's document change.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        sha256: Hex digest of the content.
+        object_key: Content-addressed key the object was stored under.
+        size: Size of the content in bytes (before compression).
+        content_encoding: Encoding the object is stored with, if any.
+    """
+    await db.execute(
+        insert(Blob)
+        .values(
+            sha256=sha256,
+            object_key=object_key,
+            size=size,
+            content_encoding=content_encoding,
+            ref_count=1,
+        )
+        .on_conflict_do_update(
+            index_elements=[Blob.sha256], set_={"ref_count": Blob.ref_count + 1}
+        )
+    )
+
+
+async def retain_blob(db: AsyncSession, object_key: str):
+    """Add a reference to the blob stored under an object key, if there is one.
+
+    The change is not committed; it is persisted with the caller's document change.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        object_key: Object key that is about to gain another reference.
+
+    Returns:
+        True: If the key is content-addressed and can be shared; False if it is
+        owned by a single document and must be copied instead.
+    """
+    result = await db.execute(
+        update(Blob)
+        .where(Blob.object_key == object_key)
+        .values(ref_count=Blob.ref_count + 1)
+        .returning(Blob.sha256)
+    )
+    return result.scalars().first() is not None
+
+
+async def release_blobs(db: AsyncSession, object_keys: list[str]) -> list[str]:
+    """Drop one reference per entry of object_keys, in two statements whatever their number.
+
+    Keys may repeat (several documents sharing a blob). The change is not
+    committed; it is persisted with the caller's document change.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        object_keys: Object keys of the removed documents and versions.
+
+    Returns:
+        unreferenced: Keys nothing references anymore, which can be deleted from storage.
+    """
+    counts = Counter(object_keys)
+    if not counts:
+        return []
+    released = (
+        func.unnest(
+            literal(list(counts), ARRAY(String)),
+            literal(list(counts.values()), ARRAY(Integer)),
+        )
+        .table_valued("object_key", "count")
+        .render_derived(name="released")
+    )
+    result = await db.execute(
+        update(Blob)
+        .where(Blob.object_key == released.c.object_key)
+        .values(ref_count=Blob.ref_count - released.c.count)
+        .returning(Blob.object_key, Blob.ref_count)
+    )
+    ref_counts = dict(result.all())
+    # Keys without a blob row are not content-addressed: owned by the removed rows only
+    unreferenced = [key for key in counts if key not in ref_counts]
+    emptied = [key for key, ref_count in ref_counts.items() if ref_count <= 0]
+    if emptied:
+        result = await db.execute(
+            delete(Blob)
+            .where(Blob.object_key == any_(literal(emptied, ARRAY(String))))
+            .where(Blob.ref_count <= 0)
+            .returning(Blob.object_key)
+        )
+        unreferenced.extend(result.scalars().all())
+    return unreferenced
+
+
+async def get_referenced_keys(db: AsyncSession, object_keys: list[str]):
+    """Return which of the given keys are currently backed by a blob row.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        object_keys: Object keys to check.
+
+    Returns:
+        referenced: The subset of object_keys that are still referenced.
+    """
+    result = await db.execute(
+        select(Blob.object_key).where(Blob.object_key.in_(object_keys))
+    )
+    return set(result.scalars().all())
+
+
+async def store_file(db: AsyncSession, file: UploadFile, db_lock: asyncio.Lock | None = None):
+    """Store an uploaded file under its content-addressed key, skipping the transfer for duplicates.
+
+    Compressible files are stored zstd-compressed; the blob remembers the
+    encoding so later duplicates reuse it.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        file: Incoming uploaded file to store.
+        db_lock: Optional lock serializing use of db when several files are stored concurrently.
+
+    Returns:
+        stored: Dict with the ``object_key`` the document should reference and the file's
+        ``size``, ``content_type``, ``checksum`` and ``content_encoding``.
+    """
+    metadata = await inspect_file(file)
+    sha256 = metadata["checksum"]
+    async with db_lock or nullcontext():
+        blob = await acquire_blob(db, sha256)
+    if blob:
+        object_key, content_encoding = blob
+    else:
+        content_encoding = choose_content_encoding(
+            metadata["content_type"], metadata["size"]
+        )
+        object_key = content_object_key(sha256)
+        async with db_lock or nullcontext():
+            # The same content may be queued for deletion from an earlier blob; the
+            # entries stay locked until the new blob row commits, so the worker
+            # cannot delete the object between the upload and the registration
+            await cancel_deletions(db, [object_key])
+        await upload_file(
+            file, object_key, metadata["content_type"], content_encoding
+        )
+        async with db_lock or nullcontext():
+            await register_blob(
+                db, sha256, object_key, metadata["size"], content_encoding
+            )
+    return {"object_key": object_key, "content_encoding": content_encoding, **metadata}
@@ -1,24 +1,184 @@
-from sqlalchemy import select
+import base64
+from datetime import datetime
+from sqlalchemy import (
+    Integer,
+    Text,
+    all_,
+    any_,
+    bindparam,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from app.config import SEARCH_LANGUAGE
+from app.crud.project_event_crud import record_event
+from app.crud.project_usage_crud import apply_usage, consume_reservation
 from app.models.document_model import Document
+from app.models.user_project_model import UserProject
 from app.schemas.document_schema import DocumentUpdate
 
 
-async def get_documents_by_project(db: AsyncSession, project_id: int):
-    """Retrieve all documents belonging to a given project.
+def document_search_vector(name, content_text=None):
+    """Build a document's search vector, weighting its name above its content.
+
+    Args:
+        name: Document name, or a column expression holding it.
+        content_text: Extracted text, or a column expression holding it; None indexes the name alone.
+
+    Returns:
+        search_vector: SQL expression producing the ``tsvector``.
+    """
+    return func.setweight(func.to_tsvector(SEARCH_LANGUAGE, name), "A").op("||")(
+        func.setweight(
+            func.to_tsvector(SEARCH_LANGUAGE, func.coalesce(content_text, "")), "B"
+        )
+    )
+
+
+def encode_document_cursor(document) -> str:
+    """Return an opaque cursor pointing just after a document in listing order.
+
+    Args:
+        document: Last Document instance of the current page.
+
+    Returns:
+        cursor: URL-safe token to request the next page with.
+    """
+    raw = f"{document.created_at.isoformat()}|{document.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_document_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor built by encode_document_cursor.
+
+    Args:
+        cursor: Token received from a previous page.
+
+    Returns:
+        created_at: Creation time of the last document of the previous page.
+        document_id: ID of the last document of the previous page.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    created_at, document_id = (
+        base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    )
+    return datetime.fromisoformat(created_at), int(document_id)
+
+
+async def get_documents_by_project(
+    db: AsyncSession,
+    project_id: int,
+    name_prefix: str | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    content_type: str | None = None,
+    tags: list[str] | None = None,
+    after: tuple[datetime, int] | None = None,
+    limit: int | None = None,
+):
+    """Retrieve the documents of a project, newest first, with optional filters.
+
+    Results are ordered by (created_at, id) descending and paginated by keyset,
+    so every page is a range scan on the (project_id, created_at, id) index.
+    A tag filter is a containment test answered by the GIN index on tags.
 
     Args:
         db: Async SQLAlchemy session used for database access.
         project_id: ID of the project whose documents are requested.
+        name_prefix: Only return documents whose name starts with this value.
+        created_after: Only return documents created at or after this time.
+        created_before: Only return documents created before this time.
+        content_type: Only return documents with this content type.
+        tags: Only return documents carrying all of these (normalized) tags.
+        after: (created_at, id) of the last document of the previous page.
+        limit: Maximum number of documents to return; all of them when None.
 
     Returns:
         documents: The list of Document instances for the specified project.
     """
-    result = await db.execute(select(Document).where(Document.project_id == project_id))
+    query = select(Document).where(Document.project_id == project_id)
+    if name_prefix:
+        query = query.where(Document.name.startswith(name_prefix, autoescape=True))
+    if created_after:
+        query = query.where(Document.created_at >= created_after)
+    if created_before:
+        query = query.where(Document.created_at < created_before)
+    if content_type:
+        query = query.where(Document.content_type == content_type)
+    if tags:
+        query = query.where(Document.tags.contains(literal(tags, ARRAY(Text))))
+    if after:
+        query = query.where(tuple_(Document.created_at, Document.id) < after)
+    query = query.order_by(Document.created_at.desc(), Document.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    result = await db.execute(query)
     documents = result.scalars().all()
     return documents
 
 
+async def get_recent_documents_for_user(
+    db: AsyncSession,
+    user_id: int,
+    after: tuple[datetime, int] | None = None,
+    limit: int = 50,
+):
+    """Retrieve the newest documents across every project a user is a member of.
+
+    A LATERAL join takes at most ``limit`` entries from each of the user's
+    projects with a backward scan of the (project_id, created_at, id) index,
+    and only the overall newest are then read from the table. The cost
+    grows with the number of projects by one short index probe each, whatever
+    the number of documents they hold.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        user_id: ID of the user whose projects are read.
+        after: (created_at, id) of the last document of the previous page.
+        limit: Maximum number of documents to return.
+
+    Returns:
+        documents: Document instances, newest first, ordered by (created_at, id) descending.
+    """
+    recent = select(Document.id, Document.created_at).where(
+        Document.project_id == UserProject.project_id
+    )
+    if after:
+        recent = recent.where(tuple_(Document.created_at, Document.id) < after)
+    recent = (
+        recent.order_by(Document.created_at.desc(), Document.id.desc())
+        .limit(limit)
+        .lateral("recent")
+    )
+    newest = (
+        select(recent.c.id, recent.c.created_at)
+        .select_from(UserProject)
+        .join(recent, true())
+        .where(UserProject.user_id == user_id)
+        .order_by(recent.c.created_at.desc(), recent.c.id.desc())
+        .limit(limit)
+        .subquery("newest")
+    )
+    result = await db.execute(
+        select(Document)
+        .join(newest, Document.id == newest.c.id)
+        .order_by(newest.c.created_at.desc(), newest.c.id.desc())
+    )
+    return result.scalars().all()
+
+
 async def get_document_by_id(db: AsyncSession, document_id: int):
     """Retrieve a single document by its ID.
 
@@ -33,48 +193,637 @@ async def get_document_by_id(db: AsyncSession, document_id: int):
     return result.scalars().first()
 
 
-async def create_document(db: AsyncSession, project_id: int, name: str, url: str):
+async def get_document_by_object_key(db: AsyncSession, object_key: str):
+    """Retrieve the document owning an object key, if any.
+
+    Content-addressed ``blobs/`` keys are shared by many documents and never match.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        object_key: Storage key of the file.
+
+    Returns:
+        document: The Document instance owning the key if found; otherwise None.
+    """
+    result = await db.execute(
+        select(Document).where(
+            Document.object_key == object_key,
+            # Same predicate as the unique index, inlined so the planner can use it
+            Document.object_key.notlike(literal_column("'blobs/%'")),
+        )
+    )
+    return result.scalars().first()
+
+
+async def get_document_for_user(db: AsyncSession, document_id: int, user_id: int):
+    """Retrieve a document only if the user is a member of its project, in one query.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        document_id: ID of the document to fetch.
+        user_id: ID of the user who must be a member of the document's project.
+
+    Returns:
+        row: A ``(document, is_owner)`` row if the document exists and the user is a
+        member of its project; otherwise None.
+    """
+    result = await db.execute(
+        select(Document, UserProject.is_owner)
+        .join(UserProject, UserProject.project_id == Document.project_id)
+        .where(Document.id == document_id, UserProject.user_id == user_id)
+    )
+    return result.first()
+
+
+
+async def get_document_for_transfer(
+    db: AsyncSession, document_id: int, user_id: int, project_id: int
+):
+    """Retrieve a document and check membership of a destination project, in one query.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        document_id: ID of the document to fetch.
+        user_id: ID of the user who must be a member of the document's project.
+        project_id: ID of the project the document is moved or copied to.
+
+    Returns:
+        row: A ``(document, is_destination_member)`` row if the document exists and the
+        user is a member of its project; otherwise None.
+    """
+    destination = aliased(UserProject)
+    is_destination_member = (
+        exists()
+        .where(destination.user_id == user_id, destination.project_id == project_id)
+        .label("is_destination_member")
+    )
+    result = await db.execute(
+        select(Document, is_destination_member)
+        .join(UserProject, UserProject.project_id == Document.project_id)
+        .where(Document.id == document_id, UserProject.user_id == user_id)
+    )
+    return result.first()
+
+async def create_document(
+    db: AsyncSession,
+    project_id: int,
+    name: str,
+    object_key: str,
+    content_type: str | None = None,
+    size: int | None = None,
+    checksum: str | None = None,
+    preview_status: str | None = None,
+    content_encoding: str | None = None,
+    search_status: str | None = None,
+    reservation_id: int | None = None,
+):
     """Create and persist a new document for a project.
 
+    The project's usage counters and change feed are updated in the same
+    transaction, and the quota reservation taken for the upload, if any, is consumed.
+
     Args:
         db: Async SQLAlchemy session used for database access.
         project_id: ID of the project the document belongs to.
         name: Document name to store.
-        url: Public URL pointing to the stored file.
+        object_key: Storage key of the uploaded file.
+        content_type: MIME type of the uploaded file, if known.
+        size: Size of the uploaded file in bytes, if known.
+        checksum: SHA-256 hex digest of the uploaded file, if known.
+        preview_status: Initial preview status (``pending`` queues a thumbnail).
+        content_encoding: Encoding the file is stored with (e.g. ``zstd``), if any.
+        search_status: Initial search status (``pending`` queues text extraction).
+        reservation_id: Quota reservation the document's usage was reserved under, if any.
 
     Returns:
         db_document: The newly created Document instance.
     """
-    db_document = Document(project_id=project_id, name=name, url=url)
+    db_document = Document(
+        project_id=project_id,
+        name=name,
+        object_key=object_key,
+        content_type=content_type,
+        size=size,
+        checksum=checksum,
+        preview_status=preview_status,
+        content_encoding=content_encoding,
+        search_status=search_status,
+        # Searchable by name right away; the indexer adds the content later
+        search_vector=document_search_vector(name),
+    )
     db.add(db_document)
+    await db.flush()
+    await apply_usage(db, project_id, 1, size or 0)
+    await consume_reservation(db, reservation_id)
+    await record_event(
+        db, project_id, "document.created", {"id": db_document.id, "name": name}
+    )
     await db.commit()
     await db.refresh(db_document)
     return db_document
 
 
-async def update_document(db: AsyncSession, document_id: int, document: DocumentUpdate):
-    """Update a document's name and/or URL if it exists.
+async def create_documents(
+    db: AsyncSession,
+    project_id: int,
+    documents: list[dict],
+    reservation_id: int | None = None,
+):
+    """Create and persist several documents for a project with one batched INSERT.
+
+    The project's usage counters and change feed are updated in the same transaction.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        project_id: ID of the project the documents belong to.
+        documents: Dicts with ``name``, ``object_key`` and optionally ``content_type``,
+            ``size``, ``checksum``, ``preview_status``, ``content_encoding`` and
+            ``search_status``, one per document.
+        reservation_id: Quota reservation the documents' usage was reserved under, if any.
+
+    Returns:
+        db_documents: The newly created Document instances, in the same order as documents.
+    """
+    # Postgres does not promise RETURNING rows in VALUES order; sorting by
+    # parameter order lets callers pair each input with its document
+    result = await db.execute(
+        insert(Document)
+        .values(search_vector=document_search_vector(bindparam("search_name")))
+        .returning(Document, sort_by_parameter_order=True),
+        [
+            {
+                "project_id": project_id,
+                "name": document["name"],
+                "search_name": document["name"],
+                "object_key": document["object_key"],
+                "content_type": document.get("content_type"),
+                "size": document.get("size"),
+                "checksum": document.get("checksum"),
+                "preview_status": document.get("preview_status"),
+                "content_encoding": document.get("content_encoding"),
+                "search_status": document.get("search_status"),
+            }
+            for document in documents
+        ],
+    )
+    db_documents = result.scalars().all()
+    await apply_usage(
+        db,
+        project_id,
+        len(db_documents),
+        sum(document.get("size") or 0 for document in documents),
+    )
+    await consume_reservation(db, reservation_id)
+    if db_documents:
+        # One event for the whole batch instead of one per document
+        await record_event(
+            db,
+            project_id,
+            "documents.created",
+            {"ids": [db_document.id for db_document in db_documents]},
+        )
+    await db.commit()
+    return db_documents
+
+
+async def update_document(
+    db: AsyncSession,
+    document_id: int,
+    document: DocumentUpdate,
+    reservation_id: int | None = None,
+):
+    """Update a document's name, object key, file metadata and/or version number if it exists.
+
+    Only the fields set on the payload are written, and a field set to None is
+    written as NULL: the file metadata describes the new object, so values of
+    the previous file must not survive. A size change is applied to the
+    project's usage counters, and the change is published to the project's
+    change feed, in the same transaction.
 
     Args:
         db: Async SQLAlchemy session used for database access.
         document_id: ID of the document to update.
-        document: Payload containing optional name and url updates.
+        document: Payload containing optional name, object_key (with its content_encoding),
+            content_type, size, checksum, preview_status, search_status and version updates.
+        reservation_id: Quota reservation the new size was reserved under, if any.
 
     Returns:
         db_document: The updated Document instance if found; otherwise None.
     """
-    db_document = await get_document_by_id(db, document_id)
+    # Served from the identity map when the caller already loaded the document
+    db_document = await db.get(Document, document_id)
     if not db_document:
         return None
-    if document.name is not None:
+    changes = document.model_dump(exclude_unset=True)
+    if "name" in changes:
         db_document.name = document.name
-    if document.url is not None:
-        db_document.url = document.url
+        # Reindex the new name along with the text already extracted
+        db_document.search_vector = document_search_vector(
+            document.name, Document.content_text
+        )
+    if "object_key" in changes:
+        # The encoding describes the stored object, so it always follows the key
+        db_document.object_key = document.object_key
+        db_document.content_encoding = document.content_encoding
+    if "content_type" in changes:
+        db_document.content_type = document.content_type
+    if "size" in changes:
+        await apply_usage(
+            db,
+            db_document.project_id,
+            0,
+            (document.size or 0) - (db_document.size or 0),
+        )
+        db_document.size = document.size
+    if "checksum" in changes:
+        db_document.checksum = document.checksum
+    if "preview_status" in changes:
+        db_document.preview_status = document.preview_status
+    if "search_status" in changes:
+        db_document.search_status = document.search_status
+        # The old text stays searchable until the new file is indexed, unless it never will be
+        if document.search_status == "unsupported":
+            db_document.content_text = None
+            db_document.search_vector = document_search_vector(db_document.name)
+    if "version" in changes:
+        db_document.version = document.version
+    await consume_reservation(db, reservation_id)
+    await record_event(
+        db,
+        db_document.project_id,
+        "document.updated",
+        {"id": db_document.id, "name": db_document.name, "version": db_document.version},
+    )
     await db.commit()
     await db.refresh(db_document)
     return db_document
 
 
+async def get_documents_missing_metadata(db: AsyncSession, after_id: int, limit: int):
+    """Retrieve documents whose file size was never recorded, in ID order.
+
+    Documents whose object was already found missing are skipped.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        after_id: Only return documents with a greater ID (the last ID of the previous batch).
+        limit: Maximum number of documents to return.
+
+    Returns:
+        documents: The list of Document instances missing metadata.
+    """
+    result = await db.execute(
+        select(Document)
+        .where(
+            Document.size.is_(None),
+            Document.object_missing_at.is_(None),
+            Document.id > after_id,
+        )
+        .order_by(Document.id)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def update_document_metadata(
+    db: AsyncSession,
+    document_id: int,
+    size: int,
+    content_type: str | None,
+    checksum: str | None,
+):
+    """Record a document's file metadata without overwriting values already set.
+
+    The change is not committed, so a batch of documents can be committed at once.
+    A size recorded for the first time is added to the project's usage counters.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        document_id: ID of the document to update.
+        size: Size of the file in bytes.
+        content_type: MIME type of the file, if known.
+        checksum: SHA-256 hex digest of the file, if known.
+    """
+    result = await db.execute(
+        update(Document)
+        .where(Document.id == document_id, Document.size.is_(None))
+        .values(
+            size=size,
+            content_type=func.coalesce(Document.content_type, content_type),
+            checksum=func.coalesce(Document.checksum, checksum),
+        )
+        .returning(Document.project_id)
+    )
+    project_id = result.scalar_one_or_none()
+    if project_id is not None:
+        await apply_usage(db, project_id, 0, size)
+
+
+
+async def mark_documents_object_missing(db: AsyncSession, document_ids: list[int]):
+    """Record that the objects behind several documents do not exist (not committed).
+
+    The metadata backfill stops probing these documents.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        document_ids: IDs of the documents whose object is missing.
+    """
+    if not document_ids:
+        return
+    await db.execute(
+        update(Document)
+        .where(Document.id == any_(literal(document_ids, ARRAY(Integer))))
+        .values(object_missing_at=datetime.now())
+    )
+
+async def claim_pending_previews(db: AsyncSession, limit: int):
+    """Lock a batch of documents waiting for a preview, skipping rows locked by other workers.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        limit: Maximum number of documents to claim.
+
+    Returns:
+        documents: The claimed Document instances, oldest first.
+    """
+    result = await db.execute(
+        select(Document)
+        .where(Document.preview_status == "pending")
+        .order_by(Document.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return result.scalars().all()
+
+
+async def set_preview_status(db: AsyncSession, document_id: int, preview_status: str):
+    """Record the outcome of a preview render (not committed).
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        document_id: ID of the document.
+        preview_status: ``ready``, ``failed`` or ``unsupported``.
+    """
+    await db.execute(
+        update(Document)
+        .where(Document.id == document_id)
+        .values(preview_status=preview_status)
+    )
+
+
+async def claim_pending_search(db: AsyncSession, limit: int):
+    """Lock a batch of documents waiting for text extraction, skipping rows locked by other workers.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        limit: Maximum number of documents to claim.
+
+    Returns:
+        documents: The claimed Document instances, oldest first.
+    """
+    result = await db.execute(
+        select(Document)
+        .where(Document.search_status == "pending")
+        .order_by(Document.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return result.scalars().all()
+
+
+async def set_search_text(
+    db: AsyncSession, document_id: int, search_status: str, content_text: str | None
+):
+    """Record the outcome of a text extraction and refresh the search vector (not committed).
+
+    The document name is weighted above its content so title matches rank first;
+    documents without text are still indexed by name.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        document_id: ID of the document.
+        search_status: ``ready``, ``failed`` or ``unsupported``.
+        content_text: Extracted text; None clears the indexed content.
+    """
+    await db.execute(
+        update(Document)
+        .where(Document.id == document_id)
+        .values(
+            search_status=search_status,
+            content_text=content_text,
+            search_vector=document_search_vector(Document.name, content_text),
+        )
+    )
+
+
+async def search_documents(db: AsyncSession, project_id: int, query: str, limit: int):
+    """Full-text search a project's documents, best matches first.
+
+    Matching and ranking use the GIN-indexed search vector; snippets are only
+    built for the returned page, since ts_headline re-parses the whole text.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        project_id: ID of the project to search.
+        query: Search terms in web search syntax (quotes, ``or``, ``-``).
+        limit: Maximum number of documents to return.
+
+    Returns:
+        documents: Matching Document instances with ``rank`` and ``snippet`` attributes set.
+    """
+    ts_query = func.websearch_to_tsquery(SEARCH_LANGUAGE, query)
+    ranked = (
+        select(
+            Document.id,
+            func.ts_rank_cd(Document.search_vector, ts_query).label("rank"),
+        )
+        .where(Document.project_id == project_id)
+        .where(Document.search_vector.op("@@")(ts_query))
+        .order_by(func.ts_rank_cd(Document.search_vector, ts_query).desc(), Document.id.desc())
+        .limit(limit)
+        .subquery()
+    )
+    snippet = func.ts_headline(
+        SEARCH_LANGUAGE,
+        func.coalesce(Document.content_text, Document.name),
+        ts_query,
+        "MaxFragments=2, MaxWords=30, MinWords=10",
+    )
+    result = await db.execute(
+        select(Document, ranked.c.rank, snippet)
+        .join(ranked, Document.id == ranked.c.id)
+        .order_by(ranked.c.rank.desc(), Document.id.desc())
+    )
+    documents = []
+    for document, rank, document_snippet in result.all():
+        document.rank = rank
+        document.snippet = document_snippet
+        documents.append(document)
+    return documents
+
+
+async def move_document(db: AsyncSession, document_id: int, project_id: int):
+    """Move a document to another project; its file and versions are left untouched.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        document_id: ID of the document to move.
+        project_id: ID of the destination project.
+
+    Returns:
+        db_document: The moved Document instance if found; otherwise None.
+    """
+    db_document = await get_document_by_id(db, document_id)
+    if not db_document:
+        return None
+    size = db_document.size or 0
+    await apply_usage(db, db_document.project_id, -1, -size)
+    await apply_usage(db, project_id, 1, size)
+    await record_event(
+        db,
+        db_document.project_id,
+        "document.deleted",
+        {"id": document_id, "moved_to": project_id},
+    )
+    await record_event(
+        db,
+        project_id,
+        "document.created",
+        {"id": document_id, "name": db_document.name, "moved_from": db_document.project_id},
+    )
+    db_document.project_id = project_id
+    await db.commit()
+    await db.refresh(db_document)
+    return db_document
+
+
+async def delete_project_documents(
+    db: AsyncSession, project_id: int, document_ids: list[int]
+):
+    """Delete several documents of a project with a single statement (not committed).
+
+    The project's usage counters and change feed are updated in the same transaction.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        project_id: ID of the project the documents must belong to.
+        document_ids: IDs of the documents to delete; IDs from other projects are ignored.
+
+    Returns:
+        deleted: ``(id, object_key, size)`` of each deleted document.
+    """
+    result = await db.execute(
+        delete(Document)
+        .where(Document.project_id == project_id)
+        .where(Document.id == any_(literal(document_ids, ARRAY(Integer))))
+        .returning(Document.id, Document.object_key, Document.size)
+    )
+    deleted = result.all()
+    await apply_usage(
+        db, project_id, -len(deleted), -sum(row.size or 0 for row in deleted)
+    )
+    if deleted:
+        # One event for the whole batch instead of one per document
+        await record_event(
+            db, project_id, "documents.deleted", {"ids": [row.id for row in deleted]}
+        )
+    return deleted
+
+
+
+async def lock_project_document_keys(db: AsyncSession, project_id: int):
+    """Lock every document of a project and return their object keys (not committed).
+
+    No version can be archived for the locked documents until the caller's
+    transaction ends.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        project_id: ID of the project.
+
+    Returns:
+        object_keys: One key per document of the project.
+    """
+    result = await db.execute(
+        select(Document.object_key)
+        .where(Document.project_id == project_id)
+        .with_for_update()
+    )
+    return result.scalars().all()
+
+async def add_document_tags(
+    db: AsyncSession, project_id: int, document_ids: list[int], tags: list[str]
+):
+    """Add tags to several documents of a project with a single statement (not committed).
+
+    Documents that already carry every tag are not rewritten, so repeating a
+    request leaves no dead rows or index entries behind. Tags stay sorted and
+    unique on each document.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        project_id: ID of the project the documents must belong to.
+        document_ids: IDs of the documents to tag; IDs from other projects are ignored.
+        tags: Normalized tags to add.
+
+    Returns:
+        updated: IDs of the documents whose tags changed.
+    """
+    new_tags = literal(tags, ARRAY(Text))
+    tag = func.unnest(Document.tags.concat(new_tags)).column_valued("tag")
+    merged = select(tag).distinct().order_by(tag).scalar_subquery()
+    result = await db.execute(
+        update(Document)
+        .where(Document.project_id == project_id)
+        .where(Document.id == any_(literal(document_ids, ARRAY(Integer))))
+        .where(~Document.tags.contains(new_tags))
+        .values(tags=func.array(merged))
+        .returning(Document.id)
+    )
+    updated = result.scalars().all()
+    if updated:
+        await record_event(
+            db, project_id, "documents.tagged", {"ids": updated, "tags": tags}
+        )
+    return updated
+
+
+async def remove_document_tags(
+    db: AsyncSession, project_id: int, document_ids: list[int], tags: list[str]
+):
+    """Remove tags from several documents of a project with a single statement (not committed).
+
+    Only documents carrying at least one of the tags are rewritten.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        project_id: ID of the project the documents must belong to.
+        document_ids: IDs of the documents to untag; IDs from other projects are ignored.
+        tags: Normalized tags to remove.
+
+    Returns:
+        updated: IDs of the documents whose tags changed.
+    """
+    old_tags = literal(tags, ARRAY(Text))
+    tag = func.unnest(Document.tags).column_valued("tag")
+    kept = select(tag).where(tag != all_(old_tags)).order_by(tag).scalar_subquery()
+    result = await db.execute(
+        update(Document)
+        .where(Document.project_id == project_id)
+        .where(Document.id == any_(literal(document_ids, ARRAY(Integer))))
+        .where(Document.tags.overlap(old_tags))
+        .values(tags=func.array(kept))
+        .returning(Document.id)
+    )
+    updated = result.scalars().all()
+    if updated:
+        await record_event(
+            db, project_id, "documents.untagged", {"ids": updated, "tags": tags}
+        )
+    return updated
+
+
 async def delete_document(db: AsyncSession, document_id: int):
     """Delete a document by its ID if it exists.
 
@@ -85,9 +834,13 @@ async def delete_document(db: AsyncSession, document_id: int):
     Returns:
         True: Indicates the document was deleted successfully.
     """
-    db_document = await get_document_by_id(db, document_id)
+    db_document = await db.get(Document, document_id)
     if not db_document:
         return None
     await db.delete(db_document)
+    await apply_usage(db, db_document.project_id, -1, -(db_document.size or 0))
+    await record_event(
+        db, db_document.project_id, "document.deleted", {"id": document_id}
+    )
     await db.commit()
     return True
@@ -0,0 +1,195 @@
+from datetime import datetime, timedelta
+from sqlalchemy import Integer, any_, delete, insert, literal, select, true, union
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.document_model import Document
+from app.models.document_version_model import DocumentVersion
+
+
+async def archive_document(db: AsyncSession, db_document):
+    """Record the document's current name and object as a past version.
+
+    The change is not committed; it is persisted with the caller's document
+    change. The version takes over the document's reference to its object.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        db_document: Document instance about to be changed.
+    """
+    await db.execute(
+        insert(DocumentVersion).values(
+            document_id=db_document.id,
+            version=db_document.version,
+            name=db_document.name,
+            object_key=db_document.object_key,
+            content_type=db_document.content_type,
+            size=db_document.size,
+            checksum=db_document.checksum,
+            content_encoding=db_document.content_encoding,
+        )
+    )
+
+
+async def get_document_versions(
+    db: AsyncSession, document_id: int, before: int | None, limit: int
+):
+    """Retrieve a page of a document's past versions, newest first.
+
+    Pages are keyset-paginated on the version ID, so each page is a single
+    range scan on (document_id, id) however long the history is.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        document_id: ID of the document whose history is requested.
+        before: Only return versions with an ID lower than this one (the last ID of the previous page).
+        limit: Maximum number of versions to return.
+
+    Returns:
+        versions: The list of DocumentVersion instances for the page.
+    """
+    query = select(DocumentVersion).where(DocumentVersion.document_id == document_id)
+    if before is not None:
+        query = query.where(DocumentVersion.id < before)
+    result = await db.execute(query.order_by(DocumentVersion.id.desc()).limit(limit))
+    return result.scalars().all()
+
+
+async def get_document_version(db: AsyncSession, document_id: int, version_id: int):
+    """Retrieve a single past version of a document.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        document_id: ID of the document the version belongs to.
+        version_id: ID of the version to fetch.
+
+    Returns:
+        version: The matching DocumentVersion instance if found; otherwise None.
+    """
+    result = await db.execute(
+        select(DocumentVersion).where(
+            DocumentVersion.id == version_id,
+            DocumentVersion.document_id == document_id,
+        )
+    )
+    return result.scalars().first()
+
+
+async def get_document_version_keys(db: AsyncSession, document_id: int):
+    """Return the object keys referenced by a document's past versions.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        document_id: ID of the document.
+
+    Returns:
+        object_keys: One key per stored version.
+    """
+    result = await db.execute(
+        select(DocumentVersion.object_key).where(
+            DocumentVersion.document_id == document_id
+        )
+    )
+    return result.scalars().all()
+
+
+
+async def get_project_version_keys(db: AsyncSession, project_id: int):
+    """Return the object keys referenced by the past versions of a project's documents.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        project_id: ID of the project.
+
+    Returns:
+        object_keys: One key per stored version.
+    """
+    result = await db.execute(
+        select(DocumentVersion.object_key)
+        .join(Document, Document.id == DocumentVersion.document_id)
+        .where(Document.project_id == project_id)
+    )
+    return result.scalars().all()
+
+async def delete_versions_of_documents(
+    db: AsyncSession, project_id: int, document_ids: list[int]
+):
+    """Delete the past versions of several documents of a project (not committed).
+
+    The documents themselves are locked first, so no version can be archived
+    for them until the caller's transaction ends.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        project_id: ID of the project the documents must belong to.
+        document_ids: IDs of the documents.
+
+    Returns:
+        object_keys: One key per deleted version.
+    """
+    documents = (
+        select(Document.id)
+        .where(Document.project_id == project_id)
+        .where(Document.id == any_(literal(document_ids, ARRAY(Integer))))
+        .with_for_update()
+    )
+    result = await db.execute(
+        delete(DocumentVersion)
+        .where(DocumentVersion.document_id.in_(documents.scalar_subquery()))
+        .returning(DocumentVersion.object_key)
+    )
+    return result.scalars().all()
+
+
+async def prune_document_versions(
+    db: AsyncSession, keep: int, max_age_days: int, limit: int
+):
+    """Delete a batch of versions that fall outside the retention policy (not committed).
+
+    A version is expired when it is not among the ``keep`` most recent
+    versions of its document, or when it was archived more than
+    ``max_age_days`` ago. A value of 0 disables the corresponding rule.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        keep: Number of versions to keep per document.
+        max_age_days: Maximum age of a version in days.
+        limit: Maximum number of versions to delete in this batch.
+
+    Returns:
+        object_keys: Object keys of the deleted versions.
+    """
+    # Each rule is driven by an index, so a batch never ranks the whole table
+    candidates = []
+    if keep > 0:
+        # A document at version N has stored at most N - 1 versions
+        documents = (
+            select(Document.id).where(Document.version > keep + 1).subquery()
+        )
+        surplus = (
+            select(DocumentVersion.id)
+            .where(DocumentVersion.document_id == documents.c.id)
+            .order_by(DocumentVersion.id.desc())
+            .offset(keep)
+            .lateral()
+        )
+        candidates.append(
+            select(surplus.c.id).select_from(documents.join(surplus, true())).limit(limit)
+        )
+    if max_age_days > 0:
+        candidates.append(
+            select(DocumentVersion.id)
+            .where(
+                DocumentVersion.archived_at
+                < datetime.now() - timedelta(days=max_age_days)
+            )
+            .limit(limit)
+        )
+    if not candidates:
+        return []
+    expired = union(*candidates).subquery()
+    result = await db.execute(
+        delete(DocumentVersion)
+        .where(DocumentVersion.id.in_(select(expired.c.id).limit(limit)))
+        .returning(DocumentVersion.object_key)
+    )
+    return result.scalars().all()
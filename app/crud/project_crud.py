@@ -1,5 +1,6 @@
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.project_event_crud import record_event
 from app.models.project_model import Project
 from app.schemas.project_schema import ProjectCreate
 
@@ -61,6 +62,12 @@ async def update_project(
     if description:
         db_project.description = description
     db.add(db_project)
+    await record_event(
+        db,
+        project_id,
+        "project.updated",
+        {"name": db_project.name, "description": db_project.description},
+    )
     await db.commit()
     await db.refresh(db_project)
     return db_project
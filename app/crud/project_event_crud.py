@@ -0,0 +1,134 @@
+from datetime import datetime
+from sqlalchemy import (
+    BigInteger,
+    Text,
+    any_,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.project_event_model import ProjectEvent
+
+# Postgres NOTIFY channel announcing new events as {"id": ..., "project_id": ...}
+EVENTS_CHANNEL = "project_events"
+
+
+async def record_event(db: AsyncSession, project_id: int, event_type: str, data: dict):
+    """Record a project event and notify listeners when the transaction commits.
+
+    The event row and the NOTIFY are sent in one statement and are not
+    committed, so listeners only hear about changes that were persisted.
+    The notification carries the event ID only, keeping it well below the
+    NOTIFY payload limit whatever the size of the event data.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        project_id: ID of the project the event belongs to.
+        event_type: Kind of change, e.g. ``document.created``.
+        data: JSON-serializable details of the change.
+    """
+    inserted = (
+        insert(ProjectEvent)
+        .values(
+            project_id=project_id,
+            event_type=event_type,
+            data=data,
+            created_at=datetime.now(),
+        )
+        .returning(ProjectEvent.id, ProjectEvent.project_id)
+        .cte("inserted")
+    )
+    # Keys are inlined: json_build_object takes "any" arguments, whose type
+    # Postgres cannot infer from bound parameters
+    payload = cast(
+        func.json_build_object(
+            literal_column("'id'"),
+            inserted.c.id,
+            literal_column("'project_id'"),
+            inserted.c.project_id,
+        ),
+        Text,
+    )
+    await db.execute(select(func.pg_notify(EVENTS_CHANNEL, payload)))
+
+
+async def get_events(db: AsyncSession, event_ids: list[int]):
+    """Retrieve events by ID, in ID order.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        event_ids: IDs of the events to fetch.
+
+    Returns:
+        events: The matching ProjectEvent instances.
+    """
+    result = await db.execute(
+        select(ProjectEvent)
+        .where(ProjectEvent.id == any_(literal(event_ids, ARRAY(BigInteger))))
+        .order_by(ProjectEvent.id)
+    )
+    return result.scalars().all()
+
+
+async def get_project_events_after(
+    db: AsyncSession, project_id: int, after_id: int, limit: int
+):
+    """Retrieve a project's events recorded after a given event, oldest first.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        project_id: ID of the project.
+        after_id: Only return events with a greater ID (the client's Last-Event-ID).
+        limit: Maximum number of events to return.
+
+    Returns:
+        events: The list of ProjectEvent instances.
+    """
+    result = await db.execute(
+        select(ProjectEvent)
+        .where(ProjectEvent.project_id == project_id, ProjectEvent.id > after_id)
+        .order_by(ProjectEvent.id)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def get_oldest_event_id(db: AsyncSession):
+    """Return the ID of the oldest retained event, or None if there are none.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        event_id: Smallest event ID still stored.
+    """
+    result = await db.execute(select(func.min(ProjectEvent.id)))
+    return result.scalar()
+
+
+async def delete_events_before(db: AsyncSession, cutoff: datetime, limit: int) -> int:
+    """Delete one batch of events recorded before a cutoff (not committed).
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        cutoff: Events created before this time are deleted.
+        limit: Maximum number of events to delete.
+
+    Returns:
+        deleted: Number of events deleted.
+    """
+    batch = (
+        select(ProjectEvent.id)
+        .where(ProjectEvent.created_at < cutoff)
+        .order_by(ProjectEvent.id)
+        .limit(limit)
+        .scalar_subquery()
+    )
+    result = await db.execute(delete(ProjectEvent).where(ProjectEvent.id.in_(batch)))
+    return result.rowcount
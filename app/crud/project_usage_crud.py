@@ -0,0 +1,248 @@
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import PROJECT_MAX_BYTES, PROJECT_MAX_DOCUMENTS, QUOTA_RESERVATION_TTL
+from app.models.project_usage_model import ProjectUsage
+from app.models.quota_reservation_model import QuotaReservation
+from app.models.upload_session_model import UploadSession
+
+
+class QuotaExceededError(Exception):
+    """Raised when a change would take a project over its document or byte quota."""
+
+
+def quotas_enabled() -> bool:
+    """Return whether any project quota is configured (0 means unlimited)."""
+    return bool(PROJECT_MAX_DOCUMENTS or PROJECT_MAX_BYTES)
+
+
+async def apply_usage(db: AsyncSession, project_id: int, documents: int, size: int):
+    """Add to a project's usage counters.
+
+    The change is not committed, so the counters move in the same transaction
+    as the document rows they describe.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        project_id: ID of the project whose usage changes.
+        documents: Change in the number of documents (negative when deleting).
+        size: Change in bytes (negative when deleting).
+    """
+    if not documents and not size:
+        return
+    statement = pg_insert(ProjectUsage).values(
+        project_id=project_id, document_count=documents, total_bytes=size
+    )
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[ProjectUsage.project_id],
+            set_={
+                "document_count": ProjectUsage.document_count + documents,
+                "total_bytes": ProjectUsage.total_bytes + size,
+            },
+        )
+    )
+
+
+async def get_project_usage(db: AsyncSession, project_id: int) -> dict:
+    """Return a project's usage counters and the usage reserved by uploads in progress.
+
+    Reserved usage comes from live quota reservations and resumable upload
+    sessions; documents themselves are never scanned.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        project_id: ID of the project.
+
+    Returns:
+        usage: Dict with ``document_count``, ``total_bytes``, ``reserved_documents`` and ``reserved_bytes``.
+    """
+    now = datetime.now()
+    live_reservations = (
+        QuotaReservation.project_id == project_id, QuotaReservation.expires_at > now
+    )
+    live_sessions = (UploadSession.project_id == project_id, UploadSession.expires_at > now)
+    result = await db.execute(
+        select(
+            select(ProjectUsage.document_count)
+            .where(ProjectUsage.project_id == project_id)
+            .scalar_subquery(),
+            select(ProjectUsage.total_bytes)
+            .where(ProjectUsage.project_id == project_id)
+            .scalar_subquery(),
+            select(func.coalesce(func.sum(QuotaReservation.documents), 0))
+            .where(*live_reservations)
+            .scalar_subquery(),
+            select(func.coalesce(func.sum(QuotaReservation.size), 0))
+            .where(*live_reservations)
+            .scalar_subquery(),
+            select(func.count()).where(*live_sessions).scalar_subquery(),
+            select(func.coalesce(func.sum(UploadSession.size), 0))
+            .where(*live_sessions)
+            .scalar_subquery(),
+        )
+    )
+    (
+        document_count,
+        total_bytes,
+        reserved_documents,
+        reserved_bytes,
+        session_documents,
+        session_bytes,
+    ) = result.one()
+    return {
+        "document_count": document_count or 0,
+        "total_bytes": total_bytes or 0,
+        "reserved_documents": reserved_documents + session_documents,
+        "reserved_bytes": reserved_bytes + session_bytes,
+    }
+
+
+async def lock_project_usage(db: AsyncSession, project_id: int):
+    """Lock a project's usage row until the transaction ends, creating it if missing.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        project_id: ID of the project.
+    """
+    await lock_project_usages(db, [project_id])
+
+
+async def lock_project_usages(db: AsyncSession, project_ids: list[int]):
+    """Lock several projects' usage rows until the transaction ends, creating missing ones.
+
+    Rows are locked in ascending project ID order, so two transactions touching
+    the same projects (e.g. moves in opposite directions) cannot deadlock.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        project_ids: IDs of the projects.
+    """
+    project_ids = sorted(set(project_ids))
+    await db.execute(
+        pg_insert(ProjectUsage)
+        .values(
+            [
+                {"project_id": project_id, "document_count": 0, "total_bytes": 0}
+                for project_id in project_ids
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=[ProjectUsage.project_id])
+    )
+    await db.execute(
+        select(ProjectUsage.project_id)
+        .where(ProjectUsage.project_id.in_(project_ids))
+        .order_by(ProjectUsage.project_id)
+        .with_for_update()
+    )
+
+
+async def check_quota(db: AsyncSession, project_id: int, documents: int, size: int):
+    """Verify a project can take more documents and bytes, locking its usage row.
+
+    The lock serializes quota checks per project until the caller commits or
+    rolls back, so concurrent uploads cannot both squeeze under the limit.
+    Nothing is committed.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        project_id: ID of the project that grows.
+        documents: Number of documents about to be added.
+        size: Number of bytes about to be added.
+
+    Raises:
+        QuotaExceededError: If the change would exceed PROJECT_MAX_DOCUMENTS or PROJECT_MAX_BYTES.
+    """
+    if not quotas_enabled():
+        return
+    await lock_project_usage(db, project_id)
+    usage = await get_project_usage(db, project_id)
+    if PROJECT_MAX_DOCUMENTS and (
+        usage["document_count"] + usage["reserved_documents"] + documents
+        > PROJECT_MAX_DOCUMENTS
+    ):
+        raise QuotaExceededError(
+            f"Project document limit of {PROJECT_MAX_DOCUMENTS} reached"
+        )
+    if PROJECT_MAX_BYTES and (
+        usage["total_bytes"] + usage["reserved_bytes"] + size > PROJECT_MAX_BYTES
+    ):
+        raise QuotaExceededError(
+            f"Project storage limit of {PROJECT_MAX_BYTES} bytes reached"
+        )
+
+
+async def reserve_usage(db: AsyncSession, project_id: int, documents: int, size: int):
+    """Reserve quota for a transfer before it starts, and commit the reservation.
+
+    The reservation counts against the project until it is consumed by the
+    document change, released, or it expires after QUOTA_RESERVATION_TTL seconds.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        project_id: ID of the project that grows.
+        documents: Number of documents about to be added.
+        size: Number of bytes about to be added.
+
+    Returns:
+        reservation_id: ID of the reservation; None when no quota is configured.
+
+    Raises:
+        QuotaExceededError: If the reservation would exceed the project's quota.
+    """
+    if not quotas_enabled():
+        return None
+    try:
+        await check_quota(db, project_id, documents, size)
+    except QuotaExceededError:
+        await db.rollback()
+        raise
+    now = datetime.now()
+    await db.execute(
+        delete(QuotaReservation).where(
+            QuotaReservation.project_id == project_id, QuotaReservation.expires_at <= now
+        )
+    )
+    result = await db.execute(
+        insert(QuotaReservation)
+        .values(
+            project_id=project_id,
+            documents=documents,
+            size=size,
+            expires_at=now + timedelta(seconds=QUOTA_RESERVATION_TTL),
+        )
+        .returning(QuotaReservation.id)
+    )
+    reservation_id = result.scalar_one()
+    await db.commit()
+    return reservation_id
+
+
+async def consume_reservation(db: AsyncSession, reservation_id: int | None):
+    """Drop a reservation whose usage is now recorded in the counters (not committed).
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        reservation_id: ID returned by reserve_usage, or None.
+    """
+    if reservation_id is None:
+        return
+    await db.execute(delete(QuotaReservation).where(QuotaReservation.id == reservation_id))
+
+
+async def release_reservation(db: AsyncSession, reservation_id: int | None):
+    """Give back a reservation after a failed transfer.
+
+    Uncommitted changes of the failed operation are rolled back first, so only
+    the release is committed.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        reservation_id: ID returned by reserve_usage, or None.
+    """
+    if reservation_id is None:
+        return
+    await db.rollback()
+    await consume_reservation(db, reservation_id)
+    await db.commit()
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+from sqlalchemy import String, any_, delete, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.storage_deletion_model import StorageDeletion
+from app.config import DELETION_BASE_BACKOFF, DELETION_MAX_BACKOFF
+
+
+async def enqueue_deletions(db: AsyncSession, object_keys: list[str]):
+    """Queue objects for deletion from storage.
+
+    The change is not committed, so the queue entries are written in the same
+    transaction as the caller's row changes.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        object_keys: Keys of the objects to delete.
+    """
+    if not object_keys:
+        return
+    # One array parameter instead of one per row, so large batches stay a single statement
+    await db.execute(
+        insert(StorageDeletion).from_select(
+            ["object_key"], select(func.unnest(literal(object_keys, ARRAY(String))))
+        )
+    )
+
+
+async def cancel_deletions(db: AsyncSession, object_keys: list[str]):
+    """Drop queued deletions of objects that are about to be stored again (not committed).
+
+    Entries claimed by the deletion worker are waited for, so by the time this
+    returns the worker is either done with the object or will never see the
+    entries; the caller may then write the object safely.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        object_keys: Keys of the objects being stored.
+    """
+    await db.execute(
+        delete(StorageDeletion).where(
+            StorageDeletion.object_key == any_(literal(object_keys, ARRAY(String)))
+        )
+    )
+
+
+async def claim_due_deletions(db: AsyncSession, limit: int):
+    """Lock a batch of queued deletions that are due, skipping rows locked by other workers.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        limit: Maximum number of entries to claim.
+
+    Returns:
+        deletions: The claimed StorageDeletion instances, oldest first.
+    """
+    result = await db.execute(
+        select(StorageDeletion)
+        .where(StorageDeletion.next_attempt_at <= datetime.now())
+        .order_by(StorageDeletion.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return result.scalars().all()
+
+
+async def complete_deletions(db: AsyncSession, deletion_ids: list[int]):
+    """Remove finished entries from the queue (not committed).
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        deletion_ids: IDs of the entries whose objects are gone.
+    """
+    if not deletion_ids:
+        return
+    await db.execute(delete(StorageDeletion).where(StorageDeletion.id.in_(deletion_ids)))
+
+
+async def retry_deletions(db: AsyncSession, deletions: list, errors: dict[str, str]):
+    """Reschedule failed entries with exponential backoff (not committed).
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        deletions: StorageDeletion instances whose objects could not be deleted.
+        errors: Error message by object key.
+    """
+    now = datetime.now()
+    for deletion in deletions:
+        backoff = min(DELETION_BASE_BACKOFF * 2 ** deletion.attempts, DELETION_MAX_BACKOFF)
+        await db.execute(
+            update(StorageDeletion)
+            .where(StorageDeletion.id == deletion.id)
+            .values(
+                attempts=StorageDeletion.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=backoff),
+                last_error=errors.get(deletion.object_key),
+            )
+        )
+
+
+async def get_deletion_backlog(db: AsyncSession):
+    """Return the size and age of the deletion queue.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+
+    Returns:
+        pending: Number of queued entries.
+        oldest: Enqueue time of the oldest entry, or None if the queue is empty.
+    """
+    result = await db.execute(
+        select(func.count(StorageDeletion.id), func.min(StorageDeletion.enqueued_at))
+    )
+    pending, oldest = result.one()
+    return pending, oldest
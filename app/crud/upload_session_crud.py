@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta
+from sqlalchemy import cast, delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import UPLOAD_SESSION_TTL
+from app.models.upload_session_model import UploadSession
+
+
+async def create_upload_session(
+    db: AsyncSession,
+    upload_id: str,
+    project_id: int,
+    user_id: int,
+    filename: str,
+    object_key: str,
+    s3_upload_id: str,
+    size: int,
+):
+    """Create and persist a resumable upload session.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        upload_id: Public, unguessable ID of the session.
+        project_id: ID of the project the document will be created in.
+        user_id: ID of the user uploading the file.
+        filename: Name of the file being uploaded.
+        object_key: Object key the file is assembled under.
+        s3_upload_id: ID of the S3 multipart upload backing the session.
+        size: Total size of the file in bytes.
+
+    Returns:
+        db_session: The newly created UploadSession instance.
+    """
+    result = await db.execute(
+        insert(UploadSession)
+        .values(
+            id=upload_id,
+            project_id=project_id,
+            user_id=user_id,
+            filename=filename,
+            object_key=object_key,
+            s3_upload_id=s3_upload_id,
+            size=size,
+            upload_offset=0,
+            parts=[],
+            expires_at=datetime.now() + timedelta(seconds=UPLOAD_SESSION_TTL),
+        )
+        .returning(UploadSession)
+    )
+    db_session = result.scalars().first()
+    await db.commit()
+    return db_session
+
+
+async def get_upload_session(db: AsyncSession, upload_id: str):
+    """Retrieve an upload session by its ID.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        upload_id: ID of the session.
+
+    Returns:
+        db_session: The UploadSession instance if found; otherwise None.
+    """
+    result = await db.execute(select(UploadSession).where(UploadSession.id == upload_id))
+    return result.scalars().first()
+
+
+async def advance_upload_session(
+    db: AsyncSession,
+    upload_id: str,
+    upload_offset: int,
+    length: int,
+    part: dict,
+    content_type: str | None,
+) -> bool:
+    """Record a stored chunk and move the session's offset past it.
+
+    The update only applies while the session is still at upload_offset, so
+    two concurrent requests for the same chunk cannot both advance it. Every
+    accepted chunk also pushes the session's expiry back.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        upload_id: ID of the session.
+        upload_offset: Offset the chunk was written at.
+        length: Size of the chunk in bytes.
+        part: ``{"PartNumber", "ETag"}`` of the S3 part holding the chunk.
+        content_type: Detected MIME type of the file, set from its first chunk.
+
+    Returns:
+        True: If the session advanced; False if it was not at upload_offset anymore.
+    """
+    result = await db.execute(
+        update(UploadSession)
+        .where(UploadSession.id == upload_id)
+        .where(UploadSession.upload_offset == upload_offset)
+        .values(
+            upload_offset=UploadSession.upload_offset + length,
+            parts=UploadSession.parts.op("||")(cast([part], JSONB)),
+            content_type=func.coalesce(UploadSession.content_type, content_type),
+            expires_at=datetime.now() + timedelta(seconds=UPLOAD_SESSION_TTL),
+        )
+        .returning(UploadSession.id)
+    )
+    advanced = result.first() is not None
+    await db.commit()
+    return advanced
+
+
+async def delete_upload_session(db: AsyncSession, upload_id: str) -> bool:
+    """Remove an upload session (not committed).
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        upload_id: ID of the session.
+
+    Returns:
+        True: If the session existed; False if another request already removed it.
+    """
+    result = await db.execute(
+        delete(UploadSession)
+        .where(UploadSession.id == upload_id)
+        .returning(UploadSession.id)
+    )
+    return result.first() is not None
+
+
+async def claim_expired_upload_sessions(db: AsyncSession, limit: int):
+    """Lock a batch of expired upload sessions, skipping rows locked by other workers.
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        limit: Maximum number of sessions to claim.
+
+    Returns:
+        sessions: The claimed UploadSession instances, oldest expiry first.
+    """
+    result = await db.execute(
+        select(UploadSession)
+        .where(UploadSession.expires_at <= datetime.now())
+        .order_by(UploadSession.expires_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return result.scalars().all()
+
+
+async def delete_upload_sessions(db: AsyncSession, upload_ids: list[str]):
+    """Remove several upload sessions (not committed).
+
+    Args:
+        db: Async SQLAlchemy session used for database access.
+        upload_ids: IDs of the sessions to remove.
+    """
+    if not upload_ids:
+        return
+    await db.execute(delete(UploadSession).where(UploadSession.id.in_(upload_ids)))
@@ -1,5 +1,6 @@
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.project_event_crud import record_event
 from app.models.user_project_model import UserProject
 from app.schemas.user_project_schema import UserProjectCreate
 from sqlalchemy.orm import selectinload
@@ -21,6 +22,12 @@ async def create_user_project(db: AsyncSession, user_project: UserProjectCreate)
         is_owner=user_project.is_owner,
     )
     db.add(db_user_project)
+    await record_event(
+        db,
+        user_project.project_id,
+        "member.added",
+        {"user_id": user_project.user_id, "is_owner": user_project.is_owner},
+    )
     await db.commit()
     await db.refresh(db_user_project)
     return db_user_project
@@ -1,38 +1,123 @@
 from fastapi import FastAPI
-from app.routers import user_route, project_route, document_route
+from starlette.formparsers import MultiPartParser
+from app.routers import (
+    user_route,
+    project_route,
+    document_route,
+    upload_route,
+    storage_route,
+    event_route,
+    me_route,
+)
 from app.database import Base, engine
-from app.config import use_sql_init
+from app.config import (
+    UPLOAD_BUDGET_WAIT,
+    UPLOAD_CONCURRENCY_LIMIT,
+    UPLOAD_INFLIGHT_BUDGET,
+    UPLOAD_PER_USER_CONCURRENCY,
+    UPLOAD_QUEUE_SIZE,
+    UPLOAD_REQUEST_MAX_SIZE,
+    UPLOAD_SPOOL_MAX_SIZE,
+    use_sql_init,
+)
+from app.middleware import UploadLimitMiddleware
+from app.services.aws_setup import s3_executor
+from app.services.upload_admission import UploadAdmission
+from app.services.background import start_background_worker, stop_background_workers
+from app.services.deletion_worker import run_deletion_worker
+from app.services.version_pruner import run_version_pruner
+from app.services.metadata_backfill import run_metadata_backfill
+from app.services.preview_worker import run_preview_worker
+from app.services.previews import preview_executor
+from app.services.search_indexer import run_search_indexer
+from app.services.upload_session_sweeper import run_upload_session_sweeper
+from app.services.project_events import project_event_hub, run_project_event_pruner
+from app.services.text_extraction import extraction_executor
+from app.services.metrics import metrics
 from app.sql.squema import (
     create_users_table,
     create_projects_table,
     create_documents_table,
-    create_users_projects_table)
+    create_users_projects_table,
+    create_blobs_table,
+    create_storage_deletions_table,
+    create_document_versions_table,
+    create_upload_sessions_table,
+    create_project_usage_table,
+    create_quota_reservations_table,
+    create_project_events_table,
+    migrations)
 from sqlalchemy import text
 
+# Uploaded files are kept in memory up to this size, then spilled to a temporary file
+MultiPartParser.spool_max_size = UPLOAD_SPOOL_MAX_SIZE
+
 app = FastAPI()
+app.add_middleware(
+    UploadLimitMiddleware,
+    max_size=UPLOAD_REQUEST_MAX_SIZE,
+    budget=UPLOAD_INFLIGHT_BUDGET,
+    wait=UPLOAD_BUDGET_WAIT,
+    admission=UploadAdmission(
+        UPLOAD_CONCURRENCY_LIMIT, UPLOAD_PER_USER_CONCURRENCY, UPLOAD_QUEUE_SIZE
+    ),
+)
 
 
 @app.on_event("startup")
 async def on_startup():
-    if not use_sql_init():
-        print("Creating db with ORM")
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        return
     async with engine.begin() as conn:
-        print("Creating db with SQL")
-        await conn.execute(text(create_users_table))
-        await conn.execute(text(create_projects_table))
-        await conn.execute(text(create_documents_table))
-        await conn.execute(text(create_users_projects_table))
+        if not use_sql_init():
+            print("Creating db with ORM")
+            await conn.run_sync(Base.metadata.create_all)
+        else:
+            print("Creating db with SQL")
+            await conn.execute(text(create_users_table))
+            await conn.execute(text(create_projects_table))
+            await conn.execute(text(create_documents_table))
+            await conn.execute(text(create_users_projects_table))
+            await conn.execute(text(create_blobs_table))
+            await conn.execute(text(create_storage_deletions_table))
+            await conn.execute(text(create_document_versions_table))
+            await conn.execute(text(create_upload_sessions_table))
+            await conn.execute(text(create_project_usage_table))
+            await conn.execute(text(create_quota_reservations_table))
+            await conn.execute(text(create_project_events_table))
+        for statement in migrations:
+            await conn.execute(text(statement))
+    start_background_worker(run_deletion_worker)
+    start_background_worker(run_version_pruner)
+    start_background_worker(run_metadata_backfill)
+    start_background_worker(run_preview_worker)
+    start_background_worker(run_search_indexer)
+    start_background_worker(run_upload_session_sweeper)
+    start_background_worker(project_event_hub.run)
+    start_background_worker(run_project_event_pruner)
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await stop_background_workers()
+    s3_executor.shutdown(wait=True)
+    preview_executor.shutdown(wait=True)
+    extraction_executor.shutdown(wait=True)
 
 
 app.include_router(user_route.router)
 app.include_router(project_route.router)
 app.include_router(project_route.router_project)
 app.include_router(document_route.router)
+app.include_router(upload_route.router)
+app.include_router(storage_route.router)
+app.include_router(event_route.router)
+app.include_router(me_route.router)
 
 
 @app.get("/")
 async def healthcheck():
     return {"health": "OK"}
+
+
+@app.get("/metrics")
+async def get_metrics():
+    return metrics
@@ -0,0 +1,127 @@
+from fastapi import HTTPException
+import jwt
+from starlette.datastructures import Headers
+from starlette.requests import cookie_parser
+from starlette.responses import JSONResponse
+from app.config import SECRET_KEY
+from app.services.metrics import increment, set_gauge
+from app.services.upload_admission import UploadAdmission
+from app.services.upload_budget import ByteBudget
+
+# Request bodies carrying file data: form uploads and resumable upload chunks.
+UPLOAD_CONTENT_TYPES = ("multipart/form-data", "application/offset+octet-stream")
+
+
+def upload_client_key(scope, headers: Headers) -> str:
+    """Return who an upload is charged to for per-user admission limits.
+
+    The JWT is only verified, not looked up: authentication still happens in
+    the endpoint. Requests without a valid token are grouped by client address.
+
+    Args:
+        scope: ASGI connection scope of the request.
+        headers: Headers of the request.
+
+    Returns:
+        key: ``user:<id>`` for authenticated requests, ``ip:<address>`` otherwise.
+    """
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        token = cookie_parser(headers.get("cookie", "")).get("session_token")
+    if token:
+        try:
+            user_id = jwt.decode(token, SECRET_KEY, algorithms=["HS256"]).get("user_id")
+        except (jwt.PyJWTError, TypeError):
+            # TypeError: no SECRET_KEY configured
+            user_id = None
+        if user_id:
+            return f"user:{user_id}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+def _busy_response() -> JSONResponse:
+    return JSONResponse(
+        {"detail": "Too many uploads in progress"},
+        status_code=503,
+        headers={"Retry-After": "1"},
+    )
+
+
+class UploadLimitMiddleware:
+    """Cap the size of upload requests and the bytes all uploads hold at once.
+
+    Requests declaring a Content-Length above max_size are rejected before
+    their body is read. With an admission controller, an upload first takes
+    one of its slots, queueing fairly behind other users' uploads. Every
+    upload then reserves its size from a shared budget until its response is
+    sent. When no slot or budget frees up within wait seconds, the request
+    gets a 503 with Retry-After.
+    """
+
+    def __init__(
+        self,
+        app,
+        max_size: int,
+        budget: int,
+        wait: float,
+        admission: UploadAdmission | None = None,
+    ):
+        self.app = app
+        self.max_size = max_size
+        self.budget = ByteBudget(budget)
+        self.wait = wait
+        self.admission = admission
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").startswith(UPLOAD_CONTENT_TYPES):
+            return await self.app(scope, receive, send)
+
+        try:
+            length = int(headers["content-length"]) if "content-length" in headers else None
+        except ValueError:
+            return await JSONResponse(
+                {"detail": "Invalid Content-Length"}, status_code=400
+            )(scope, receive, send)
+        if length is not None and length > self.max_size:
+            increment("upload_rejected_too_large_total")
+            return await JSONResponse(
+                {"detail": "Upload too large"}, status_code=413
+            )(scope, receive, send)
+
+        client_key = upload_client_key(scope, headers)
+        if self.admission and not await self.admission.acquire(client_key, self.wait):
+            increment("upload_rejected_busy_total")
+            return await _busy_response()(scope, receive, send)
+
+        # Chunked uploads do not announce their size, so they reserve the maximum
+        reserved = length if length is not None else self.max_size
+        if not await self.budget.acquire(reserved, self.wait):
+            if self.admission:
+                self.admission.release(client_key)
+            increment("upload_rejected_busy_total")
+            return await _busy_response()(scope, receive, send)
+        set_gauge("upload_inflight_bytes", self.budget.in_use)
+
+        limit = length if length is not None else self.max_size
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail="Upload too large")
+            return message
+
+        try:
+            await self.app(scope, limited_receive, send)
+        finally:
+            self.budget.release(reserved)
+            set_gauge("upload_inflight_bytes", self.budget.in_use)
+            if self.admission:
+                self.admission.release(client_key)
@@ -0,0 +1,13 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
+from app.database import Base
+
+
+class Blob(Base):
+    __tablename__ = "blobs"
+    sha256 = Column(String(64), primary_key=True)
+    object_key = Column(String, unique=True, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    content_encoding = Column(String, nullable=True)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
@@ -1,6 +1,16 @@
 from datetime import datetime
-from sqlalchemy import Column, ForeignKey, Integer, String, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    DateTime,
+    Text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from app.database import Base
 
 
@@ -8,7 +18,46 @@ class Document(Base):
     __tablename__ = "documents"
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
-    url = Column(String, index=True, nullable=False)
+    object_key = Column(String, nullable=False)
+    content_type = Column(String, nullable=True)
+    size = Column(BigInteger, nullable=True)
+    checksum = Column(String(64), nullable=True)
+    # Set when the metadata backfill found no object behind the key
+    object_missing_at = Column(DateTime, nullable=True)
+    content_encoding = Column(String, nullable=True)
+    preview_status = Column(String, nullable=True)
+    search_status = Column(String, nullable=True)
+    # Only read by full-text queries in SQL; kept out of regular document loads
+    content_text = deferred(Column(Text, nullable=True))
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
+    # Normalized (trimmed, lowercase) and kept sorted; queried with @> through a GIN index
+    tags = Column(ARRAY(Text), nullable=False, default=list, server_default="{}")
+    version = Column(Integer, nullable=False, default=1)
     created_at = Column(DateTime, nullable=False, default=datetime.now)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
     project = relationship("Project", back_populates="documents")
+
+    __table_args__ = (
+        Index(
+            "ix_documents_project_id_created_at_id", "project_id", "created_at", "id"
+        ),
+        Index("ix_documents_version", "version"),
+        Index(
+            "ix_documents_object_key_unique",
+            "object_key",
+            unique=True,
+            postgresql_where=object_key.notlike("blobs/%"),
+        ),
+        Index(
+            "ix_documents_preview_pending",
+            "id",
+            postgresql_where=preview_status == "pending",
+        ),
+        Index(
+            "ix_documents_search_pending",
+            "id",
+            postgresql_where=search_status == "pending",
+        ),
+        Index("ix_documents_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_documents_tags", "tags", postgresql_using="gin"),
+    )
@@ -0,0 +1,24 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String
+from app.database import Base
+
+
+class DocumentVersion(Base):
+    __tablename__ = "document_versions"
+    id = Column(BigInteger, primary_key=True)
+    document_id = Column(
+        Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False
+    )
+    version = Column(Integer, nullable=False)
+    name = Column(String, nullable=False)
+    object_key = Column(String, nullable=False)
+    content_type = Column(String, nullable=True)
+    size = Column(BigInteger, nullable=True)
+    checksum = Column(String(64), nullable=True)
+    content_encoding = Column(String, nullable=True)
+    archived_at = Column(DateTime, nullable=False, default=datetime.now)
+
+    __table_args__ = (
+        Index("ix_document_versions_document_id_id", "document_id", "id"),
+        Index("ix_document_versions_archived_at", "archived_at"),
+    )
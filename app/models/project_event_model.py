@@ -0,0 +1,19 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+from app.database import Base
+
+
+class ProjectEvent(Base):
+    __tablename__ = "project_events"
+    id = Column(BigInteger, primary_key=True)
+    project_id = Column(
+        Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False
+    )
+    # e.g. document.created, document.updated, document.deleted, member.added
+    event_type = Column(String, nullable=False)
+    data = Column(JSONB, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.now, index=True)
+
+    # Replays after Last-Event-ID are range scans on this index
+    __table_args__ = (Index("ix_project_events_project_id_id", "project_id", "id"),)
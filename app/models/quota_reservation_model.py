@@ -0,0 +1,14 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer
+from app.database import Base
+
+
+class QuotaReservation(Base):
+    __tablename__ = "quota_reservations"
+    id = Column(BigInteger, primary_key=True)
+    project_id = Column(
+        Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    documents = Column(Integer, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    # Reservations left behind by a crashed request stop counting after this
+    expires_at = Column(DateTime, nullable=False)
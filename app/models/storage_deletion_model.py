@@ -0,0 +1,13 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
+from app.database import Base
+
+
+class StorageDeletion(Base):
+    __tablename__ = "storage_deletions"
+    id = Column(BigInteger, primary_key=True)
+    object_key = Column(String, nullable=False)
+    enqueued_at = Column(DateTime, nullable=False, default=datetime.now)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.now, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
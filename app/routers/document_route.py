@@ -1,9 +1,11 @@
-from fastapi import Depends, APIRouter, UploadFile, File
+from typing import Annotated
+from fastapi import Depends, APIRouter, UploadFile, File, Header, Query
+from fastapi.responses import RedirectResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user_model import User
 from app.dependencies import get_db
 from app.controllers import document_controller
-from app.schemas.document_schema import DocumentGet
+from app.schemas.document_schema import DocumentGet, DocumentTransfer, DocumentVersionGet
 from app.controllers.authentication import get_authentication_user
 
 
@@ -20,6 +22,48 @@ async def get_document(
     return await document_controller.get_document(document_id, user, db)
 
 
+@router.get(
+    "/{document_id}/download", status_code=302, response_class=RedirectResponse
+)
+async def download_document(
+    document_id: int,
+    accept_encoding: Annotated[str | None, Header(alias="Accept-Encoding")] = None,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Redirect to a short-lived presigned URL for the document's file."""
+    return await document_controller.download_document(
+        document_id, user, db, accept_encoding
+    )
+
+
+@router.get(
+    "/{document_id}/preview", status_code=302, response_class=RedirectResponse
+)
+async def preview_document(
+    document_id: int,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Redirect to a short-lived presigned URL for the document's preview image."""
+    return await document_controller.preview_document(document_id, user, db)
+
+
+@router.get("/{document_id}/content", response_class=StreamingResponse)
+async def stream_document(
+    document_id: int,
+    range_header: str | None = Header(None, alias="Range"),
+    if_range: str | None = Header(None, alias="If-Range"),
+    accept_encoding: Annotated[str | None, Header(alias="Accept-Encoding")] = None,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream the document's file through the API with HTTP Range support."""
+    return await document_controller.stream_document(
+        document_id, range_header, if_range, user, db, accept_encoding
+    )
+
+
 @router.put("/{document_id}", response_model=DocumentGet)
 async def update_document(
     document_id: int,
@@ -31,6 +75,57 @@ async def update_document(
     return await document_controller.update_document(document_id, file, user, db)
 
 
+@router.get("/{document_id}/versions", response_model=list[DocumentVersionGet])
+async def get_document_versions(
+    document_id: int,
+    before: int | None = None,
+    limit: int = Query(50, ge=1, le=100),
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """List a document's past versions, newest first (pass the last ID as `before` for the next page)."""
+    return await document_controller.get_document_versions(
+        document_id, before, limit, user, db
+    )
+
+
+@router.post(
+    "/{document_id}/versions/{version_id}/restore", response_model=DocumentGet
+)
+async def restore_document_version(
+    document_id: int,
+    version_id: int,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Make a past version of a document current again."""
+    return await document_controller.restore_document_version(
+        document_id, version_id, user, db
+    )
+
+
+@router.post("/{document_id}/move", response_model=DocumentGet)
+async def move_document(
+    document_id: int,
+    transfer: DocumentTransfer,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Move a document to another project of the authenticated user."""
+    return await document_controller.move_document(document_id, transfer, user, db)
+
+
+@router.post("/{document_id}/copy", status_code=201, response_model=DocumentGet)
+async def copy_document(
+    document_id: int,
+    transfer: DocumentTransfer,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Copy a document into another project of the authenticated user."""
+    return await document_controller.copy_document(document_id, transfer, user, db)
+
+
 @router.delete("/{document_id}", status_code=204)
 async def delete_document(
     document_id: int,
@@ -0,0 +1,23 @@
+from typing import Annotated
+from fastapi import Depends, APIRouter, Header
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user_model import User
+from app.dependencies import get_db
+from app.controllers.authentication import get_authentication_user
+from app.controllers import event_controller
+
+
+router = APIRouter(prefix="/project", tags=["events"])
+
+
+@router.get("/{project_id}/events")
+async def stream_project_events(
+    project_id: int,
+    last_event_id: Annotated[int | None, Header(alias="Last-Event-ID")] = None,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream the project's document and membership changes as Server-Sent Events."""
+    return await event_controller.stream_project_events(
+        project_id, last_event_id, user, db
+    )
@@ -0,0 +1,22 @@
+from typing import Annotated
+from fastapi import Depends, APIRouter, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user_model import User
+from app.dependencies import get_db
+from app.schemas.document_schema import RecentDocument, RecentDocumentsQuery
+from app.controllers.authentication import get_authentication_user
+from app.controllers import document_controller
+
+
+router = APIRouter(prefix="/me", tags=["me"])
+
+
+@router.get("/documents/recent", response_model=list[RecentDocument])
+async def get_recent_documents(
+    query: Annotated[RecentDocumentsQuery, Query()],
+    response: Response,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """List the user's newest documents across all their projects (next page cursor in X-Next-Cursor)."""
+    return await document_controller.get_recent_documents(query, response, user, db)
@@ -1,4 +1,5 @@
-from fastapi import Depends, APIRouter, UploadFile, File
+from typing import Annotated
+from fastapi import Depends, APIRouter, UploadFile, File, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user_model import User
 from app.dependencies import get_db
@@ -7,9 +8,23 @@ from app.schemas.project_schema import (
     SuccessResponse,
     ProjectInfo,
     ProjectUpdate,
+    ProjectUsage,
 )
 from app.schemas.user_project_schema import UserProjectWithProject
-from app.schemas.document_schema import DocumentProjectInfo
+from app.schemas.document_schema import (
+    DocumentBatchResult,
+    DocumentBulkDelete,
+    DocumentBulkDeleteResult,
+    DocumentListQuery,
+    DocumentProjectInfo,
+    DocumentSearchQuery,
+    DocumentSearchResult,
+    DocumentTagsResult,
+    DocumentTagsUpdate,
+    DocumentUploadComplete,
+    DocumentUploadRequest,
+    DocumentUploadTicket,
+)
 from app.controllers.authentication import get_authentication_user
 from app.controllers import project_controller
 
@@ -48,6 +63,16 @@ async def get_project_info(
     return await project_controller.get_project_info(project_id, user, db)
 
 
+@router_project.get("/{project_id}/usage", response_model=ProjectUsage)
+async def get_project_usage(
+    project_id: int,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Report a project's storage usage against its quota."""
+    return await project_controller.get_project_usage(project_id, user, db)
+
+
 @router_project.put("/{project_id}/info", response_model=ProjectCreate)
 async def update_project(
     project_id: int,
@@ -72,11 +97,30 @@ async def delete_project(
 @router_project.get("/{project_id}/documents", response_model=list[DocumentProjectInfo])
 async def get_project_documents(
     project_id: int,
+    query: Annotated[DocumentListQuery, Query()],
+    response: Response,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """List a page of documents for a given project the user belongs to (next page cursor in X-Next-Cursor)."""
+    return await project_controller.get_project_documents(
+        project_id, query, response, user, db
+    )
+
+
+@router_project.get(
+    "/{project_id}/documents/search", response_model=list[DocumentSearchResult]
+)
+async def search_project_documents(
+    project_id: int,
+    query: Annotated[DocumentSearchQuery, Query()],
     user: User = Depends(get_authentication_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """List all documents for a given project the user belongs to."""
-    return await project_controller.get_project_documents(project_id, user, db)
+    """Full-text search a project's documents by name and content, best matches first."""
+    return await project_controller.search_project_documents(
+        project_id, query, user, db
+    )
 
 
 @router_project.post(
@@ -92,6 +136,104 @@ async def create_project_document(
     return await project_controller.create_project_document(project_id, file, user, db)
 
 
+@router_project.post(
+    "/{project_id}/documents/batch",
+    status_code=200,
+    response_model=list[DocumentBatchResult],
+)
+async def create_project_documents(
+    project_id: int,
+    files: list[UploadFile] = File(...),
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Upload several files to a project at once and report the status of each one."""
+    return await project_controller.create_project_documents(project_id, files, user, db)
+
+
+@router_project.post(
+    "/{project_id}/documents/delete",
+    status_code=200,
+    response_model=DocumentBulkDeleteResult,
+)
+async def delete_project_documents(
+    project_id: int,
+    request: DocumentBulkDelete,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Delete many documents of a project in one request and report which IDs were found."""
+    return await project_controller.delete_project_documents(
+        project_id, request, user, db
+    )
+
+
+@router_project.post(
+    "/{project_id}/documents/tags/add",
+    status_code=200,
+    response_model=DocumentTagsResult,
+)
+async def add_project_document_tags(
+    project_id: int,
+    request: DocumentTagsUpdate,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Add tags to many documents of a project and report which ones changed."""
+    return await project_controller.add_project_document_tags(
+        project_id, request, user, db
+    )
+
+
+@router_project.post(
+    "/{project_id}/documents/tags/remove",
+    status_code=200,
+    response_model=DocumentTagsResult,
+)
+async def remove_project_document_tags(
+    project_id: int,
+    request: DocumentTagsUpdate,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Remove tags from many documents of a project and report which ones changed."""
+    return await project_controller.remove_project_document_tags(
+        project_id, request, user, db
+    )
+
+
+@router_project.post(
+    "/{project_id}/documents/uploads",
+    status_code=201,
+    response_model=DocumentUploadTicket,
+)
+async def create_document_upload(
+    project_id: int,
+    upload: DocumentUploadRequest,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Issue a presigned URL so the client can upload a file straight to storage."""
+    return await project_controller.create_document_upload(project_id, upload, user, db)
+
+
+@router_project.post(
+    "/{project_id}/documents/uploads/complete",
+    status_code=201,
+    response_model=DocumentProjectInfo,
+)
+async def complete_document_upload(
+    project_id: int,
+    upload: DocumentUploadComplete,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Verify a direct upload and save the document metadata."""
+    return await project_controller.complete_document_upload(
+        project_id, upload, user, db
+    )
+
+
 @router_project.post(
     "/{project_id}/invite", status_code=200, response_model=SuccessResponse
 )
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import FileResponse
+from app.controllers import storage_controller
+
+
+router = APIRouter(prefix="/storage", tags=["storage"])
+
+
+@router.get("/{key:path}", response_class=FileResponse)
+async def get_local_object(key: str, expires: int, signature: str):
+    """Download a file of the local storage backend through a signed URL."""
+    return await storage_controller.get_local_object(key, expires, signature)
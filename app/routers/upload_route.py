@@ -0,0 +1,75 @@
+from typing import Annotated
+from fastapi import Depends, APIRouter, Header, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user_model import User
+from app.dependencies import get_db
+from app.schemas.document_schema import (
+    DocumentProjectInfo,
+    ResumableUploadCreate,
+    ResumableUploadGet,
+)
+from app.controllers.authentication import get_authentication_user
+from app.controllers import upload_controller
+
+
+router = APIRouter(prefix="/project", tags=["uploads"])
+
+
+@router.post(
+    "/{project_id}/documents/resumable",
+    status_code=201,
+    response_model=ResumableUploadGet,
+)
+async def create_upload_session(
+    project_id: int,
+    upload: ResumableUploadCreate,
+    response: Response,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Start a resumable upload; chunks are then sent to the returned Location."""
+    return await upload_controller.create_upload_session(
+        project_id, upload, response, user, db
+    )
+
+
+@router.head("/{project_id}/documents/resumable/{upload_id}")
+async def get_upload_session(
+    project_id: int,
+    upload_id: str,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Report the offset a resumable upload can be continued from."""
+    return await upload_controller.get_upload_session(project_id, upload_id, user, db)
+
+
+@router.patch(
+    "/{project_id}/documents/resumable/{upload_id}",
+    response_model=DocumentProjectInfo,
+)
+async def upload_chunk(
+    project_id: int,
+    upload_id: str,
+    request: Request,
+    upload_offset: Annotated[int | None, Header(alias="Upload-Offset")] = None,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Append a chunk at Upload-Offset; the last chunk creates and returns the document."""
+    return await upload_controller.upload_chunk(
+        project_id, upload_id, upload_offset, request, user, db
+    )
+
+
+@router.delete("/{project_id}/documents/resumable/{upload_id}", status_code=204)
+async def delete_upload_session(
+    project_id: int,
+    upload_id: str,
+    user: User = Depends(get_authentication_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Cancel a resumable upload and discard its stored chunks."""
+    return await upload_controller.delete_upload_session(
+        project_id, upload_id, user, db
+    )
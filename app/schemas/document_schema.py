@@ -1,29 +1,218 @@
-from pydantic import BaseModel, ConfigDict
+from typing import Annotated
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    StringConstraints,
+    computed_field,
+    field_validator,
+)
 from datetime import datetime
+from app.config import BULK_DELETE_MAX_IDS, TAG_MAX_LENGTH, TAGS_BULK_MAX_IDS
+
+# Tags are compared exactly, so they are normalized before reaching the database
+Tag = Annotated[
+    str,
+    StringConstraints(
+        strip_whitespace=True, to_lower=True, min_length=1, max_length=TAG_MAX_LENGTH
+    ),
+]
+
+
+def document_download_path(document_id: int) -> str:
+    """Return the API path that redirects to a document's presigned URL."""
+    return f"/document/{document_id}/download"
+
+
+def document_preview_path(document_id: int, preview_status: str | None) -> str | None:
+    """Return the API path that redirects to a document's preview, if it is ready."""
+    if preview_status != "ready":
+        return None
+    return f"/document/{document_id}/preview"
 
 
 class DocumentBase(BaseModel):
     name: str
-    url: str
+    object_key: str
+    content_type: str | None = None
+    size: int | None = None
+    checksum: str | None = None
+    content_encoding: str | None = None
 
 
 class DocumentGet(DocumentBase):
     id: int
     project_id: int
+    version: int
+    preview_status: str | None = None
+    search_status: str | None = None
+    tags: list[str] = []
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
+    @computed_field
+    @property
+    def url(self) -> str:
+        return document_download_path(self.id)
+
+    @computed_field
+    @property
+    def preview_url(self) -> str | None:
+        return document_preview_path(self.id, self.preview_status)
+
 
 class DocumentProjectInfo(BaseModel):
     id: int
     name: str
-    url: str
+    object_key: str
+    content_type: str | None = None
+    size: int | None = None
+    checksum: str | None = None
+    content_encoding: str | None = None
+    preview_status: str | None = None
+    search_status: str | None = None
+    tags: list[str] = []
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
+    @computed_field
+    @property
+    def url(self) -> str:
+        return document_download_path(self.id)
+
+    @computed_field
+    @property
+    def preview_url(self) -> str | None:
+        return document_preview_path(self.id, self.preview_status)
+
+
+class RecentDocument(DocumentProjectInfo):
+    project_id: int
+
+
+class RecentDocumentsQuery(BaseModel):
+    cursor: str | None = None
+    limit: int = Field(50, ge=1, le=100)
+
+
+class DocumentSearchResult(DocumentProjectInfo):
+    rank: float
+    snippet: str | None = None
+
+
+class DocumentSearchQuery(BaseModel):
+    q: str = Field(min_length=1, max_length=256)
+    limit: int = Field(20, ge=1, le=100)
+
+
+class DocumentTransfer(BaseModel):
+    project_id: int
+
+
+class DocumentBulkDelete(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=BULK_DELETE_MAX_IDS)
+
+
+class DocumentBulkDeleteResult(BaseModel):
+    deleted: list[int]
+    not_found: list[int]
+
+
+class DocumentTagsUpdate(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=TAGS_BULK_MAX_IDS)
+    tags: list[Tag] = Field(min_length=1, max_length=20)
+
+
+class DocumentTagsResult(BaseModel):
+    updated: list[int]
+
+
+class DocumentBatchResult(BaseModel):
+    filename: str
+    status: str
+    document: DocumentProjectInfo | None = None
+    error: str | None = None
+
+
+class DocumentListQuery(BaseModel):
+    name_prefix: str | None = None
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+    content_type: str | None = None
+    tag: list[Tag] | None = None
+    cursor: str | None = None
+    limit: int = Field(50, ge=1, le=100)
+
+    @field_validator("created_after", "created_before")
+    @classmethod
+    def to_naive_local(cls, value: datetime | None) -> datetime | None:
+        # created_at is a naive TIMESTAMP in the server's local time (datetime.now);
+        # asyncpg rejects aware values for it
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone().replace(tzinfo=None)
+        return value
+
 
 class DocumentUpdate(BaseModel):
     name: str | None = None
-    url: str | None = None
+    object_key: str | None = None
+    content_type: str | None = None
+    size: int | None = None
+    checksum: str | None = None
+    content_encoding: str | None = None
+    preview_status: str | None = None
+    search_status: str | None = None
+    version: int | None = None
+
+
+class DocumentVersionGet(BaseModel):
+    id: int
+    document_id: int
+    version: int
+    name: str
+    object_key: str
+    content_type: str | None = None
+    size: int | None = None
+    checksum: str | None = None
+    content_encoding: str | None = None
+    archived_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class DocumentUploadRequest(BaseModel):
+    filename: str
+    content_type: str
+    size: int
+
+
+class DocumentUploadTicket(BaseModel):
+    url: str
+    fields: dict[str, str]
+    key: str
+    expires_in: int
+
+
+class DocumentUploadComplete(BaseModel):
+    key: str
+    name: str
+
+
+class ResumableUploadCreate(BaseModel):
+    filename: str
+    size: int = Field(gt=0)
+    content_type: str | None = None
+
+
+class ResumableUploadGet(BaseModel):
+    id: str
+    filename: str
+    size: int
+    upload_offset: int
+    expires_at: datetime
+    chunk_min_size: int
+    chunk_max_size: int
+
+    model_config = ConfigDict(from_attributes=True)
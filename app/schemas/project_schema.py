@@ -30,3 +30,12 @@ class SuccessResponse(BaseModel):
 class ProjectInfo(ProjectBase):
     id: int
     created_at: datetime
+
+
+class ProjectUsage(BaseModel):
+    document_count: int
+    total_bytes: int
+    reserved_documents: int
+    reserved_bytes: int
+    max_documents: int | None = None
+    max_bytes: int | None = None
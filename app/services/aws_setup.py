@@ -1,9 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor
 import boto3
-from app.config import AWS_ACCESS_KEY, AWS_SECRET_KEY, AWS_REGION
+from botocore.config import Config
+from app.config import AWS_ACCESS_KEY, AWS_SECRET_KEY, AWS_REGION, AWS_TRANSFER_MAX_WORKERS
 
 s3_client = boto3.client(
     's3',
     aws_access_key_id=AWS_ACCESS_KEY,
     aws_secret_access_key=AWS_SECRET_KEY,
-    region_name=AWS_REGION
+    region_name=AWS_REGION,
+    config=Config(max_pool_connections=AWS_TRANSFER_MAX_WORKERS),
+)
+
+# boto3 is blocking, so every S3 call runs here instead of on the event loop.
+# The pool size is the transfer concurrency limit for the whole worker.
+s3_executor = ThreadPoolExecutor(
+    max_workers=AWS_TRANSFER_MAX_WORKERS, thread_name_prefix="s3-transfer"
 )
@@ -0,0 +1,16 @@
+import asyncio
+
+_tasks: list[asyncio.Task] = []
+
+
+def start_background_worker(worker, *args) -> None:
+    """Run a long-lived worker coroutine for the lifetime of the app."""
+    _tasks.append(asyncio.create_task(worker(*args)))
+
+
+async def stop_background_workers() -> None:
+    """Cancel every worker started with start_background_worker and wait for them."""
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
@@ -0,0 +1,109 @@
+import io
+import zstandard
+from app.config import COMPRESSION_LEVEL, COMPRESSION_MIN_SIZE, STORAGE_COMPRESSION
+
+ZSTD = "zstd"
+
+# Types that are worth compressing; already-compressed formats are left alone.
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/xml",
+    "application/javascript",
+    "application/x-ndjson",
+    "application/sql",
+    "image/svg+xml",
+)
+
+
+def choose_content_encoding(content_type: str | None, size: int) -> str | None:
+    """Decide whether a file should be stored compressed.
+
+    Args:
+        content_type: Detected MIME type of the file.
+        size: Size of the file in bytes.
+
+    Returns:
+        content_encoding: ``zstd`` if the file should be compressed; None to store it as is.
+    """
+    if STORAGE_COMPRESSION != ZSTD:
+        return None
+    if size < COMPRESSION_MIN_SIZE or not content_type:
+        return None
+    if content_type.startswith("text/") or content_type in COMPRESSIBLE_TYPES:
+        return ZSTD
+    return None
+
+
+def compressing_reader(fileobj):
+    """Wrap a file object so reading from it yields zstd-compressed bytes.
+
+    The data is compressed as it is read, so it can be handed to a streaming
+    upload without buffering the compressed copy.
+
+    Args:
+        fileobj: Readable binary file object positioned at the start.
+
+    Returns:
+        reader: A readable file-like object producing the compressed stream.
+    """
+    compressor = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL)
+    return compressor.stream_reader(fileobj, closefd=False)
+
+
+def decompress(data: bytes, max_size: int) -> bytes | None:
+    """Decompress a whole zstd-compressed object held in memory.
+
+    Args:
+        data: Compressed content.
+        max_size: Largest decompressed size in bytes that will be produced.
+
+    Returns:
+        data: The decompressed content; None if it is larger than max_size.
+    """
+    reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data))
+    content = reader.read(max_size + 1)
+    return None if len(content) > max_size else content
+
+
+async def decompress_stream(chunks):
+    """Decompress a stream of zstd-compressed chunks on the fly.
+
+    Args:
+        chunks: Async iterator of compressed byte chunks.
+
+    Yields:
+        chunk: The next block of decompressed bytes.
+    """
+    decompressor = zstandard.ZstdDecompressor().decompressobj()
+    async for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+
+
+def accepts_encoding(accept_encoding: str | None, encoding: str) -> bool:
+    """Return whether an Accept-Encoding header allows a content coding.
+
+    Args:
+        accept_encoding: Raw value of the request's Accept-Encoding header.
+        encoding: Content coding to check, e.g. ``zstd``.
+
+    Returns:
+        True: If the client accepts the coding (explicitly or through ``*``); False otherwise.
+    """
+    if not accept_encoding:
+        return False
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip()] = quality
+    quality = accepted.get(encoding, accepted.get("*", 0.0))
+    return quality > 0
@@ -0,0 +1,58 @@
+import mimetypes
+
+SNIFF_SIZE = 512
+
+# Leading bytes of common formats, checked in order.
+_SIGNATURES = [
+    (b"%PDF-", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"\x1f\x8b", "application/gzip"),
+    (b"\x28\xb5\x2f\xfd", "application/zstd"),
+]
+
+# Containers whose real type depends on what they hold (e.g. .docx is a zip).
+_CONTAINERS = [
+    (b"PK\x03\x04", "application/zip"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/x-ole-storage"),
+]
+
+
+def detect_content_type(head: bytes, filename: str | None, declared: str | None = None) -> str:
+    """Detect the MIME type of a file from its first bytes, falling back to its name.
+
+    The client's declared type is only used when neither the content nor the
+    extension identify the file.
+
+    Args:
+        head: First bytes of the file (SNIFF_SIZE is enough).
+        filename: Original filename, used for its extension.
+        declared: Content-Type sent by the client.
+
+    Returns:
+        content_type: The detected MIME type.
+    """
+    guessed, _ = mimetypes.guess_type(filename or "")
+    if guessed == "application/octet-stream":
+        guessed = None
+    for signature, content_type in _SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, content_type in _CONTAINERS:
+        if head.startswith(signature):
+            return guessed or content_type
+    if head and b"\x00" not in head:
+        try:
+            head.decode("utf-8")
+        except UnicodeDecodeError as e:
+            # A multi-byte character may be cut at the end of the sample
+            if e.start < len(head) - 3:
+                return guessed or declared or "application/octet-stream"
+        if guessed and (guessed.startswith("text/") or guessed.endswith(("json", "xml"))):
+            return guessed
+        return "text/plain"
+    return guessed or declared or "application/octet-stream"
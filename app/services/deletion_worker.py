@@ -0,0 +1,60 @@
+import asyncio
+from datetime import datetime
+import logging
+from app.database import AsyncSessionLocal
+from app.config import DELETION_BATCH_SIZE, DELETION_POLL_INTERVAL
+from app.crud import blob_crud as crud_blob
+from app.crud import storage_deletion_crud as crud_deletion
+from app.crud.aws_crud import delete_files, preview_object_key
+from app.services.metrics import increment, set_gauge
+
+logger = logging.getLogger(__name__)
+
+
+async def drain_deletion_queue() -> int:
+    """Delete one batch of queued objects from storage.
+
+    Keys that became referenced again since they were queued (the same
+    content was uploaded once more) are dropped from the queue untouched.
+    Each object's preview, stored alongside it, is deleted with it.
+
+    Returns:
+        processed: Number of queue entries handled in this batch.
+    """
+    async with AsyncSessionLocal() as db:
+        deletions = await crud_deletion.claim_due_deletions(db, DELETION_BATCH_SIZE)
+        failed = []
+        if deletions:
+            keys = {deletion.object_key for deletion in deletions}
+            referenced = await crud_blob.get_referenced_keys(db, list(keys))
+            unreferenced = sorted(keys - referenced)
+            errors = await delete_files(
+                [*unreferenced, *(preview_object_key(key) for key in unreferenced)]
+            )
+            failed = [d for d in deletions if d.object_key in errors]
+            await crud_deletion.complete_deletions(
+                db, [d.id for d in deletions if d.object_key not in errors]
+            )
+            await crud_deletion.retry_deletions(db, failed, errors)
+        pending, oldest = await crud_deletion.get_deletion_backlog(db)
+        await db.commit()
+    increment("storage_deletion_processed_total", len(deletions) - len(failed))
+    increment("storage_deletion_failed_total", len(failed))
+    set_gauge("storage_deletion_pending", pending)
+    set_gauge(
+        "storage_deletion_lag_seconds",
+        (datetime.now() - oldest).total_seconds() if oldest else 0,
+    )
+    return len(deletions)
+
+
+async def run_deletion_worker() -> None:
+    """Drain the deletion queue forever, polling when it is empty."""
+    while True:
+        try:
+            processed = await drain_deletion_queue()
+        except Exception:
+            logger.exception("Storage deletion batch failed")
+            processed = 0
+        if processed < DELETION_BATCH_SIZE:
+            await asyncio.sleep(DELETION_POLL_INTERVAL)
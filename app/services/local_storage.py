@@ -0,0 +1,432 @@
+import asyncio
+from email.utils import parsedate_to_datetime
+from functools import partial
+import hashlib
+import hmac
+import json
+import os
+from pathlib import Path
+import shutil
+import tempfile
+import time
+from urllib.parse import quote
+import uuid
+from app.services.storage_backend import (
+    InvalidRangeError,
+    StorageBackend,
+    UnsupportedOperationError,
+)
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class LocalFileBody:
+    """Blocking reader over a byte range of an open file, like an S3 streaming body."""
+
+    def __init__(self, file, length: int):
+        self.file = file
+        self.remaining = length
+
+    def read(self, amt: int = -1) -> bytes:
+        if amt is None or amt < 0 or amt > self.remaining:
+            amt = self.remaining
+        data = self.file.read(amt)
+        self.remaining -= len(data)
+        return data
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def sign_download(secret: str, key: str, expires: int) -> str:
+    """Return the signature of a local download URL.
+
+    Args:
+        secret: Secret the signature is derived from.
+        key: Object key the URL grants access to.
+        expires: Unix time after which the URL is rejected.
+
+    Returns:
+        signature: Hex HMAC-SHA256 of the key and expiry.
+    """
+    message = f"{key}\n{expires}".encode()
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def _write_atomic(path: Path, fileobj, size: int | None = None) -> None:
+    """Write a file under a temporary name, then rename it into place.
+
+    Readers see either the previous file or the complete new one, never a
+    partial write, because the rename replaces the directory entry atomically.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            if size is None:
+                shutil.copyfileobj(fileobj, out, COPY_BUFFER_SIZE)
+            else:
+                remaining = size
+                while remaining:
+                    chunk = fileobj.read(min(remaining, COPY_BUFFER_SIZE))
+                    if not chunk:
+                        raise ValueError(f"Part is shorter than its declared size of {size} bytes")
+                    out.write(chunk)
+                    remaining -= len(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def _write_json_atomic(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w") as out:
+            json.dump(data, out)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def _link_atomic(source: Path, path: Path) -> None:
+    """Place a copy of a file at path, sharing its data with a hard link when possible.
+
+    Objects are never modified in place (writes rename a new file over the
+    old one), so a hard link behaves like an independent copy.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.parent / f".tmp-{uuid.uuid4().hex}"
+    try:
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            # Different filesystem or no hard link support: copy in the kernel instead
+            shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _etag(stat: os.stat_result) -> str:
+    return f"\"{stat.st_mtime_ns:x}-{stat.st_size:x}\""
+
+
+def _if_range_matches(if_range: str, stat: os.stat_result) -> bool:
+    if if_range.startswith(("\"", "W/")):
+        return if_range == _etag(stat)
+    try:
+        return int(stat.st_mtime) <= parsedate_to_datetime(if_range).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def _resolve_range(range_header: str, size: int) -> tuple[int, int] | None:
+    """Return the inclusive (start, end) of a single byte range, or None to read everything.
+
+    Raises:
+        InvalidRangeError: If the range starts past the end of the object.
+    """
+    start, _, end = range_header.removeprefix("bytes=").partition("-")
+    if not start:
+        length = int(end)
+        if length == 0 or size == 0:
+            raise InvalidRangeError(f"Range {range_header} not satisfiable for {size} bytes")
+        return max(size - length, 0), size - 1
+    start = int(start)
+    if start >= size:
+        raise InvalidRangeError(f"Range {range_header} not satisfiable for {size} bytes")
+    end = min(int(end), size - 1) if end else size - 1
+    if end < start:
+        return None
+    return start, end
+
+
+class LocalStorageBackend(StorageBackend):
+    """Store objects as files under a root directory on the local filesystem.
+
+    Object ``a/b`` lives at ``<root>/a/b``; its Content-Type and Content-Encoding
+    are kept in ``<root>/.meta/a/b.json``, and multipart uploads are staged in
+    ``<root>/.uploads/<upload_id>/``. Downloads are signed URLs served by the
+    API itself (``GET /storage/<key>``) with a zero-copy file response.
+
+    Blocking filesystem calls run in the given thread pool.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str, base_url: str, secret: str, executor=None):
+        if not secret:
+            # An empty HMAC key would let anyone forge download URLs
+            raise ValueError("SECRET_KEY must be set to use the local storage backend")
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip("/")
+        self.secret = secret
+        self.executor = executor
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    def object_path(self, key: str) -> Path:
+        """Return the file that holds an object.
+
+        Args:
+            key: Object key.
+
+        Returns:
+            path: Path of the object's file under the storage root.
+
+        Raises:
+            ValueError: If the key is empty, absolute, or has empty, ``.`` or ``..`` segments,
+            or segments starting with a dot (reserved for metadata and temporary files).
+        """
+        segments = key.split("/")
+        if not key or any(not segment or segment.startswith(".") for segment in segments):
+            raise ValueError(f"Invalid object key: {key!r}")
+        return self.root.joinpath(*segments)
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / ".meta" / f"{key}.json"
+
+    def _upload_path(self, upload_id: str) -> Path:
+        if not upload_id.isalnum():
+            raise ValueError(f"Invalid upload ID: {upload_id!r}")
+        return self.root / ".uploads" / upload_id
+
+    def read_metadata(self, key: str) -> dict:
+        """Return the Content-Type and Content-Encoding stored with an object.
+
+        Args:
+            key: Object key.
+
+        Returns:
+            metadata: Dict with ``content_type`` and ``content_encoding`` (either may be None).
+        """
+        try:
+            with open(self._meta_path(key)) as meta_file:
+                return json.load(meta_file)
+        except FileNotFoundError:
+            return {"content_type": None, "content_encoding": None}
+
+    def verify_download(self, key: str, expires: int, signature: str) -> bool:
+        """Check a signed download URL created by presign_download.
+
+        Args:
+            key: Object key from the URL.
+            expires: Expiry from the URL's query string.
+            signature: Signature from the URL's query string.
+
+        Returns:
+            True: If the signature matches and has not expired; False otherwise.
+        """
+        if expires < time.time():
+            return False
+        expected = sign_download(self.secret, key, expires)
+        return hmac.compare_digest(expected, signature)
+
+    def presign_download(self, key: str, expires_in: int) -> str:
+        self.object_path(key)
+        expires = int(time.time()) + expires_in
+        signature = sign_download(self.secret, key, expires)
+        return f"{self.base_url}/{quote(key)}?expires={expires}&signature={signature}"
+
+    async def presign_upload(
+        self, key: str, content_type: str, size: int, expires_in: int
+    ) -> dict:
+        raise UnsupportedOperationError(
+            "Direct uploads are not supported by the local storage backend; "
+            "upload through the API instead"
+        )
+
+    def _head(self, key: str) -> dict | None:
+        try:
+            stat = self.object_path(key).stat()
+        except FileNotFoundError:
+            return None
+        return {
+            "size": stat.st_size,
+            "content_type": self.read_metadata(key).get("content_type"),
+            "etag": _etag(stat),
+        }
+
+    async def head(self, key: str) -> dict | None:
+        try:
+            return await self._run(self._head, key)
+        except Exception as e:
+            raise Exception(f"Error reading file metadata from local storage: {str(e)}")
+
+    def _open(self, key: str, range_header: str | None, if_range: str | None) -> dict | None:
+        try:
+            file = open(self.object_path(key), "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            stat = os.fstat(file.fileno())
+            byte_range = None
+            if range_header and (not if_range or _if_range_matches(if_range, stat)):
+                byte_range = _resolve_range(range_header, stat.st_size)
+            if byte_range:
+                start, end = byte_range
+                file.seek(start)
+                content_length = end - start + 1
+                content_range = f"bytes {start}-{end}/{stat.st_size}"
+            else:
+                content_length = stat.st_size
+                content_range = None
+        except BaseException:
+            file.close()
+            raise
+        metadata = self.read_metadata(key)
+        return {
+            "body": LocalFileBody(file, content_length),
+            "content_length": content_length,
+            "content_range": content_range,
+            "etag": _etag(stat),
+            "content_type": metadata.get("content_type") or "application/octet-stream",
+            "content_encoding": metadata.get("content_encoding"),
+        }
+
+    async def open(
+        self, key: str, range_header: str | None = None, if_range: str | None = None
+    ) -> dict | None:
+        try:
+            return await self._run(self._open, key, range_header, if_range)
+        except InvalidRangeError:
+            raise
+        except Exception as e:
+            raise Exception(f"Error reading file from local storage: {str(e)}")
+
+    def _put(self, key: str, fileobj, content_type: str, content_encoding: str | None) -> None:
+        # Metadata goes first so a visible object always has its Content-Type
+        _write_json_atomic(
+            self._meta_path(key),
+            {"content_type": content_type, "content_encoding": content_encoding},
+        )
+        _write_atomic(self.object_path(key), fileobj)
+
+    async def put(
+        self, key: str, fileobj, content_type: str, content_encoding: str | None = None
+    ) -> None:
+        try:
+            await self._run(self._put, key, fileobj, content_type, content_encoding)
+        except Exception as e:
+            raise Exception(f"Error writing file to local storage: {str(e)}")
+
+    def _copy(self, source_key: str, key: str) -> None:
+        source_meta = self._meta_path(source_key)
+        if source_meta.exists():
+            _link_atomic(source_meta, self._meta_path(key))
+        _link_atomic(self.object_path(source_key), self.object_path(key))
+
+    async def copy(self, source_key: str, key: str) -> None:
+        try:
+            await self._run(self._copy, source_key, key)
+        except Exception as e:
+            raise Exception(f"Error copying file in local storage: {str(e)}")
+
+    def _delete(self, key: str) -> None:
+        self.object_path(key).unlink(missing_ok=True)
+        self._meta_path(key).unlink(missing_ok=True)
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self._run(self._delete, key)
+        except Exception as e:
+            raise Exception(f"Error deleting file from local storage: {str(e)}")
+
+    def _delete_many(self, keys: list[str]) -> dict[str, str]:
+        errors = {}
+        for key in keys:
+            try:
+                self._delete(key)
+            except Exception as e:
+                errors[key] = str(e)
+        return errors
+
+    async def delete_many(self, keys: list[str]) -> dict[str, str]:
+        return await self._run(self._delete_many, keys)
+
+    def _create_multipart_upload(self, key: str, content_type: str) -> str:
+        self.object_path(key)
+        upload_id = uuid.uuid4().hex
+        upload_path = self._upload_path(upload_id)
+        upload_path.mkdir(parents=True)
+        _write_json_atomic(upload_path / "upload.json", {"key": key, "content_type": content_type})
+        return upload_id
+
+    async def create_multipart_upload(self, key: str, content_type: str) -> str:
+        try:
+            return await self._run(self._create_multipart_upload, key, content_type)
+        except Exception as e:
+            raise Exception(f"Error starting multipart upload in local storage: {str(e)}")
+
+    def _upload_part(self, upload_id: str, part_number: int, fileobj, size: int) -> str:
+        upload_path = self._upload_path(upload_id)
+        if not upload_path.is_dir():
+            raise FileNotFoundError(f"No such upload: {upload_id}")
+        _write_atomic(upload_path / f"{part_number:05d}", fileobj, size)
+        return f"\"{part_number}-{size}\""
+
+    async def upload_part(
+        self, key: str, upload_id: str, part_number: int, fileobj, size: int
+    ) -> str:
+        try:
+            return await self._run(self._upload_part, upload_id, part_number, fileobj, size)
+        except Exception as e:
+            raise Exception(f"Error uploading part to local storage: {str(e)}")
+
+    def _complete_multipart_upload(self, key: str, upload_id: str, parts: list[dict]) -> None:
+        upload_path = self._upload_path(upload_id)
+        if not upload_path.is_dir():
+            if self.object_path(key).exists():
+                return
+            raise FileNotFoundError(f"No such upload: {upload_id}")
+        with open(upload_path / "upload.json") as upload_file:
+            content_type = json.load(upload_file)["content_type"]
+        part_files = [
+            open(upload_path / f"{part['PartNumber']:05d}", "rb") for part in parts
+        ]
+        try:
+            _write_json_atomic(
+                self._meta_path(key), {"content_type": content_type, "content_encoding": None}
+            )
+            _write_atomic(self.object_path(key), _ConcatenatedFiles(part_files))
+        finally:
+            for part_file in part_files:
+                part_file.close()
+        shutil.rmtree(upload_path, ignore_errors=True)
+
+    async def complete_multipart_upload(
+        self, key: str, upload_id: str, parts: list[dict]
+    ) -> None:
+        try:
+            await self._run(self._complete_multipart_upload, key, upload_id, parts)
+        except Exception as e:
+            raise Exception(f"Error completing multipart upload in local storage: {str(e)}")
+
+    async def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        try:
+            await self._run(shutil.rmtree, self._upload_path(upload_id), ignore_errors=True)
+        except Exception as e:
+            raise Exception(f"Error aborting multipart upload in local storage: {str(e)}")
+
+
+class _ConcatenatedFiles:
+    """Read several open files one after the other as a single stream."""
+
+    def __init__(self, files: list):
+        self.files = list(files)
+
+    def read(self, amt: int = -1) -> bytes:
+        while self.files:
+            data = self.files[0].read(amt)
+            if data:
+                return data
+            self.files.pop(0)
+        return b""
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+from app.database import AsyncSessionLocal
+from app.config import (
+    METADATA_BACKFILL_BATCH_SIZE,
+    METADATA_BACKFILL_CONCURRENCY,
+    METADATA_BACKFILL_RATE,
+)
+from app.crud import document_crud as crud_documents
+from app.crud.aws_crud import content_object_checksum, head_object
+from app.services.metrics import increment
+from app.services.rate_limit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill_metadata_batch(after_id: int, limiter: RateLimiter) -> int | None:
+    """Fill in size, content type and checksum for one batch of older documents.
+
+    Objects are inspected with concurrent HEAD requests, at most
+    METADATA_BACKFILL_CONCURRENCY in flight and METADATA_BACKFILL_RATE
+    started per second. Documents whose object does not exist are marked so
+    later runs skip them; those whose HEAD fails otherwise are retried on the
+    next run.
+
+    The checksum is only known for content-addressed keys. For other keys the
+    HEAD ETag is not used: it is an MD5 (or a multipart digest), not the SHA-256
+    documents record, so the checksum stays empty.
+
+    Args:
+        after_id: ID of the last document handled by the previous batch.
+        limiter: Rate limiter shared by the whole backfill.
+
+    Returns:
+        last_id: ID of the last document in this batch, or None when nothing is left.
+    """
+    semaphore = asyncio.Semaphore(METADATA_BACKFILL_CONCURRENCY)
+
+    async def head(object_key: str):
+        async with semaphore:
+            await limiter.acquire()
+            return await head_object(object_key)
+
+    async with AsyncSessionLocal() as db:
+        documents = await crud_documents.get_documents_missing_metadata(
+            db, after_id, METADATA_BACKFILL_BATCH_SIZE
+        )
+        if not documents:
+            return None
+        results = await asyncio.gather(
+            *(head(document.object_key) for document in documents),
+            return_exceptions=True,
+        )
+        failed = 0
+        missing = []
+        for document, metadata in zip(documents, results):
+            if isinstance(metadata, BaseException):
+                failed += 1
+                continue
+            if not metadata:
+                missing.append(document.id)
+                continue
+            await crud_documents.update_document_metadata(
+                db,
+                document.id,
+                size=metadata["size"],
+                content_type=metadata["content_type"],
+                checksum=content_object_checksum(document.object_key),
+            )
+        await crud_documents.mark_documents_object_missing(db, missing)
+        await db.commit()
+    increment(
+        "document_metadata_backfilled_total", len(documents) - failed - len(missing)
+    )
+    increment("document_metadata_backfill_failed_total", failed)
+    increment("document_metadata_backfill_missing_total", len(missing))
+    return documents[-1].id
+
+
+async def run_metadata_backfill() -> None:
+    """Backfill metadata for every document created before it was recorded, then stop.
+
+    The job stops on unexpected errors; documents still missing metadata are
+    picked up again the next time the app starts.
+    """
+    limiter = RateLimiter(METADATA_BACKFILL_RATE)
+    last_id = 0
+    try:
+        while last_id is not None:
+            last_id = await backfill_metadata_batch(last_id, limiter)
+    except Exception:
+        logger.exception("Document metadata backfill failed")
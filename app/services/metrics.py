@@ -0,0 +1,12 @@
+# In-process metrics exposed by GET /metrics. Values are per worker process.
+metrics: dict[str, float] = {}
+
+
+def set_gauge(name: str, value: float) -> None:
+    """Set a metric to an absolute value."""
+    metrics[name] = value
+
+
+def increment(name: str, amount: float = 1) -> None:
+    """Add to a counter metric."""
+    metrics[name] = metrics.get(name, 0) + amount
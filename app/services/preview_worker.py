@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from app.database import AsyncSessionLocal
+from app.config import (
+    PREVIEW_BATCH_SIZE,
+    PREVIEW_CONCURRENCY,
+    PREVIEW_MAX_SOURCE_SIZE,
+    PREVIEW_POLL_INTERVAL,
+    PREVIEW_SIZE,
+)
+from app.crud import document_crud as crud_documents
+from app.crud.aws_crud import preview_object_key, put_file, read_file
+from app.services.metrics import increment
+from app.services.previews import PREVIEW_CONTENT_TYPE, make_thumbnail, preview_executor
+
+logger = logging.getLogger(__name__)
+
+
+async def render_preview(object_key: str) -> str:
+    """Render and store the preview of one object.
+
+    Args:
+        object_key: Object key of the original file.
+
+    Returns:
+        status: ``ready`` once the preview is stored; ``unsupported`` if the original
+        is missing or larger than PREVIEW_MAX_SOURCE_SIZE.
+    """
+    data = await read_file(object_key, PREVIEW_MAX_SOURCE_SIZE)
+    if data is None:
+        return "unsupported"
+    loop = asyncio.get_running_loop()
+    thumbnail = await loop.run_in_executor(
+        preview_executor, make_thumbnail, data, PREVIEW_SIZE
+    )
+    await put_file(preview_object_key(object_key), thumbnail, PREVIEW_CONTENT_TYPE)
+    return "ready"
+
+
+async def generate_previews() -> int:
+    """Render previews for one batch of pending documents.
+
+    At most PREVIEW_CONCURRENCY originals are downloaded and rendered at once;
+    rendering itself is bounded by the process pool size.
+
+    Returns:
+        processed: Number of documents handled in this batch.
+    """
+    semaphore = asyncio.Semaphore(PREVIEW_CONCURRENCY)
+
+    async def render(object_key: str):
+        async with semaphore:
+            return await render_preview(object_key)
+
+    async with AsyncSessionLocal() as db:
+        documents = await crud_documents.claim_pending_previews(db, PREVIEW_BATCH_SIZE)
+        results = await asyncio.gather(
+            *(render(document.object_key) for document in documents),
+            return_exceptions=True,
+        )
+        failed = 0
+        for document, status in zip(documents, results):
+            if isinstance(status, BaseException):
+                logger.warning("Preview of document %s failed: %s", document.id, status)
+                failed += 1
+                status = "failed"
+            await crud_documents.set_preview_status(db, document.id, status)
+        await db.commit()
+    increment("preview_generated_total", len(documents) - failed)
+    increment("preview_failed_total", failed)
+    return len(documents)
+
+
+async def run_preview_worker() -> None:
+    """Render pending previews forever, polling when there is nothing to do."""
+    while True:
+        try:
+            processed = await generate_previews()
+        except Exception:
+            logger.exception("Preview batch failed")
+            processed = 0
+        if processed < PREVIEW_BATCH_SIZE:
+            await asyncio.sleep(PREVIEW_POLL_INTERVAL)
@@ -0,0 +1,63 @@
+from concurrent.futures import ProcessPoolExecutor
+import io
+import multiprocessing
+from PIL import Image, ImageOps
+from app.config import PREVIEW_PROCESS_WORKERS
+
+PREVIEW_CONTENT_TYPE = "image/jpeg"
+
+# Raster formats Pillow decodes; vector images such as SVG are left without a preview.
+PREVIEW_TYPES = (
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "image/webp",
+    "image/bmp",
+    "image/tiff",
+)
+
+# Thumbnails are CPU-bound, so they run in worker processes instead of threads.
+# "spawn" avoids forking a process that already runs the event loop and S3 threads.
+preview_executor = ProcessPoolExecutor(
+    max_workers=PREVIEW_PROCESS_WORKERS,
+    mp_context=multiprocessing.get_context("spawn"),
+)
+
+
+def supports_preview(content_type: str | None) -> bool:
+    """Return whether a preview can be generated for a MIME type."""
+    return content_type in PREVIEW_TYPES
+
+
+def initial_preview_status(content_type: str | None) -> str:
+    """Return the preview status a newly stored file starts with.
+
+    Args:
+        content_type: MIME type of the stored file.
+
+    Returns:
+        status: ``pending`` if the preview worker should render it; ``unsupported`` otherwise.
+    """
+    return "pending" if supports_preview(content_type) else "unsupported"
+
+
+def make_thumbnail(data: bytes, size: int) -> bytes:
+    """Render a JPEG thumbnail that fits in a size x size box.
+
+    Runs in a worker process; it must stay a module-level function so it can be pickled.
+
+    Args:
+        data: Content of the original image.
+        size: Largest width or height of the thumbnail in pixels.
+
+    Returns:
+        thumbnail: The JPEG-encoded thumbnail.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        # Let JPEG decoding downscale while reading instead of decoding at full size
+        image.draft("RGB", (size, size))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((size, size))
+        output = io.BytesIO()
+        image.convert("RGB").save(output, "JPEG", quality=80, optimize=True)
+    return output.getvalue()
@@ -0,0 +1,182 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
+import json
+import logging
+from app.database import AsyncSessionLocal, engine
+from app.config import (
+    EVENTS_LISTENER_RETRY,
+    EVENTS_PRUNE_BATCH_SIZE,
+    EVENTS_PRUNE_INTERVAL,
+    EVENTS_RETENTION,
+    EVENTS_SUBSCRIBER_QUEUE_SIZE,
+)
+from app.crud import project_event_crud as crud_events
+from app.services.metrics import increment, set_gauge
+
+logger = logging.getLogger(__name__)
+
+
+def format_event(event) -> str:
+    """Serialize a project event as a Server-Sent Events message.
+
+    Args:
+        event: ProjectEvent instance to send.
+
+    Returns:
+        message: The ``id``/``event``/``data`` block, terminated by a blank line.
+    """
+    data = json.dumps({"project_id": event.project_id, **event.data})
+    return f"id: {event.id}\nevent: {event.event_type}\ndata: {data}\n\n"
+
+
+class Subscription:
+    """One client's stream of a project's events."""
+
+    def __init__(self, project_id: int, queue_size: int):
+        self.project_id = project_id
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        # Set when events were dropped; the client must reconnect and resume
+        self.lagged = False
+
+
+class ProjectEventHub:
+    """Fan project events out to the SSE subscribers of this worker.
+
+    One database connection per worker LISTENs for new events. Notifications
+    only carry event IDs; events of projects nobody watches here are ignored,
+    and the rest are loaded with one query per burst of notifications, no
+    matter how many clients follow the project.
+
+    A subscriber that falls behind by more than its queue size, or that was
+    connected while the listener was down, is marked lagged so its stream
+    ends and the client resumes from its Last-Event-ID.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscriptions: dict[int, set[Subscription]] = defaultdict(set)
+        self._notifications: asyncio.Queue = asyncio.Queue()
+
+    def subscribe(self, project_id: int) -> Subscription:
+        """Start receiving a project's events."""
+        subscription = Subscription(project_id, self.queue_size)
+        self._subscriptions[project_id].add(subscription)
+        self._publish_gauge()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Stop receiving events; safe to call more than once."""
+        subscriptions = self._subscriptions.get(subscription.project_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.project_id]
+        self._publish_gauge()
+
+    def _publish_gauge(self) -> None:
+        set_gauge(
+            "event_subscribers",
+            sum(len(subscriptions) for subscriptions in self._subscriptions.values()),
+        )
+
+    def _lag(self, subscription: Subscription) -> None:
+        subscription.lagged = True
+        self.unsubscribe(subscription)
+        increment("event_subscribers_lagged_total")
+
+    def _on_notification(self, connection, pid, channel, payload) -> None:
+        try:
+            notification = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed event notification: %s", payload)
+            return
+        if notification.get("project_id") in self._subscriptions:
+            self._notifications.put_nowait(notification["id"])
+
+    def _on_connection_lost(self, connection) -> None:
+        self._notifications.put_nowait(None)
+
+    def publish(self, events) -> None:
+        """Hand events to every subscriber of their project."""
+        for event in events:
+            for subscription in list(self._subscriptions.get(event.project_id, ())):
+                try:
+                    subscription.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    self._lag(subscription)
+        increment("events_delivered_total", len(events))
+
+    async def _dispatch(self) -> None:
+        while True:
+            event_ids = [await self._notifications.get()]
+            while not self._notifications.empty():
+                event_ids.append(self._notifications.get_nowait())
+            if None in event_ids:
+                raise ConnectionError("Event listener connection lost")
+            async with AsyncSessionLocal() as db:
+                events = await crud_events.get_events(db, event_ids)
+            self.publish(events)
+
+    async def run(self) -> None:
+        """Listen for event notifications forever, reconnecting after failures."""
+        while True:
+            try:
+                async with engine.connect() as conn:
+                    raw = await conn.get_raw_connection()
+                    listener = raw.driver_connection
+                    await listener.add_listener(
+                        crud_events.EVENTS_CHANNEL, self._on_notification
+                    )
+                    listener.add_termination_listener(self._on_connection_lost)
+                    # Notifications sent while no one listened are lost
+                    for subscriptions in list(self._subscriptions.values()):
+                        for subscription in list(subscriptions):
+                            self._lag(subscription)
+                    try:
+                        await self._dispatch()
+                    finally:
+                        listener.remove_termination_listener(self._on_connection_lost)
+                        if not listener.is_closed():
+                            # The connection goes back to the pool; stop listening on it
+                            await listener.remove_listener(
+                                crud_events.EVENTS_CHANNEL, self._on_notification
+                            )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Event listener failed")
+                increment("event_listener_failures_total")
+            self._notifications = asyncio.Queue()
+            await asyncio.sleep(EVENTS_LISTENER_RETRY)
+
+
+project_event_hub = ProjectEventHub(EVENTS_SUBSCRIBER_QUEUE_SIZE)
+
+
+async def prune_project_events() -> int:
+    """Delete one batch of events older than EVENTS_RETENTION seconds.
+
+    Returns:
+        deleted: Number of events deleted.
+    """
+    cutoff = datetime.now() - timedelta(seconds=EVENTS_RETENTION)
+    async with AsyncSessionLocal() as db:
+        deleted = await crud_events.delete_events_before(
+            db, cutoff, EVENTS_PRUNE_BATCH_SIZE
+        )
+        await db.commit()
+    increment("events_pruned_total", deleted)
+    return deleted
+
+
+async def run_project_event_pruner() -> None:
+    """Prune old project events forever, every EVENTS_PRUNE_INTERVAL seconds."""
+    while True:
+        try:
+            deleted = await prune_project_events()
+        except Exception:
+            logger.exception("Project event pruning failed")
+            deleted = 0
+        if deleted < EVENTS_PRUNE_BATCH_SIZE:
+            await asyncio.sleep(EVENTS_PRUNE_INTERVAL)
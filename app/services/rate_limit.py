@@ -0,0 +1,23 @@
+import asyncio
+import time
+
+
+class RateLimiter:
+    """Space out calls so that at most ``rate`` of them start per second.
+
+    The limit is per process; callers sharing an instance are served in order.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until the next call is allowed to start."""
+        async with self._lock:
+            now = time.monotonic()
+            if self._next_slot > now:
+                await asyncio.sleep(self._next_slot - now)
+                now = self._next_slot
+            self._next_slot = now + self.interval
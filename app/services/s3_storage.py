@@ -0,0 +1,215 @@
+import asyncio
+from functools import partial
+from botocore.exceptions import ClientError
+from app.services.aws_setup import s3_client, s3_executor
+from app.services.storage_backend import InvalidRangeError, StorageBackend
+from app.config import AWS_BUCKET_NAME
+
+DELETE_OBJECTS_MAX_KEYS = 1000
+
+
+async def run_in_transfer_pool(func, *args, **kwargs):
+    """Run a blocking boto3 call in the dedicated S3 transfer pool.
+
+    Args:
+        func: Blocking callable to execute (usually an s3_client method).
+        *args: Positional arguments forwarded to func.
+        **kwargs: Keyword arguments forwarded to func.
+
+    Returns:
+        result: Whatever func returns.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(s3_executor, partial(func, *args, **kwargs))
+
+
+def _error_code(error: ClientError) -> str | None:
+    return error.response.get("Error", {}).get("Code")
+
+
+class S3StorageBackend(StorageBackend):
+    """Store objects in the S3 bucket named by AWS_BUCKET_NAME, through the shared boto3 client."""
+
+    name = "s3"
+
+    def presign_download(self, key: str, expires_in: int) -> str:
+        return s3_client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": AWS_BUCKET_NAME, "Key": key},
+            ExpiresIn=expires_in,
+        )
+
+    async def presign_upload(
+        self, key: str, content_type: str, size: int, expires_in: int
+    ) -> dict:
+        return s3_client.generate_presigned_post(
+            AWS_BUCKET_NAME,
+            key,
+            Fields={"Content-Type": content_type},
+            Conditions=[
+                {"Content-Type": content_type},
+                ["content-length-range", size, size],
+            ],
+            ExpiresIn=expires_in,
+        )
+
+    async def head(self, key: str) -> dict | None:
+        try:
+            response = await run_in_transfer_pool(
+                s3_client.head_object, Bucket=AWS_BUCKET_NAME, Key=key
+            )
+        except ClientError as e:
+            if _error_code(e) in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise Exception(f"Error reading file metadata from S3: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error reading file metadata from S3: {str(e)}")
+        return {
+            "size": response["ContentLength"],
+            "content_type": response.get("ContentType"),
+            "etag": response.get("ETag"),
+        }
+
+    async def open(
+        self, key: str, range_header: str | None = None, if_range: str | None = None
+    ) -> dict | None:
+        params = {"Bucket": AWS_BUCKET_NAME, "Key": key}
+        if range_header:
+            params["Range"] = range_header
+            if if_range and if_range.startswith(("\"", "W/")):
+                params["IfMatch"] = if_range
+            elif if_range:
+                params["IfUnmodifiedSince"] = if_range
+        try:
+            response = await run_in_transfer_pool(s3_client.get_object, **params)
+        except ClientError as e:
+            code = _error_code(e)
+            if code in ("404", "NoSuchKey", "NotFound"):
+                return None
+            if code == "InvalidRange":
+                raise InvalidRangeError(str(e))
+            if code == "PreconditionFailed":
+                # If-Range did not match: the client must get the whole current object
+                return await self.open(key)
+            raise Exception(f"Error reading file from S3: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error reading file from S3: {str(e)}")
+        return {
+            "body": response["Body"],
+            "content_length": response["ContentLength"],
+            "content_range": response.get("ContentRange"),
+            "etag": response.get("ETag"),
+            "content_type": response.get("ContentType") or "application/octet-stream",
+            "content_encoding": response.get("ContentEncoding"),
+        }
+
+    async def put(
+        self, key: str, fileobj, content_type: str, content_encoding: str | None = None
+    ) -> None:
+        extra_args = {"ContentType": content_type}
+        if content_encoding:
+            extra_args["ContentEncoding"] = content_encoding
+        try:
+            await run_in_transfer_pool(
+                s3_client.upload_fileobj, fileobj, AWS_BUCKET_NAME, key, ExtraArgs=extra_args
+            )
+        except Exception as e:
+            raise Exception(f"Error uploading file to S3: {str(e)}")
+
+    async def copy(self, source_key: str, key: str) -> None:
+        try:
+            await run_in_transfer_pool(
+                s3_client.copy_object,
+                Bucket=AWS_BUCKET_NAME,
+                Key=key,
+                CopySource={"Bucket": AWS_BUCKET_NAME, "Key": source_key},
+            )
+        except Exception as e:
+            raise Exception(f"Error copying file in S3: {str(e)}")
+
+    async def delete(self, key: str) -> None:
+        try:
+            await run_in_transfer_pool(
+                s3_client.delete_object, Bucket=AWS_BUCKET_NAME, Key=key
+            )
+        except Exception as e:
+            raise Exception(f"Error deleting file from S3: {str(e)}")
+
+    async def delete_many(self, keys: list[str]) -> dict[str, str]:
+        errors = {}
+        for start in range(0, len(keys), DELETE_OBJECTS_MAX_KEYS):
+            batch = keys[start:start + DELETE_OBJECTS_MAX_KEYS]
+            try:
+                response = await run_in_transfer_pool(
+                    s3_client.delete_objects,
+                    Bucket=AWS_BUCKET_NAME,
+                    Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+                )
+            except Exception as e:
+                errors.update({key: str(e) for key in batch})
+                continue
+            for error in response.get("Errors", []):
+                errors[error["Key"]] = f"{error.get('Code')}: {error.get('Message')}"
+        return errors
+
+    async def create_multipart_upload(self, key: str, content_type: str) -> str:
+        try:
+            response = await run_in_transfer_pool(
+                s3_client.create_multipart_upload,
+                Bucket=AWS_BUCKET_NAME,
+                Key=key,
+                ContentType=content_type,
+            )
+            return response["UploadId"]
+        except Exception as e:
+            raise Exception(f"Error starting multipart upload in S3: {str(e)}")
+
+    async def upload_part(
+        self, key: str, upload_id: str, part_number: int, fileobj, size: int
+    ) -> str:
+        try:
+            response = await run_in_transfer_pool(
+                s3_client.upload_part,
+                Bucket=AWS_BUCKET_NAME,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=fileobj,
+                ContentLength=size,
+            )
+            return response["ETag"]
+        except Exception as e:
+            raise Exception(f"Error uploading part to S3: {str(e)}")
+
+    async def complete_multipart_upload(
+        self, key: str, upload_id: str, parts: list[dict]
+    ) -> None:
+        try:
+            await run_in_transfer_pool(
+                s3_client.complete_multipart_upload,
+                Bucket=AWS_BUCKET_NAME,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except ClientError as e:
+            if _error_code(e) == "NoSuchUpload" and await self.head(key):
+                return
+            raise Exception(f"Error completing multipart upload in S3: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error completing multipart upload in S3: {str(e)}")
+
+    async def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        try:
+            await run_in_transfer_pool(
+                s3_client.abort_multipart_upload,
+                Bucket=AWS_BUCKET_NAME,
+                Key=key,
+                UploadId=upload_id,
+            )
+        except ClientError as e:
+            if _error_code(e) == "NoSuchUpload":
+                return
+            raise Exception(f"Error aborting multipart upload in S3: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error aborting multipart upload in S3: {str(e)}")
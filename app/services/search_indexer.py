@@ -0,0 +1,91 @@
+import asyncio
+import logging
+from app.database import AsyncSessionLocal
+from app.config import (
+    SEARCH_BATCH_SIZE,
+    SEARCH_CONCURRENCY,
+    SEARCH_MAX_SOURCE_SIZE,
+    SEARCH_POLL_INTERVAL,
+)
+from app.crud import document_crud as crud_documents
+from app.crud.aws_crud import read_file
+from app.services.compression import decompress
+from app.services.metrics import increment
+from app.services.text_extraction import (
+    extract_text,
+    extraction_executor,
+    supports_extraction,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def extract_document_text(document) -> tuple[str, str | None]:
+    """Download one document's file and extract its text.
+
+    Args:
+        document: Document instance claimed for indexing.
+
+    Returns:
+        status: ``ready`` with the text; ``unsupported`` (and None) if the type cannot be
+        indexed or the file is missing or larger than SEARCH_MAX_SOURCE_SIZE.
+        text: The extracted text, if any.
+    """
+    if not supports_extraction(document.content_type):
+        return "unsupported", None
+    data = await read_file(document.object_key, SEARCH_MAX_SOURCE_SIZE)
+    if data is not None and document.content_encoding:
+        data = decompress(data, SEARCH_MAX_SOURCE_SIZE)
+    if data is None:
+        return "unsupported", None
+    loop = asyncio.get_running_loop()
+    text = await loop.run_in_executor(
+        extraction_executor, extract_text, data, document.content_type
+    )
+    return "ready", text
+
+
+async def index_documents() -> int:
+    """Extract and index the text of one batch of pending documents.
+
+    At most SEARCH_CONCURRENCY files are downloaded and parsed at once;
+    parsing itself is bounded by the process pool size.
+
+    Returns:
+        processed: Number of documents handled in this batch.
+    """
+    semaphore = asyncio.Semaphore(SEARCH_CONCURRENCY)
+
+    async def extract(document):
+        async with semaphore:
+            return await extract_document_text(document)
+
+    async with AsyncSessionLocal() as db:
+        documents = await crud_documents.claim_pending_search(db, SEARCH_BATCH_SIZE)
+        results = await asyncio.gather(
+            *(extract(document) for document in documents), return_exceptions=True
+        )
+        failed = 0
+        for document, result in zip(documents, results):
+            if isinstance(result, BaseException):
+                logger.warning("Indexing of document %s failed: %s", document.id, result)
+                failed += 1
+                result = ("failed", None)
+            status, text = result
+            await crud_documents.set_search_text(db, document.id, status, text)
+        await db.commit()
+    increment("search_indexed_total", len(documents) - failed)
+    increment("search_index_failed_total", failed)
+    return len(documents)
+
+
+async def run_search_indexer() -> None:
+    """Index pending documents forever, polling when there is nothing to do."""
+    while True:
+        try:
+            processed = await index_documents()
+        except Exception:
+            logger.exception("Search indexing batch failed")
+            processed = 0
+        if processed < SEARCH_BATCH_SIZE:
+            await asyncio.sleep(SEARCH_POLL_INTERVAL)
@@ -0,0 +1,178 @@
+from abc import ABC, abstractmethod
+
+
+class InvalidRangeError(Exception):
+    """Raised when a requested byte range cannot be satisfied."""
+
+
+class UnsupportedOperationError(Exception):
+    """Raised when a storage backend cannot perform an operation, e.g. direct uploads."""
+
+
+class StorageBackend(ABC):
+    """Interface of an object store that holds document files under string keys.
+
+    Objects are immutable once written: every write replaces the whole object.
+    Missing objects are reported as None rather than raised, and any other
+    failure is raised as an Exception with a descriptive message. A backend
+    must implement every method before it can be instantiated.
+    """
+
+    name = "abstract"
+
+    @abstractmethod
+    def presign_download(self, key: str, expires_in: int) -> str:
+        """Return a URL that lets a client download an object without credentials.
+
+        Args:
+            key: Object key to download.
+            expires_in: Seconds the URL stays valid.
+
+        Returns:
+            url: The signed download URL.
+        """
+
+    @abstractmethod
+    async def presign_upload(
+        self, key: str, content_type: str, size: int, expires_in: int
+    ) -> dict:
+        """Return a form a client can post to upload one object directly.
+
+        Args:
+            key: Object key the client is allowed to write.
+            content_type: Content-Type the upload must carry.
+            size: Exact size in bytes the upload must have.
+            expires_in: Seconds the form stays valid.
+
+        Returns:
+            presigned: Dict with the target ``url`` and the form ``fields`` to send.
+
+        Raises:
+            UnsupportedOperationError: If the backend does not accept direct uploads.
+        """
+
+    @abstractmethod
+    async def head(self, key: str) -> dict | None:
+        """Return an object's metadata without reading it.
+
+        Args:
+            key: Object key to inspect.
+
+        Returns:
+            metadata: Dict with ``size``, ``content_type`` and ``etag``; None if the object does not exist.
+        """
+
+    @abstractmethod
+    async def open(
+        self, key: str, range_header: str | None = None, if_range: str | None = None
+    ) -> dict | None:
+        """Start reading an object, or a single byte range of it, as a stream.
+
+        Args:
+            key: Object key to read.
+            range_header: Optional single byte range (``bytes=<start>-<end>``).
+            if_range: Optional If-Range validator; when it no longer matches, the
+                whole object is returned instead of the range.
+
+        Returns:
+            stream: Dict with a blocking ``body`` (``read(amt)``/``close()``), ``content_length``,
+            ``content_range`` (None for full reads), ``etag``, ``content_type`` and
+            ``content_encoding``; None if the object does not exist.
+
+        Raises:
+            InvalidRangeError: If the range starts past the end of the object.
+        """
+
+    @abstractmethod
+    async def put(
+        self, key: str, fileobj, content_type: str, content_encoding: str | None = None
+    ) -> None:
+        """Write an object from a readable binary file object, replacing any previous one.
+
+        Args:
+            key: Object key to write.
+            fileobj: Readable binary file object, consumed to its end.
+            content_type: Content-Type to store with the object.
+            content_encoding: Optional Content-Encoding to store with the object.
+        """
+
+    @abstractmethod
+    async def copy(self, source_key: str, key: str) -> None:
+        """Copy an object to a new key without passing its bytes through the caller.
+
+        Args:
+            source_key: Object key to copy from.
+            key: Object key to copy to.
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Delete one object; deleting a missing object succeeds.
+
+        Args:
+            key: Object key to delete.
+        """
+
+    @abstractmethod
+    async def delete_many(self, keys: list[str]) -> dict[str, str]:
+        """Delete several objects, reporting failures per key instead of raising.
+
+        Args:
+            keys: Object keys to delete.
+
+        Returns:
+            errors: Error message by key for the objects that could not be deleted.
+        """
+
+    @abstractmethod
+    async def create_multipart_upload(self, key: str, content_type: str) -> str:
+        """Start an upload whose parts are sent separately and assembled at the end.
+
+        Args:
+            key: Object key the completed upload is stored under.
+            content_type: Content-Type to store with the object.
+
+        Returns:
+            upload_id: ID of the multipart upload.
+        """
+
+    @abstractmethod
+    async def upload_part(
+        self, key: str, upload_id: str, part_number: int, fileobj, size: int
+    ) -> str:
+        """Store one part of a multipart upload.
+
+        Args:
+            key: Object key of the multipart upload.
+            upload_id: ID of the multipart upload.
+            part_number: 1-based position of the part.
+            fileobj: Readable binary file object holding the part, positioned at its start.
+            size: Size of the part in bytes.
+
+        Returns:
+            etag: ETag of the stored part, needed to complete the upload.
+        """
+
+    @abstractmethod
+    async def complete_multipart_upload(
+        self, key: str, upload_id: str, parts: list[dict]
+    ) -> None:
+        """Assemble the parts of a multipart upload into the final object.
+
+        Completing an upload that was already completed succeeds as long as the
+        object exists.
+
+        Args:
+            key: Object key of the multipart upload.
+            upload_id: ID of the multipart upload.
+            parts: ``{"PartNumber", "ETag"}`` dicts in part order.
+        """
+
+    @abstractmethod
+    async def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        """Abort a multipart upload and free its parts; aborting a missing upload succeeds.
+
+        Args:
+            key: Object key of the multipart upload.
+            upload_id: ID of the multipart upload.
+        """
@@ -0,0 +1,113 @@
+from concurrent.futures import ProcessPoolExecutor
+import io
+import multiprocessing
+import re
+import zipfile
+from xml.etree import ElementTree
+from pypdf import PdfReader
+from app.config import SEARCH_MAX_TEXT_SIZE, SEARCH_PROCESS_WORKERS
+
+TEXT_TYPES = (
+    "application/json",
+    "application/xml",
+    "application/javascript",
+    "application/x-ndjson",
+    "application/sql",
+    "image/svg+xml",
+)
+
+# Office files are zip archives; these members hold their text.
+OFFICE_MEMBERS = {
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": r"word/document\.xml",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation": r"ppt/slides/slide\d+\.xml",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": r"xl/sharedStrings\.xml",
+    "application/vnd.oasis.opendocument.text": r"content\.xml",
+    "application/vnd.oasis.opendocument.presentation": r"content\.xml",
+    "application/vnd.oasis.opendocument.spreadsheet": r"content\.xml",
+}
+
+# Text extraction is CPU-bound, so it runs in worker processes like previews.
+extraction_executor = ProcessPoolExecutor(
+    max_workers=SEARCH_PROCESS_WORKERS,
+    mp_context=multiprocessing.get_context("spawn"),
+)
+
+
+def supports_extraction(content_type: str | None) -> bool:
+    """Return whether text can be extracted from a MIME type."""
+    if not content_type:
+        return False
+    return (
+        content_type.startswith("text/")
+        or content_type in TEXT_TYPES
+        or content_type in OFFICE_MEMBERS
+        or content_type == "application/pdf"
+    )
+
+
+def initial_search_status(content_type: str | None) -> str:
+    """Return the search status a newly stored file starts with.
+
+    Args:
+        content_type: MIME type of the stored file.
+
+    Returns:
+        status: ``pending`` if the indexer should extract its text; ``unsupported`` otherwise.
+    """
+    return "pending" if supports_extraction(content_type) else "unsupported"
+
+
+def _office_text(data: bytes, member_pattern: str) -> str:
+    parts = []
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        members = sorted(
+            (name for name in archive.namelist() if re.fullmatch(member_pattern, name)),
+            key=lambda name: [int(n) for n in re.findall(r"\d+", name)],
+        )
+        for name in members:
+            _collect_paragraphs(ElementTree.fromstring(archive.read(name)), parts)
+    return "".join(parts)
+
+
+def _collect_paragraphs(element, parts: list[str]) -> None:
+    # Each paragraph-like element (w:p, a:p, text:p, text:h, si) becomes one line
+    if element.tag.endswith(("}p", "}h", "}si")):
+        parts.append("".join(element.itertext()) + "\n")
+        return
+    for child in element:
+        _collect_paragraphs(child, parts)
+
+
+def _pdf_text(data: bytes) -> str:
+    reader = PdfReader(io.BytesIO(data))
+    parts = []
+    size = 0
+    for page in reader.pages:
+        text = page.extract_text() or ""
+        parts.append(text)
+        size += len(text)
+        if size >= SEARCH_MAX_TEXT_SIZE:
+            break
+    return "\n".join(parts)
+
+
+def extract_text(data: bytes, content_type: str) -> str:
+    """Extract the searchable text of a file.
+
+    Runs in a worker process; it must stay a module-level function so it can be pickled.
+
+    Args:
+        data: Content of the file.
+        content_type: MIME type of the file.
+
+    Returns:
+        text: The extracted text, cut to SEARCH_MAX_TEXT_SIZE characters.
+    """
+    if content_type == "application/pdf":
+        text = _pdf_text(data)
+    elif content_type in OFFICE_MEMBERS:
+        text = _office_text(data, OFFICE_MEMBERS[content_type])
+    else:
+        text = data[: SEARCH_MAX_TEXT_SIZE * 4].decode("utf-8", errors="replace")
+    # PostgreSQL text cannot hold NUL characters
+    return text[:SEARCH_MAX_TEXT_SIZE].replace("\x00", "")
@@ -0,0 +1,109 @@
+import asyncio
+from collections import Counter, OrderedDict, deque
+import time
+from app.services.metrics import increment, set_gauge
+
+
+class UploadAdmission:
+    """Limit concurrent uploads globally and per user, with a bounded wait queue.
+
+    When every slot is taken, uploads wait in one queue per user and freed
+    slots are handed out round-robin across users, so a client firing many
+    uploads at once cannot starve everybody else. At most max_queue uploads
+    wait at a time; further ones are refused right away. Limits are per process.
+    """
+
+    def __init__(self, limit: int, per_user_limit: int, max_queue: int):
+        self.limit = limit
+        self.per_user_limit = per_user_limit
+        self.max_queue = max_queue
+        self.active = 0
+        self.active_by_user: Counter[str] = Counter()
+        self.queued = 0
+        # Waiting uploads by user, in round-robin order
+        self._queues: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()
+
+    def _can_admit(self, user_key: str) -> bool:
+        return (
+            self.active < self.limit
+            and self.active_by_user[user_key] < self.per_user_limit
+        )
+
+    def _admit(self, user_key: str) -> None:
+        self.active += 1
+        self.active_by_user[user_key] += 1
+
+    def _publish(self) -> None:
+        set_gauge("upload_active", self.active)
+        set_gauge("upload_queue_depth", self.queued)
+
+    def _remove_waiter(self, user_key: str, waiter: asyncio.Future) -> None:
+        waiters = self._queues[user_key]
+        waiters.remove(waiter)
+        if not waiters:
+            del self._queues[user_key]
+        self.queued -= 1
+        waiter.cancel()
+
+    def _wake_waiters(self) -> None:
+        for user_key in list(self._queues):
+            if self.active >= self.limit:
+                break
+            waiters = self._queues[user_key]
+            if self._can_admit(user_key):
+                waiter = waiters.popleft()
+                self.queued -= 1
+                self._admit(user_key)
+                waiter.set_result(True)
+                # The user goes to the back of the line for the next free slot
+                self._queues.move_to_end(user_key)
+            if not waiters:
+                del self._queues[user_key]
+
+    async def acquire(self, user_key: str, timeout: float) -> bool:
+        """Take an upload slot, waiting in the user's queue for up to timeout seconds.
+
+        Args:
+            user_key: Identifies the client the slot is charged to (e.g. its user ID).
+            timeout: Longest time to wait in seconds; 0 fails immediately when no slot is free.
+
+        Returns:
+            True: If a slot was taken; False if the queue is full or the wait timed out.
+        """
+        if self._can_admit(user_key) and user_key not in self._queues:
+            self._admit(user_key)
+            self._publish()
+            return True
+        if timeout <= 0 or self.queued >= self.max_queue:
+            increment("upload_queue_rejected_total")
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(user_key, deque()).append(waiter)
+        self.queued += 1
+        self._publish()
+        started = time.monotonic()
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done():
+                # Admitted just as the wait ended; hand the slot back
+                self.release(user_key)
+            else:
+                self._remove_waiter(user_key, waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            increment("upload_queue_rejected_total")
+            return False
+        finally:
+            increment("upload_queue_waits_total")
+            increment("upload_queue_wait_seconds_total", time.monotonic() - started)
+            self._publish()
+
+    def release(self, user_key: str) -> None:
+        """Free a slot taken with acquire by the same user."""
+        self.active -= 1
+        self.active_by_user[user_key] -= 1
+        if not self.active_by_user[user_key]:
+            del self.active_by_user[user_key]
+        self._wake_waiters()
+        self._publish()
@@ -0,0 +1,60 @@
+import asyncio
+from collections import deque
+
+
+class ByteBudget:
+    """Bound the number of bytes held by requests in flight.
+
+    Reservations are granted in arrival order, so a large upload is not
+    starved by a stream of small ones. The budget is per process.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.in_use = 0
+        self._waiters: deque[tuple[int, asyncio.Future]] = deque()
+
+    def _wake_waiters(self) -> None:
+        while self._waiters:
+            amount, waiter = self._waiters[0]
+            if waiter.done():
+                self._waiters.popleft()
+                continue
+            if self.in_use + amount > self.capacity:
+                return
+            self._waiters.popleft()
+            self.in_use += amount
+            waiter.set_result(True)
+
+    async def acquire(self, amount: int, timeout: float) -> bool:
+        """Reserve bytes, waiting up to timeout seconds for others to release theirs.
+
+        Args:
+            amount: Number of bytes to reserve; capped at the budget's capacity.
+            timeout: Longest time to wait in seconds; 0 fails immediately when the budget is full.
+
+        Returns:
+            True: If the bytes were reserved; False if the budget stayed exhausted.
+        """
+        amount = min(amount, self.capacity)
+        if not self._waiters and self.in_use + amount <= self.capacity:
+            self.in_use += amount
+            return True
+        if timeout <= 0:
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append((amount, waiter))
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # Granted just as the wait timed out; hand the bytes back
+                self.release(amount)
+            waiter.cancel()
+            self._wake_waiters()
+            return False
+
+    def release(self, amount: int) -> None:
+        """Return bytes reserved with acquire (using the same amount)."""
+        self.in_use -= min(amount, self.capacity)
+        self._wake_waiters()
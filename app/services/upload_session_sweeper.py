@@ -0,0 +1,53 @@
+import asyncio
+import logging
+from app.database import AsyncSessionLocal
+from app.config import UPLOAD_SESSION_SWEEP_BATCH_SIZE, UPLOAD_SESSION_SWEEP_INTERVAL
+from app.crud import upload_session_crud as crud_upload
+from app.crud.aws_crud import abort_multipart_upload
+from app.services.metrics import increment
+
+logger = logging.getLogger(__name__)
+
+
+async def sweep_expired_upload_sessions() -> int:
+    """Abort the multipart uploads of one batch of expired sessions and remove them.
+
+    Sessions whose upload could not be aborted are kept and retried on the next sweep.
+
+    Returns:
+        processed: Number of expired sessions handled in this batch.
+    """
+    async with AsyncSessionLocal() as db:
+        sessions = await crud_upload.claim_expired_upload_sessions(
+            db, UPLOAD_SESSION_SWEEP_BATCH_SIZE
+        )
+        results = await asyncio.gather(
+            *(
+                abort_multipart_upload(session.object_key, session.s3_upload_id)
+                for session in sessions
+            ),
+            return_exceptions=True,
+        )
+        aborted = []
+        for session, result in zip(sessions, results):
+            if isinstance(result, BaseException):
+                logger.warning("Aborting upload session %s failed: %s", session.id, result)
+            else:
+                aborted.append(session.id)
+        await crud_upload.delete_upload_sessions(db, aborted)
+        await db.commit()
+    increment("upload_sessions_expired_total", len(aborted))
+    increment("upload_sessions_abort_failed_total", len(sessions) - len(aborted))
+    return len(sessions)
+
+
+async def run_upload_session_sweeper() -> None:
+    """Sweep expired upload sessions forever, every UPLOAD_SESSION_SWEEP_INTERVAL seconds."""
+    while True:
+        try:
+            processed = await sweep_expired_upload_sessions()
+        except Exception:
+            logger.exception("Upload session sweep failed")
+            processed = 0
+        if processed < UPLOAD_SESSION_SWEEP_BATCH_SIZE:
+            await asyncio.sleep(UPLOAD_SESSION_SWEEP_INTERVAL)
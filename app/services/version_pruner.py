@@ -0,0 +1,50 @@
+import asyncio
+import logging
+from app.database import AsyncSessionLocal
+from app.config import (
+    DOCUMENT_VERSIONS_KEEP,
+    DOCUMENT_VERSIONS_MAX_AGE_DAYS,
+    VERSION_PRUNE_BATCH_SIZE,
+    VERSION_PRUNE_INTERVAL,
+)
+from app.crud import blob_crud as crud_blob
+from app.crud import document_version_crud as crud_version
+from app.crud import storage_deletion_crud as crud_deletion
+from app.services.metrics import increment
+
+logger = logging.getLogger(__name__)
+
+
+async def prune_document_versions() -> int:
+    """Delete one batch of versions outside the retention policy.
+
+    Objects no longer referenced by anything are queued for deletion in the
+    same transaction as the version rows are removed.
+
+    Returns:
+        pruned: Number of versions deleted in this batch.
+    """
+    async with AsyncSessionLocal() as db:
+        object_keys = await crud_version.prune_document_versions(
+            db,
+            DOCUMENT_VERSIONS_KEEP,
+            DOCUMENT_VERSIONS_MAX_AGE_DAYS,
+            VERSION_PRUNE_BATCH_SIZE,
+        )
+        unreferenced = await crud_blob.release_blobs(db, object_keys)
+        await crud_deletion.enqueue_deletions(db, unreferenced)
+        await db.commit()
+    increment("document_versions_pruned_total", len(object_keys))
+    return len(object_keys)
+
+
+async def run_version_pruner() -> None:
+    """Prune expired versions forever, waiting between passes once caught up."""
+    while True:
+        try:
+            pruned = await prune_document_versions()
+        except Exception:
+            logger.exception("Document version pruning batch failed")
+            pruned = 0
+        if pruned < VERSION_PRUNE_BATCH_SIZE:
+            await asyncio.sleep(VERSION_PRUNE_INTERVAL)
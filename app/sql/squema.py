@@ -19,7 +19,18 @@ create_documents_table = """
 CREATE TABLE IF NOT EXISTS documents (
     id SERIAL PRIMARY KEY,
     name VARCHAR NOT NULL,
-    url VARCHAR NOT NULL,
+    object_key VARCHAR NOT NULL,
+    content_type VARCHAR,
+    size BIGINT,
+    checksum VARCHAR(64),
+    object_missing_at TIMESTAMP,
+    content_encoding VARCHAR,
+    preview_status VARCHAR,
+    search_status VARCHAR,
+    content_text TEXT,
+    search_vector TSVECTOR,
+    tags TEXT[] NOT NULL DEFAULT '{}',
+    version INTEGER NOT NULL DEFAULT 1,
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     project_id INTEGER NOT NULL,
     CONSTRAINT fk_project
@@ -45,3 +56,273 @@ CREATE TABLE IF NOT EXISTS users_projects (
         ON DELETE CASCADE
 );
 """
+
+create_blobs_table = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 VARCHAR(64) PRIMARY KEY,
+    object_key VARCHAR NOT NULL UNIQUE,
+    size BIGINT NOT NULL,
+    content_encoding VARCHAR,
+    ref_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+create_storage_deletions_table = """
+CREATE TABLE IF NOT EXISTS storage_deletions (
+    id BIGSERIAL PRIMARY KEY,
+    object_key VARCHAR NOT NULL,
+    enqueued_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error VARCHAR
+);
+"""
+
+create_document_versions_table = """
+CREATE TABLE IF NOT EXISTS document_versions (
+    id BIGSERIAL PRIMARY KEY,
+    document_id INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    name VARCHAR NOT NULL,
+    object_key VARCHAR NOT NULL,
+    content_type VARCHAR,
+    size BIGINT,
+    checksum VARCHAR(64),
+    content_encoding VARCHAR,
+    archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_document
+        FOREIGN KEY(document_id)
+        REFERENCES documents(id)
+        ON DELETE CASCADE
+);
+"""
+
+create_upload_sessions_table = """
+CREATE TABLE IF NOT EXISTS upload_sessions (
+    id VARCHAR(32) PRIMARY KEY,
+    project_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    filename VARCHAR NOT NULL,
+    object_key VARCHAR NOT NULL,
+    s3_upload_id VARCHAR NOT NULL,
+    content_type VARCHAR,
+    size BIGINT NOT NULL,
+    upload_offset BIGINT NOT NULL DEFAULT 0,
+    parts JSONB NOT NULL DEFAULT '[]',
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL,
+    CONSTRAINT fk_project
+        FOREIGN KEY(project_id)
+        REFERENCES projects(id)
+        ON DELETE CASCADE,
+    CONSTRAINT fk_user
+        FOREIGN KEY(user_id)
+        REFERENCES users(id)
+        ON DELETE CASCADE
+);
+"""
+
+create_project_usage_table = """
+CREATE TABLE IF NOT EXISTS project_usage (
+    project_id INTEGER PRIMARY KEY,
+    document_count BIGINT NOT NULL DEFAULT 0,
+    total_bytes BIGINT NOT NULL DEFAULT 0,
+    CONSTRAINT fk_project
+        FOREIGN KEY(project_id)
+        REFERENCES projects(id)
+        ON DELETE CASCADE
+);
+"""
+
+create_quota_reservations_table = """
+CREATE TABLE IF NOT EXISTS quota_reservations (
+    id BIGSERIAL PRIMARY KEY,
+    project_id INTEGER NOT NULL,
+    documents INTEGER NOT NULL,
+    size BIGINT NOT NULL,
+    expires_at TIMESTAMP NOT NULL,
+    CONSTRAINT fk_project
+        FOREIGN KEY(project_id)
+        REFERENCES projects(id)
+        ON DELETE CASCADE
+);
+"""
+
+create_project_events_table = """
+CREATE TABLE IF NOT EXISTS project_events (
+    id BIGSERIAL PRIMARY KEY,
+    project_id INTEGER NOT NULL,
+    event_type VARCHAR NOT NULL,
+    data JSONB NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_project
+        FOREIGN KEY(project_id)
+        REFERENCES projects(id)
+        ON DELETE CASCADE
+);
+"""
+
+# Documents used to store a public S3 URL; they now store the object key and
+# are served through short-lived presigned URLs.
+migrate_documents_object_key = [
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS object_key VARCHAR",
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'documents' AND column_name = 'url'
+        ) THEN
+            UPDATE documents
+            SET object_key = regexp_replace(url, '^https?://[^/]+/', '')
+            WHERE object_key IS NULL;
+            ALTER TABLE documents ALTER COLUMN url DROP NOT NULL;
+        END IF;
+    END $$;
+    """,
+    "ALTER TABLE documents ALTER COLUMN object_key SET NOT NULL",
+]
+
+migrate_documents_version = [
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1",
+]
+
+migrate_documents_content_type = [
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_type VARCHAR",
+    "ALTER TABLE document_versions ADD COLUMN IF NOT EXISTS content_type VARCHAR",
+]
+
+migrate_documents_metadata = [
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS size BIGINT",
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS checksum VARCHAR(64)",
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS object_missing_at TIMESTAMP",
+    "ALTER TABLE document_versions ADD COLUMN IF NOT EXISTS size BIGINT",
+    "ALTER TABLE document_versions ADD COLUMN IF NOT EXISTS checksum VARCHAR(64)",
+]
+
+migrate_documents_preview = [
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS preview_status VARCHAR",
+]
+
+migrate_content_encoding = [
+    "ALTER TABLE blobs ADD COLUMN IF NOT EXISTS content_encoding VARCHAR",
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_encoding VARCHAR",
+    "ALTER TABLE document_versions ADD COLUMN IF NOT EXISTS content_encoding VARCHAR",
+]
+
+# Existing documents are queued once so the indexer picks them up.
+migrate_documents_search = [
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS search_status VARCHAR",
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_text TEXT",
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS search_vector TSVECTOR",
+    "UPDATE documents SET search_status = 'pending' WHERE search_status IS NULL",
+    # Files that cannot be indexed were once stored without a vector; the indexer
+    # gives them one built from the name
+    "UPDATE documents SET search_status = 'pending' "
+    "WHERE search_status = 'unsupported' AND search_vector IS NULL",
+]
+
+# A constant default does not rewrite the table
+migrate_documents_tags = [
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS tags TEXT[] NOT NULL DEFAULT '{}'",
+]
+
+# Usage counters are seeded once per project from its documents; afterwards
+# they are only changed incrementally. Projects that already have a row are
+# skipped, so this does not rescan documents on every start.
+migrate_project_usage = [
+    """
+    INSERT INTO project_usage (project_id, document_count, total_bytes)
+    SELECT
+        p.id,
+        (SELECT count(*) FROM documents d WHERE d.project_id = p.id),
+        (SELECT coalesce(sum(d.size), 0) FROM documents d WHERE d.project_id = p.id)
+    FROM projects p
+    WHERE NOT EXISTS (SELECT 1 FROM project_usage u WHERE u.project_id = p.id)
+    ON CONFLICT (project_id) DO NOTHING
+    """,
+]
+
+create_indexes = [
+    """
+    CREATE INDEX IF NOT EXISTS ix_storage_deletions_next_attempt_at
+        ON storage_deletions (next_attempt_at)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_document_versions_document_id_id
+        ON document_versions (document_id, id)
+    """,
+    # Version pruning: documents with enough versions to exceed the retention
+    # count, and versions past the age limit
+    """
+    CREATE INDEX IF NOT EXISTS ix_documents_version
+        ON documents (version)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_document_versions_archived_at
+        ON document_versions (archived_at)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_documents_project_id_created_at_id
+        ON documents (project_id, created_at, id)
+    """,
+    # Content-addressed blobs are shared; any other key belongs to one document,
+    # which is what makes completing a direct upload idempotent
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS ix_documents_object_key_unique
+        ON documents (object_key) WHERE object_key NOT LIKE 'blobs/%'
+    """,
+    "DROP INDEX IF EXISTS ix_documents_object_key",
+    """
+    CREATE INDEX IF NOT EXISTS ix_documents_preview_pending
+        ON documents (id) WHERE preview_status = 'pending'
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_documents_search_pending
+        ON documents (id) WHERE search_status = 'pending'
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_documents_search_vector
+        ON documents USING GIN (search_vector)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_documents_tags
+        ON documents USING GIN (tags)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_upload_sessions_expires_at
+        ON upload_sessions (expires_at)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_upload_sessions_project_id
+        ON upload_sessions (project_id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_quota_reservations_project_id
+        ON quota_reservations (project_id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_project_events_project_id_id
+        ON project_events (project_id, id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_project_events_created_at
+        ON project_events (created_at)
+    """,
+    # Global index on long URL strings that no query used
+    "DROP INDEX IF EXISTS ix_documents_url",
+]
+
+migrations = [
+    *migrate_documents_object_key,
+    *migrate_documents_version,
+    *migrate_documents_content_type,
+    *migrate_documents_metadata,
+    *migrate_documents_preview,
+    *migrate_content_encoding,
+    *migrate_documents_search,
+    *migrate_documents_tags,
+    *create_indexes,
+    *migrate_project_usage,
+]
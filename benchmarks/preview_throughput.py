@@ -0,0 +1,65 @@
+"""Measure thumbnail throughput per core.
+
+Renders the same synthetic originals with process pools of increasing size
+and prints images per second overall and per worker process, which is the
+number to size PREVIEW_PROCESS_WORKERS and PREVIEW_CONCURRENCY against.
+
+Usage:
+    python -m benchmarks.preview_throughput [--images 48] [--size 256] [--max-workers N]
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import io
+import multiprocessing
+import os
+import random
+import time
+from PIL import Image
+from app.services.previews import make_thumbnail
+
+
+def make_original(width: int, height: int, fmt: str) -> bytes:
+    """Build a noisy image so encoders cannot shortcut flat colors."""
+    noise = Image.effect_noise((width // 8, height // 8), 64).convert("RGB")
+    image = noise.resize((width, height))
+    output = io.BytesIO()
+    if fmt == "JPEG":
+        image.save(output, fmt, quality=90)
+    else:
+        image.save(output, fmt)
+    return output.getvalue()
+
+
+def run(originals: list[bytes], workers: int, size: int) -> float:
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        # Warm up the workers so process start-up is not measured
+        list(executor.map(make_thumbnail, originals[:workers], [size] * workers))
+        start = time.perf_counter()
+        list(executor.map(make_thumbnail, originals, [size] * len(originals)))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=48)
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    samples = [
+        make_original(4000, 3000, "JPEG"),
+        make_original(2400, 1600, "PNG"),
+    ]
+    originals = [random.choice(samples) for _ in range(args.images)]
+    print(f"{'workers':>7} {'seconds':>8} {'img/s':>8} {'img/s/core':>10}")
+    workers = 1
+    while workers <= args.max_workers:
+        elapsed = run(originals, workers, args.size)
+        rate = len(originals) / elapsed
+        print(f"{workers:>7} {elapsed:>8.2f} {rate:>8.1f} {rate / workers:>10.1f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
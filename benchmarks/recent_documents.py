@@ -0,0 +1,148 @@
+"""Measure how the cross-project recent documents feed scales with project count.
+
+Builds a throwaway schema in the database of DATABASE_URL holding a fixed
+set of projects and documents, with one user per membership size (a user
+in 1 project, one in 10, ...). Every user's feed is then read with the
+single LATERAL query behind GET /me/documents/recent, and for comparison
+by walking the user's projects with one listing query each and merging.
+The number of documents stays the same for every row, so only the number
+of projects the user belongs to changes.
+
+Usage:
+    python -m benchmarks.recent_documents [--projects 1,10,100,1000] [--documents 200] [--limit 50] [--repeat 20]
+"""
+import argparse
+import asyncio
+import heapq
+import time
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import engine
+from app.crud import document_crud
+from app.crud import user_project_crud
+from app.models import project_model, user_model  # noqa: F401 (mapper registry)
+from app.sql.squema import (
+    create_documents_table,
+    create_indexes,
+    create_projects_table,
+    create_users_projects_table,
+    create_users_table,
+)
+
+SCHEMA = "bench_recent_documents"
+
+
+async def populate(conn, memberships: list[int], documents: int) -> None:
+    """Create the schema with max(memberships) projects of `documents` documents each."""
+    projects = max(memberships)
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    await conn.execute(text(f"SET search_path TO {SCHEMA}"))
+    for statement in (
+        create_users_table,
+        create_projects_table,
+        create_documents_table,
+        create_users_projects_table,
+        *(s for s in create_indexes if "ix_documents_project_id_created_at_id" in s),
+    ):
+        await conn.execute(text(statement))
+    await conn.execute(
+        text(
+            "INSERT INTO projects (name, description) "
+            "SELECT 'project ' || p, '' FROM generate_series(1, :projects) AS p"
+        ),
+        {"projects": projects},
+    )
+    # Upload times are spread at random so pages interleave across projects
+    await conn.execute(
+        text(
+            "INSERT INTO documents (name, object_key, project_id, created_at) "
+            "SELECT 'doc ' || d, 'projects/' || p || '/doc' || d, p, "
+            "now() - random() * interval '365 days' "
+            "FROM generate_series(1, :projects) AS p, generate_series(1, :documents) AS d"
+        ),
+        {"projects": projects, "documents": documents},
+    )
+    for user_id, count in enumerate(memberships, start=1):
+        await conn.execute(
+            text("INSERT INTO users (id, name, password) VALUES (:id, :name, '')"),
+            {"id": user_id, "name": f"user {user_id}"},
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO users_projects (user_id, project_id, is_owner) "
+                "SELECT :user_id, p, false FROM generate_series(1, :count) AS p"
+            ),
+            {"user_id": user_id, "count": count},
+        )
+    await conn.execute(text("ANALYZE"))
+
+
+async def read_feed(db, user_id: int, limit: int) -> list:
+    """Read the first two pages of the feed with the single query."""
+    page = await document_crud.get_recent_documents_for_user(db, user_id, limit=limit)
+    after = (page[-1].created_at, page[-1].id)
+    page += await document_crud.get_recent_documents_for_user(
+        db, user_id, after=after, limit=limit
+    )
+    return page
+
+
+async def walk_projects(db, user_id: int, limit: int) -> list:
+    """Read the same two pages by listing every project of the user and merging."""
+    memberships = await user_project_crud.get_user_projects(db, user_id)
+    listings = [
+        await document_crud.get_documents_by_project(
+            db, membership.project_id, limit=2 * limit
+        )
+        for membership in memberships
+    ]
+    merged = heapq.merge(
+        *listings, key=lambda document: (document.created_at, document.id), reverse=True
+    )
+    return list(merged)[:2 * limit]
+
+
+async def timed(operation, db, user_id: int, limit: int, repeat: int) -> float:
+    """Return the median time of an operation in milliseconds, after one warm-up run."""
+    await operation(db, user_id, limit)
+    timings = []
+    for _ in range(repeat):
+        db.expunge_all()
+        start = time.perf_counter()
+        await operation(db, user_id, limit)
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2] * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", default="1,10,100,1000")
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    memberships = [int(count) for count in args.projects.split(",")]
+
+    async with engine.connect() as conn:
+        try:
+            await populate(conn, memberships, args.documents)
+            await conn.commit()
+            async with AsyncSession(bind=conn, expire_on_commit=False) as db:
+                print(f"{'projects':>8} {'feed ms':>9} {'walk ms':>9} {'feed ms/project':>16}")
+                for user_id, count in enumerate(memberships, start=1):
+                    feed = await read_feed(db, user_id, args.limit)
+                    walk = await walk_projects(db, user_id, args.limit)
+                    assert [d.id for d in feed] == [d.id for d in walk]
+                    feed_ms = await timed(read_feed, db, user_id, args.limit, args.repeat)
+                    walk_ms = await timed(walk_projects, db, user_id, args.limit, args.repeat)
+                    print(f"{count:>8} {feed_ms:>9.2f} {walk_ms:>9.2f} {feed_ms / count:>16.4f}")
+        finally:
+            await conn.rollback()
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.commit()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,4 +1,6 @@
+from datetime import datetime
 import io
+import time
 
 
 class DummyUser:
@@ -41,16 +43,17 @@ class DummyProjectUpdate:
 
 
 class DummyDocument:
-    def __init__(self, id: int, name: str, url: str):
+    def __init__(self, id: int, name: str, object_key: str):
         self.id = id
         self.name = name
-        self.url = url
+        self.object_key = object_key
+        self.created_at = datetime(2024, 1, 1, 12, 0)
 
 
 class DummyCreateDocument:
-    def __init__(self, name: str, url: str):
+    def __init__(self, name: str, object_key: str):
         self.name = name
-        self.url = url
+        self.object_key = object_key
 
 
 class DummyUploadFile:
@@ -61,14 +64,156 @@ class DummyUploadFile:
 
 
 class DummyDocumentComplex:
-    def __init__(self, id: int, name: str, url: str, project_id: int):
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        object_key: str,
+        project_id: int,
+        version: int = 1,
+        content_encoding: str = None,
+        size: int = None,
+    ):
         self.id = id
         self.name = name
-        self.url = url
+        self.object_key = object_key
         self.project_id = project_id
+        self.version = version
+        self.content_encoding = content_encoding
+        self.size = size
 
 
 class DummyDocumentUpdate:
-    def __init__(self, name: str = None, url: str = None):
+    def __init__(self, name: str = None, object_key: str = None, version: int = None):
         self.name = name
-        self.url = url
+        self.object_key = object_key
+        self.version = version
+
+
+class DummyDocumentVersion:
+    def __init__(self, id: int, document_id: int, version: int, name: str, object_key: str):
+        self.id = id
+        self.document_id = document_id
+        self.version = version
+        self.name = name
+        self.object_key = object_key
+        self.content_type = None
+        self.size = None
+        self.checksum = None
+        self.content_encoding = None
+
+
+def dummy_stored_file(object_key: str, size: int = 11):
+    return {
+        "object_key": object_key,
+        "size": size,
+        "content_type": "text/plain",
+        "checksum": "0" * 64,
+        "content_encoding": None,
+    }
+
+
+class DummyS3Client:
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+
+    def _call(self, name: str, **kwargs):
+        time.sleep(self.delay)
+        if self.fail:
+            raise Exception("S3 unavailable")
+        self.calls.append((name, kwargs))
+
+    def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None):
+        self._call(
+            "upload_fileobj",
+            Bucket=bucket,
+            Key=key,
+            ExtraArgs=ExtraArgs,
+            Body=fileobj.read(),
+        )
+
+    def delete_object(self, Bucket, Key):
+        self._call("delete_object", Bucket=Bucket, Key=Key)
+
+    def delete_objects(self, Bucket, Delete):
+        self._call("delete_objects", Bucket=Bucket, Delete=Delete)
+        keys = [item["Key"] for item in Delete["Objects"]]
+        return {"Errors": [{"Key": k, "Code": "AccessDenied", "Message": "denied"} for k in keys if k.startswith("locked/")]}
+
+    def generate_presigned_url(self, ClientMethod, Params, ExpiresIn):
+        self._call("generate_presigned_url", Params=Params, ExpiresIn=ExpiresIn)
+        return f"https://bucket.s3.amazonaws.com/{Params['Key']}?signature={len(self.calls)}"
+
+
+class DummyStreamingBody:
+    def __init__(self, content: bytes):
+        self.stream = io.BytesIO(content)
+        self.reads = 0
+        self.closed = False
+
+    def read(self, amt: int):
+        self.reads += 1
+        return self.stream.read(amt)
+
+    def close(self):
+        self.closed = True
+
+
+
+class DummySession:
+    def __init__(self):
+        self.commits = 0
+
+    async def commit(self):
+        self.commits += 1
+
+    async def close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class DummyDeletion:
+    def __init__(self, id: int, object_key: str, attempts: int = 0):
+        self.id = id
+        self.object_key = object_key
+        self.attempts = attempts
+
+
+class DummyUploadSession:
+    def __init__(self, id: str, size: int, upload_offset: int = 0, parts: list = None):
+        self.id = id
+        self.project_id = 1
+        self.user_id = 1
+        self.filename = "big.txt"
+        self.object_key = "projects/1/big.txt"
+        self.s3_upload_id = "mpu-1"
+        self.content_type = None
+        self.size = size
+        self.upload_offset = upload_offset
+        self.parts = parts or []
+        self.expires_at = datetime(2024, 1, 2, 12, 0)
+
+
+class DummyChunkRequest:
+    def __init__(self, body: bytes, chunk_size: int = 4):
+        self.body = body
+        self.chunk_size = chunk_size
+
+    async def stream(self):
+        for start in range(0, len(self.body), self.chunk_size):
+            yield self.body[start:start + self.chunk_size]
+
+
+class DummyEvent:
+    def __init__(self, id: int, project_id: int, event_type: str, data: dict):
+        self.id = id
+        self.project_id = project_id
+        self.event_type = event_type
+        self.data = data
@@ -0,0 +1,206 @@
+import asyncio
+import time
+import pytest
+from app.crud import aws_crud
+from app.services import s3_storage
+from app.services.storage_backend import InvalidRangeError
+import tests.dummies as dummies
+
+
+def test_upload_file_success(monkeypatch):
+    """Upload file: stores a private object under a unique key and returns the key"""
+    client = dummies.DummyS3Client()
+    monkeypatch.setattr(s3_storage, "s3_client", client)
+
+    key = asyncio.run(
+        aws_crud.upload_file(dummies.DummyUploadFile("mydoc.txt", b"hello"))
+    )
+
+    name, kwargs = client.calls[0]
+    assert name == "upload_fileobj"
+    assert kwargs["Key"] == key
+    assert key.endswith(".txt")
+    assert "ACL" not in kwargs["ExtraArgs"]
+
+
+def test_upload_file_exception(monkeypatch):
+    """Upload file: S3 error is wrapped"""
+    monkeypatch.setattr(s3_storage, "s3_client", dummies.DummyS3Client(fail=True))
+
+    with pytest.raises(Exception) as excinfo:
+        asyncio.run(
+            aws_crud.upload_file(dummies.DummyUploadFile("mydoc.txt", b"hello"))
+        )
+
+    assert "Error uploading file to S3:" in str(excinfo.value)
+
+
+def test_delete_file_success(monkeypatch):
+    """Delete file: deletes the given key"""
+    client = dummies.DummyS3Client()
+    monkeypatch.setattr(s3_storage, "s3_client", client)
+
+    result = asyncio.run(aws_crud.delete_file("projects/1/abc.txt"))
+
+    assert result is True
+    assert client.calls[0][1]["Key"] == "projects/1/abc.txt"
+
+
+def test_create_presigned_download_reuses_signature(monkeypatch):
+    """Presigned download: the same key is signed once per reuse window"""
+    client = dummies.DummyS3Client()
+    monkeypatch.setattr(s3_storage, "s3_client", client)
+    monkeypatch.setattr(aws_crud, "PRESIGNED_DOWNLOAD_EXPIRATION", 100)
+    monkeypatch.setattr(aws_crud, "_presigned_download_cache", aws_crud.OrderedDict())
+
+    first_url, first_age = aws_crud.create_presigned_download("abc.txt")
+    second_url, second_age = aws_crud.create_presigned_download("abc.txt")
+
+    assert first_url == second_url
+    assert first_age == 80
+    assert 0 <= second_age <= 80
+    assert [name for name, _ in client.calls] == ["generate_presigned_url"]
+
+
+def test_create_presigned_download_evicts_deleted_key(monkeypatch):
+    """Presigned download: deleting the object drops its cached signature"""
+    client = dummies.DummyS3Client()
+    monkeypatch.setattr(s3_storage, "s3_client", client)
+    monkeypatch.setattr(aws_crud, "_presigned_download_cache", aws_crud.OrderedDict())
+
+    aws_crud.create_presigned_download("abc.txt")
+    asyncio.run(aws_crud.delete_file("abc.txt"))
+
+    assert "abc.txt" not in aws_crud._presigned_download_cache
+
+
+def test_upload_file_does_not_block_event_loop(monkeypatch):
+    """A slow upload must not delay other coroutines on the same loop"""
+    monkeypatch.setattr(s3_storage, "s3_client", dummies.DummyS3Client(delay=0.5))
+
+    async def lightweight_requests():
+        worst = 0.0
+        for _ in range(20):
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            worst = max(worst, time.perf_counter() - start)
+        return worst
+
+    async def scenario():
+        upload = asyncio.create_task(
+            aws_crud.upload_file(dummies.DummyUploadFile("big.bin", b"0" * 1024))
+        )
+        worst = await lightweight_requests()
+        await upload
+        return worst
+
+    worst_latency = asyncio.run(scenario())
+
+    assert worst_latency < 0.1
+
+
+def test_parse_range_header():
+    """Range header: only single byte ranges are forwarded to S3"""
+    assert aws_crud.parse_range_header("bytes=0-99") == "bytes=0-99"
+    assert aws_crud.parse_range_header("bytes=100-") == "bytes=100-"
+    assert aws_crud.parse_range_header("bytes=-500") == "bytes=-500"
+    assert aws_crud.parse_range_header("bytes=0-1,5-9") is None
+    assert aws_crud.parse_range_header("items=0-1") is None
+    assert aws_crud.parse_range_header(None) is None
+
+
+def test_iter_file_stream_bounded_read_ahead():
+    """Streaming: S3 is read at most read_ahead chunks ahead of the client"""
+    body = dummies.DummyStreamingBody(b"x" * 100)
+
+    async def scenario():
+        stream = aws_crud.iter_file_stream(body, chunk_size=10, read_ahead=2)
+        first = await stream.__anext__()
+        await asyncio.sleep(0.1)
+        reads_while_client_idle = body.reads
+        rest = [chunk async for chunk in stream]
+        return first, reads_while_client_idle, rest
+
+    first, reads_while_client_idle, rest = asyncio.run(scenario())
+
+    assert first == b"x" * 10
+    assert reads_while_client_idle <= 4
+    assert b"".join([first, *rest]) == b"x" * 100
+    assert body.closed
+
+
+def test_open_file_stream_invalid_range(monkeypatch):
+    """Streaming: unsatisfiable range raises InvalidRangeError"""
+    from botocore.exceptions import ClientError
+
+    class RangeClient:
+        def get_object(self, **kwargs):
+            raise ClientError({"Error": {"Code": "InvalidRange"}}, "GetObject")
+
+    monkeypatch.setattr(s3_storage, "s3_client", RangeClient())
+
+    with pytest.raises(InvalidRangeError):
+        asyncio.run(aws_crud.open_file_stream("abc.txt", "bytes=999-"))
+
+
+def test_open_file_stream_if_range_mismatch(monkeypatch):
+    """Streaming: a stale If-Range validator returns the whole object"""
+    from botocore.exceptions import ClientError
+
+    class ChangedClient:
+        def __init__(self):
+            self.calls = []
+
+        def get_object(self, **kwargs):
+            self.calls.append(kwargs)
+            if "IfMatch" in kwargs:
+                raise ClientError({"Error": {"Code": "PreconditionFailed"}}, "GetObject")
+            return {
+                "Body": dummies.DummyStreamingBody(b"new"),
+                "ContentLength": 3,
+                "ETag": '"new"',
+            }
+
+    client = ChangedClient()
+    monkeypatch.setattr(s3_storage, "s3_client", client)
+
+    stream = asyncio.run(
+        aws_crud.open_file_stream("abc.txt", "bytes=0-1", '"old"')
+    )
+
+    assert stream["content_range"] is None
+    assert stream["content_length"] == 3
+    assert "Range" not in client.calls[-1]
+
+
+def test_delete_files_batches_and_reports_errors(monkeypatch):
+    """Bulk delete: keys grouped into DeleteObjects calls of up to 1,000"""
+    client = dummies.DummyS3Client()
+    monkeypatch.setattr(s3_storage, "s3_client", client)
+    keys = [f"blobs/{i}" for i in range(2500)] + ["locked/x"]
+
+    errors = asyncio.run(aws_crud.delete_files(keys))
+
+    batches = [kwargs["Delete"]["Objects"] for name, kwargs in client.calls]
+    assert [len(batch) for batch in batches] == [1000, 1000, 501]
+    assert list(errors) == ["locked/x"]
+
+
+def test_upload_file_compresses_with_encoding(monkeypatch):
+    """Upload file: with an encoding the stored body is zstd and tagged as such"""
+    import zstandard
+
+    client = dummies.DummyS3Client()
+    monkeypatch.setattr(s3_storage, "s3_client", client)
+    content = b"hello world\n" * 1000
+
+    asyncio.run(
+        aws_crud.upload_file(
+            dummies.DummyUploadFile("notes.txt", content), "blobs/abc", "text/plain", "zstd"
+        )
+    )
+
+    kwargs = client.calls[0][1]
+    assert kwargs["ExtraArgs"]["ContentEncoding"] == "zstd"
+    assert len(kwargs["Body"]) < len(content)
+    assert zstandard.ZstdDecompressor().decompressobj().decompress(kwargs["Body"]) == content
@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+from app.crud import blob_crud
+import tests.dummies as dummies
+
+
+def test_inspect_file_digest_size_and_type():
+    """Inspect file: SHA-256, size and sniffed type of the content, file rewound"""
+    file = dummies.DummyUploadFile("report.bin", b"%PDF-1.7 hello world")
+
+    metadata = asyncio.run(blob_crud.inspect_file(file))
+
+    assert metadata["checksum"] == hashlib.sha256(b"%PDF-1.7 hello world").hexdigest()
+    assert metadata["size"] == 20
+    assert metadata["content_type"] == "application/pdf"
+    assert file.file.tell() == 0
+
+
+def test_store_file_duplicate_skips_upload(monkeypatch):
+    """Store file: known content reuses the blob without uploading"""
+    uploads = []
+
+    async def fake_acquire_blob(db, sha256):
+        return f"blobs/{sha256}", "zstd"
+
+    async def fake_upload_file(file, key=None, content_type=None, content_encoding=None):
+        uploads.append(key)
+
+    monkeypatch.setattr(blob_crud, "acquire_blob", fake_acquire_blob)
+    monkeypatch.setattr(blob_crud, "upload_file", fake_upload_file)
+
+    stored = asyncio.run(
+        blob_crud.store_file(None, dummies.DummyUploadFile("a.txt", b"same"))
+    )
+
+    assert stored["object_key"] == f"blobs/{hashlib.sha256(b'same').hexdigest()}"
+    assert stored["size"] == 4
+    assert stored["content_encoding"] == "zstd"
+    assert uploads == []
+
+
+def test_store_file_new_content_uploads_and_registers(monkeypatch):
+    """Store file: new content is uploaded under its hash and registered, pending deletions dropped first"""
+    registered = []
+    steps = []
+
+    async def fake_acquire_blob(db, sha256):
+        return None
+
+    async def fake_cancel_deletions(db, object_keys):
+        steps.append(("cancel", object_keys))
+
+    async def fake_upload_file(file, key=None, content_type=None, content_encoding=None):
+        steps.append(("upload", key))
+        return key
+
+    async def fake_register_blob(db, sha256, object_key, size, content_encoding=None):
+        registered.append((sha256, object_key, size, content_encoding))
+
+    monkeypatch.setattr(blob_crud, "acquire_blob", fake_acquire_blob)
+    monkeypatch.setattr(blob_crud, "cancel_deletions", fake_cancel_deletions)
+    monkeypatch.setattr(blob_crud, "upload_file", fake_upload_file)
+    monkeypatch.setattr(blob_crud, "register_blob", fake_register_blob)
+
+    stored = asyncio.run(
+        blob_crud.store_file(None, dummies.DummyUploadFile("a.txt", b"new"))
+    )
+
+    sha256 = hashlib.sha256(b"new").hexdigest()
+    assert stored["object_key"] == f"blobs/{sha256}"
+    assert stored["checksum"] == sha256
+    assert stored["content_type"] == "text/plain"
+    assert registered == [(sha256, stored["object_key"], 3, None)]
+    assert steps == [("cancel", [stored["object_key"]]), ("upload", stored["object_key"])]
+
+
+def test_store_file_compresses_large_text(monkeypatch):
+    """Store file: text above the minimum size is uploaded with zstd encoding"""
+    encodings = []
+
+    async def fake_acquire_blob(db, sha256):
+        return None
+
+    async def fake_upload_file(file, key=None, content_type=None, content_encoding=None):
+        encodings.append(content_encoding)
+        return key
+
+    async def fake_register_blob(db, sha256, object_key, size, content_encoding=None):
+        pass
+
+    async def fake_cancel_deletions(db, object_keys):
+        pass
+
+    monkeypatch.setattr(blob_crud, "acquire_blob", fake_acquire_blob)
+    monkeypatch.setattr(blob_crud, "cancel_deletions", fake_cancel_deletions)
+    monkeypatch.setattr(blob_crud, "upload_file", fake_upload_file)
+    monkeypatch.setattr(blob_crud, "register_blob", fake_register_blob)
+
+    stored = asyncio.run(
+        blob_crud.store_file(None, dummies.DummyUploadFile("a.log", b"line\n" * 2000))
+    )
+
+    assert stored["content_encoding"] == "zstd"
+    assert encodings == ["zstd"]
+
+
+
+def test_detect_content_type():
+    """Content type: magic bytes win over the name, containers use the extension"""
+    from app.services.content_type import detect_content_type
+
+    assert detect_content_type(b"\x89PNG\r\n\x1a\n...", "photo.txt") == "image/png"
+    assert detect_content_type(b"PK\x03\x04...", "a.docx").endswith(
+        "wordprocessingml.document"
+    )
+    assert detect_content_type(b"PK\x03\x04...", "a.bin") == "application/zip"
+    assert detect_content_type(b"a,b\n1,2\n", "data.csv") == "text/csv"
+    assert detect_content_type(b"\x00\x01\x02", "blob", "image/x-foo") == "image/x-foo"
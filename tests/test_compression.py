@@ -0,0 +1,45 @@
+import asyncio
+import zstandard
+from app.services import compression
+
+
+def test_choose_content_encoding(monkeypatch):
+    """Compression: only text-like files above the minimum size are compressed"""
+    monkeypatch.setattr(compression, "COMPRESSION_MIN_SIZE", 100)
+
+    assert compression.choose_content_encoding("text/csv", 1000) == "zstd"
+    assert compression.choose_content_encoding("application/json", 1000) == "zstd"
+    assert compression.choose_content_encoding("text/plain", 99) is None
+    assert compression.choose_content_encoding("image/png", 1000) is None
+    assert compression.choose_content_encoding(None, 1000) is None
+
+
+def test_choose_content_encoding_disabled(monkeypatch):
+    """Compression: STORAGE_COMPRESSION=none stores everything as is"""
+    monkeypatch.setattr(compression, "STORAGE_COMPRESSION", "none")
+
+    assert compression.choose_content_encoding("text/plain", 10**6) is None
+
+
+def test_accepts_encoding():
+    """Accept-Encoding: explicit codings, wildcards and q=0 are honored"""
+    assert compression.accepts_encoding("gzip, zstd", "zstd")
+    assert compression.accepts_encoding("gzip;q=1.0, *;q=0.5", "zstd")
+    assert not compression.accepts_encoding("gzip, deflate, br", "zstd")
+    assert not compression.accepts_encoding("zstd;q=0, *", "zstd")
+    assert not compression.accepts_encoding(None, "zstd")
+
+
+def test_decompress_stream_round_trip():
+    """Decompress stream: chunked zstd input yields the original bytes"""
+    content = b"0123456789" * 5000
+    compressed = zstandard.ZstdCompressor().compress(content)
+
+    async def chunks():
+        for i in range(0, len(compressed), 100):
+            yield compressed[i : i + 100]
+
+    async def scenario():
+        return b"".join([chunk async for chunk in compression.decompress_stream(chunks())])
+
+    assert asyncio.run(scenario()) == content
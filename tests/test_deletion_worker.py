@@ -0,0 +1,84 @@
+import asyncio
+from datetime import datetime, timedelta
+from app.services import deletion_worker
+from app.services import metrics
+import tests.dummies as dummies
+
+
+def patch_queue(monkeypatch, deletions, referenced=(), errors=None, oldest=None):
+    session = dummies.DummySession()
+    calls = {"deleted": None, "completed": None, "retried": None}
+
+    async def fake_claim_due_deletions(db, limit):
+        return deletions
+
+    async def fake_get_referenced_keys(db, object_keys):
+        return set(referenced)
+
+    async def fake_delete_files(keys):
+        calls["deleted"] = keys
+        return errors or {}
+
+    async def fake_complete_deletions(db, deletion_ids):
+        calls["completed"] = deletion_ids
+
+    async def fake_retry_deletions(db, failed, errors):
+        calls["retried"] = [d.id for d in failed]
+
+    async def fake_get_deletion_backlog(db):
+        return len(calls["retried"] or []), oldest
+
+    monkeypatch.setattr(deletion_worker, "AsyncSessionLocal", lambda: session)
+    monkeypatch.setattr(deletion_worker.crud_deletion, "claim_due_deletions", fake_claim_due_deletions)
+    monkeypatch.setattr(deletion_worker.crud_blob, "get_referenced_keys", fake_get_referenced_keys)
+    monkeypatch.setattr(deletion_worker, "delete_files", fake_delete_files)
+    monkeypatch.setattr(deletion_worker.crud_deletion, "complete_deletions", fake_complete_deletions)
+    monkeypatch.setattr(deletion_worker.crud_deletion, "retry_deletions", fake_retry_deletions)
+    monkeypatch.setattr(deletion_worker.crud_deletion, "get_deletion_backlog", fake_get_deletion_backlog)
+    monkeypatch.setattr(metrics, "metrics", {})
+    monkeypatch.setattr(deletion_worker, "increment", metrics.increment)
+    monkeypatch.setattr(deletion_worker, "set_gauge", metrics.set_gauge)
+    return session, calls
+
+
+def test_drain_deletion_queue_deletes_batch(monkeypatch):
+    """Deletion worker: one DeleteObjects pass for the batch and its previews, then commit"""
+    deletions = [dummies.DummyDeletion(1, "a"), dummies.DummyDeletion(2, "b")]
+    session, calls = patch_queue(monkeypatch, deletions)
+
+    processed = asyncio.run(deletion_worker.drain_deletion_queue())
+
+    assert processed == 2
+    assert calls["deleted"] == ["a", "b", "a.preview.jpg", "b.preview.jpg"]
+    assert calls["completed"] == [1, 2]
+    assert calls["retried"] == []
+    assert session.commits == 1
+    assert metrics.metrics["storage_deletion_processed_total"] == 2
+
+
+def test_drain_deletion_queue_skips_referenced_keys(monkeypatch):
+    """Deletion worker: keys used again by a blob are dropped without deleting the object"""
+    deletions = [dummies.DummyDeletion(1, "blobs/abc"), dummies.DummyDeletion(2, "b")]
+    session, calls = patch_queue(monkeypatch, deletions, referenced={"blobs/abc"})
+
+    asyncio.run(deletion_worker.drain_deletion_queue())
+
+    assert calls["deleted"] == ["b", "b.preview.jpg"]
+    assert calls["completed"] == [1, 2]
+
+
+def test_drain_deletion_queue_retries_failures_and_reports_lag(monkeypatch):
+    """Deletion worker: failed keys are retried later and lag is reported"""
+    deletions = [dummies.DummyDeletion(1, "a"), dummies.DummyDeletion(2, "b")]
+    oldest = datetime.now() - timedelta(seconds=90)
+    session, calls = patch_queue(
+        monkeypatch, deletions, errors={"b": "AccessDenied"}, oldest=oldest
+    )
+
+    asyncio.run(deletion_worker.drain_deletion_queue())
+
+    assert calls["completed"] == [1]
+    assert calls["retried"] == [2]
+    assert metrics.metrics["storage_deletion_failed_total"] == 1
+    assert metrics.metrics["storage_deletion_pending"] == 1
+    assert metrics.metrics["storage_deletion_lag_seconds"] >= 90
@@ -1,10 +1,32 @@
 import asyncio
+from datetime import datetime
 import pytest
-from fastapi import HTTPException
-from app.routers.document_route import get_document, update_document, delete_document
-from app.crud import user_project_crud as crud_user_project
+import zstandard
+from fastapi import HTTPException, Response
+from app.routers.document_route import (
+    get_document,
+    download_document,
+    preview_document,
+    stream_document,
+    update_document,
+    get_document_versions,
+    restore_document_version,
+    move_document,
+    copy_document,
+    delete_document,
+)
+from app.routers.me_route import get_recent_documents
 from app.crud import document_crud as crud_documents
+from app.crud import blob_crud as crud_blob
+from app.crud import storage_deletion_crud as crud_deletion
+from app.crud import document_version_crud as crud_version
+from app.crud import project_usage_crud as crud_usage
 import app.controllers.document_controller as controller
+from app.schemas.document_schema import (
+    DocumentTransfer,
+    DocumentUpdate,
+    RecentDocumentsQuery,
+)
 import tests.dummies as dummies
 
 
@@ -12,20 +34,14 @@ def test_get_document_success(monkeypatch):
     """Get document for a user: returns the document"""
     document_id = 1
 
-    async def fake_get_document_by_id(db, document_id: int):
-        return dummies.DummyDocumentComplex(
-            id=document_id, name="Doc1", url="http://example.com/doc1", project_id=1
-        )
-
-    async def fake_is_project_from_user(db, user_id: int, document_id: int):
-        return dummies.DummyUserProject(
-            is_owner=True,
-            project=dummies.DummyProject(id=1, name="Project1", description="Desc"),
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        document = dummies.DummyDocumentComplex(
+            id=document_id, name="Doc1", object_key="doc1.txt", project_id=1
         )
+        return document, True
 
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
     monkeypatch.setattr(
-        crud_user_project, "is_project_from_user", fake_is_project_from_user
+        crud_documents, "get_document_for_user", fake_get_document_for_user
     )
 
     result = asyncio.run(
@@ -39,7 +55,7 @@ def test_get_document_success(monkeypatch):
     assert isinstance(result, dummies.DummyDocumentComplex)
     assert result.id == document_id
     assert result.name == "Doc1"
-    assert result.url == "http://example.com/doc1"
+    assert result.object_key == "doc1.txt"
     assert result.project_id == 1
 
 
@@ -47,10 +63,12 @@ def test_get_document_not_found(monkeypatch):
     """Get document: document not found -> 404"""
     document_id = 1
 
-    async def fake_get_document_by_id(db, document_id: int):
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
         return None
 
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
+    monkeypatch.setattr(
+        crud_documents, "get_document_for_user", fake_get_document_for_user
+    )
 
     with pytest.raises(HTTPException) as excinfo:
         asyncio.run(
@@ -69,17 +87,11 @@ def test_get_document_not_project_from_user(monkeypatch):
     """Get document: project not associated with user -> 404"""
     document_id = 1
 
-    async def fake_get_document_by_id(db, document_id: int):
-        return dummies.DummyDocumentComplex(
-            id=document_id, name="Doc1", url="http://example.com/doc1", project_id=1
-        )
-
-    async def fake_is_project_from_user(db, user_id: int, document_id: int):
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
         return None
 
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
     monkeypatch.setattr(
-        crud_user_project, "is_project_from_user", fake_is_project_from_user
+        crud_documents, "get_document_for_user", fake_get_document_for_user
     )
 
     with pytest.raises(HTTPException) as excinfo:
@@ -99,39 +111,11 @@ def test_get_document_search_exception(monkeypatch):
     """Get document DB error when fetching -> 500"""
     document_id = 1
 
-    async def fake_get_document_by_id(db, document_id: int):
-        raise Exception("Database error")
-
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
-
-    with pytest.raises(HTTPException) as excinfo:
-        asyncio.run(
-            get_document(
-                document_id=document_id,
-                user=dummies.DummyUser(id=1, name="alice", password="secret"),
-                db=None,
-            )
-        )
-
-    assert excinfo.value.status_code == 500
-    assert "Failed to retrieve document:" in excinfo.value.detail
-
-
-def test_get_document_project_from_user_exception(monkeypatch):
-    """Get document DB error when checking project -> 500"""
-    document_id = 1
-
-    async def fake_get_document_by_id(db, document_id: int):
-        return dummies.DummyDocumentComplex(
-            id=document_id, name="Doc1", url="http://example.com/doc1", project_id=1
-        )
-
-    async def fake_is_project_from_user(db, user_id: int, document_id: int):
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
         raise Exception("Database error")
 
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
     monkeypatch.setattr(
-        crud_user_project, "is_project_from_user", fake_is_project_from_user
+        crud_documents, "get_document_for_user", fake_get_document_for_user
     )
 
     with pytest.raises(HTTPException) as excinfo:
@@ -152,39 +136,33 @@ def test_update_document_success(monkeypatch):
     document_id = 1
     file = dummies.DummyUploadFile("mydoc.txt", b"hello world")
 
-    async def fake_get_document_by_id(db, document_id: int):
-        return dummies.DummyDocumentComplex(
-            id=document_id, name="Doc1", url="http://example.com/doc1", project_id=1
-        )
-
-    async def fake_is_project_from_user(db, user_id: int, document_id: int):
-        return dummies.DummyUserProject(
-            is_owner=True,
-            project=dummies.DummyProject(id=1, name="Project1", description="Desc"),
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        document = dummies.DummyDocumentComplex(
+            id=document_id, name="Doc1", object_key="doc1.txt", project_id=1
         )
+        return document, True
 
-    async def fake_upload_file_to_s3(file):
-        return "https://bucket.s3.amazonaws.com/mydoc.txt"
+    async def fake_archive_document(db, db_document):
+        return None
 
-    async def fake_delete_file_from_s3(url):
-        return True
+    async def fake_store_file(db, file, db_lock=None):
+        return dummies.dummy_stored_file("mydoc.txt")
 
-    async def fake_update_document(db, document_id: int, document: dummies.DummyDocumentUpdate):
+    async def fake_update_document(
+        db, document_id: int, document: dummies.DummyDocumentUpdate, reservation_id=None
+    ):
         return dummies.DummyDocumentComplex(
             id=document_id,
             name=document.name,
-            url=document.url,
+            object_key=document.object_key,
             project_id=1
         )
 
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
-    monkeypatch.setattr(
-        crud_user_project, "is_project_from_user", fake_is_project_from_user
-    )
-    monkeypatch.setattr(controller, "delete_file_from_s3", fake_delete_file_from_s3)
     monkeypatch.setattr(
-        controller, "upload_file_to_s3", fake_upload_file_to_s3
+        crud_documents, "get_document_for_user", fake_get_document_for_user
     )
+    monkeypatch.setattr(crud_blob, "store_file", fake_store_file)
+    monkeypatch.setattr(crud_version, "archive_document", fake_archive_document)
     monkeypatch.setattr(crud_documents, "update_document", fake_update_document)
 
     result = asyncio.run(
@@ -199,7 +177,7 @@ def test_update_document_success(monkeypatch):
     assert isinstance(result, dummies.DummyDocumentComplex)
     assert result.id == document_id
     assert result.name == "mydoc.txt"
-    assert result.url == "https://bucket.s3.amazonaws.com/mydoc.txt"
+    assert result.object_key == "mydoc.txt"
     assert result.project_id == 1
 
 
@@ -208,10 +186,12 @@ def test_update_document_not_found(monkeypatch):
     document_id = 1
     file = dummies.DummyUploadFile("mydoc.txt", b"hello world")
 
-    async def fake_get_document_by_id(db, document_id: int):
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
         return None
 
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
+    monkeypatch.setattr(
+        crud_documents, "get_document_for_user", fake_get_document_for_user
+    )
 
     with pytest.raises(HTTPException) as excinfo:
         asyncio.run(
@@ -232,17 +212,11 @@ def test_update_document_not_project_user(monkeypatch):
     document_id = 1
     file = dummies.DummyUploadFile("mydoc.txt", b"hello world")
 
-    async def fake_get_document_by_id(db, document_id: int):
-        return dummies.DummyDocumentComplex(
-            id=document_id, name="Doc1", url="http://example.com/doc1", project_id=1
-        )
-
-    async def fake_is_project_from_user(db, user_id: int, document_id: int):
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
         return None
 
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
     monkeypatch.setattr(
-        crud_user_project, "is_project_from_user", fake_is_project_from_user
+        crud_documents, "get_document_for_user", fake_get_document_for_user
     )
     with pytest.raises(HTTPException) as excinfo:
         asyncio.run(
@@ -263,41 +237,11 @@ def test_update_document_get_document_exception(monkeypatch):
     document_id = 1
     file = dummies.DummyUploadFile("mydoc.txt", b"hello world")
 
-    async def fake_get_document_by_id(db, document_id: int):
-        raise Exception("Database error")
-
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
-
-    with pytest.raises(HTTPException) as excinfo:
-        asyncio.run(
-            update_document(
-                document_id=document_id,
-                file=file,
-                user=dummies.DummyUser(id=1, name="alice", password="secret"),
-                db=None,
-            )
-        )
-
-    assert excinfo.value.status_code == 500
-    assert "Failed to update document:" in excinfo.value.detail
-
-
-def test_update_document_is_project_from_user_exception(monkeypatch):
-    """Update document DB error when checking project -> 500"""
-    document_id = 1
-    file = dummies.DummyUploadFile("mydoc.txt", b"hello world")
-
-    async def fake_get_document_by_id(db, document_id: int):
-        return dummies.DummyDocumentComplex(
-            id=document_id, name="Doc1", url="http://example.com/doc1", project_id=1
-        )
-
-    async def fake_is_project_from_user(db, user_id: int, document_id: int):
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
         raise Exception("Database error")
 
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
     monkeypatch.setattr(
-        crud_user_project, "is_project_from_user", fake_is_project_from_user
+        crud_documents, "get_document_for_user", fake_get_document_for_user
     )
 
     with pytest.raises(HTTPException) as excinfo:
@@ -319,33 +263,27 @@ def test_update_document_update_document_exception(monkeypatch):
     document_id = 1
     file = dummies.DummyUploadFile("mydoc.txt", b"hello world")
 
-    async def fake_get_document_by_id(db, document_id: int):
-        return dummies.DummyDocumentComplex(
-            id=document_id, name="Doc1", url="http://example.com/doc1", project_id=1
-        )
-
-    async def fake_is_project_from_user(db, user_id: int, document_id: int):
-        return dummies.DummyUserProject(
-            is_owner=True,
-            project=dummies.DummyProject(id=1, name="Project1", description="Desc"),
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        document = dummies.DummyDocumentComplex(
+            id=document_id, name="Doc1", object_key="doc1.txt", project_id=1
         )
+        return document, True
 
-    async def fake_update_document(db, document_id: int, document: dummies.DummyDocumentUpdate):
+    async def fake_update_document(
+        db, document_id: int, document: dummies.DummyDocumentUpdate, reservation_id=None
+    ):
         raise Exception("Database error")
 
-    async def fake_upload_file_to_s3(file):
-        return "https://bucket.s3.amazonaws.com/mydoc.txt"
+    async def fake_archive_document(db, db_document):
+        return None
 
-    async def fake_delete_file_from_s3(url):
-        return True
+    async def fake_store_file(db, file, db_lock=None):
+        return dummies.dummy_stored_file("mydoc.txt")
 
-    monkeypatch.setattr(controller, "delete_file_from_s3", fake_delete_file_from_s3)
-    monkeypatch.setattr(
-        controller, "upload_file_to_s3", fake_upload_file_to_s3
-    )
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
+    monkeypatch.setattr(crud_blob, "store_file", fake_store_file)
+    monkeypatch.setattr(crud_version, "archive_document", fake_archive_document)
     monkeypatch.setattr(
-        crud_user_project, "is_project_from_user", fake_is_project_from_user
+        crud_documents, "get_document_for_user", fake_get_document_for_user
     )
     monkeypatch.setattr(crud_documents, "update_document", fake_update_document)
 
@@ -368,39 +306,33 @@ def test_update_document_exception_upload_aws(monkeypatch):
     document_id = 1
     file = dummies.DummyUploadFile("mydoc.txt", b"hello world")
 
-    async def fake_get_document_by_id(db, document_id: int):
-        return dummies.DummyDocumentComplex(
-            id=document_id, name="Doc1", url="http://example.com/doc1", project_id=1
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        document = dummies.DummyDocumentComplex(
+            id=document_id, name="Doc1", object_key="doc1.txt", project_id=1
         )
+        return document, True
 
-    async def fake_is_project_from_user(db, user_id: int, document_id: int):
-        return dummies.DummyUserProject(
-            is_owner=True,
-            project=dummies.DummyProject(id=1, name="Project1", description="Desc"),
-        )
+    async def fake_archive_document(db, db_document):
+        return None
 
-    async def fake_upload_file_to_s3(file):
+    async def fake_store_file(db, file, db_lock=None):
         raise Exception("DB Error")
 
-    async def fake_delete_file_from_s3(url):
-        return True
-
-    async def fake_update_document(db, document_id: int, document: dummies.DummyDocumentUpdate):
+    async def fake_update_document(
+        db, document_id: int, document: dummies.DummyDocumentUpdate, reservation_id=None
+    ):
         return dummies.DummyDocumentComplex(
             id=document_id,
             name=document.name,
-            url=document.url,
+            object_key=document.object_key,
             project_id=1
         )
 
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
-    monkeypatch.setattr(
-        crud_user_project, "is_project_from_user", fake_is_project_from_user
-    )
-    monkeypatch.setattr(controller, "delete_file_from_s3", fake_delete_file_from_s3)
     monkeypatch.setattr(
-        controller, "upload_file_to_s3", fake_upload_file_to_s3
+        crud_documents, "get_document_for_user", fake_get_document_for_user
     )
+    monkeypatch.setattr(crud_blob, "store_file", fake_store_file)
+    monkeypatch.setattr(crud_version, "archive_document", fake_archive_document)
     monkeypatch.setattr(crud_documents, "update_document", fake_update_document)
 
     with pytest.raises(HTTPException) as excinfo:
@@ -417,45 +349,79 @@ def test_update_document_exception_upload_aws(monkeypatch):
     assert "Failed to update document:" in excinfo.value.detail
 
 
-def test_update_document_exception_delete_aws(monkeypatch):
-    """Update document AWS delete error -> 500"""
+def test_update_document_archives_previous_version(monkeypatch):
+    """Update document: new file stored first, previous file kept as a version"""
     document_id = 1
     file = dummies.DummyUploadFile("mydoc.txt", b"hello world")
+    events = []
 
-    async def fake_get_document_by_id(db, document_id: int):
-        return dummies.DummyDocumentComplex(
-            id=document_id, name="Doc1", url="http://example.com/doc1", project_id=1
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        document = dummies.DummyDocumentComplex(
+            id=document_id, name="Doc1", object_key="doc1.txt", project_id=1
         )
+        return document, True
 
-    async def fake_is_project_from_user(db, user_id: int, document_id: int):
-        return dummies.DummyUserProject(
-            is_owner=True,
-            project=dummies.DummyProject(id=1, name="Project1", description="Desc"),
-        )
+    async def fake_archive_document(db, db_document):
+        events.append(("archive", db_document.object_key, db_document.version))
 
-    async def fake_upload_file_to_s3(file):
-        return "https:..."
+    async def fake_store_file(db, file, db_lock=None):
+        events.append("upload")
+        return dummies.dummy_stored_file("mydoc.txt")
 
-    async def fake_delete_file_from_s3(url):
-        raise Exception("DB Error")
-
-    async def fake_update_document(db, document_id: int, document: dummies.DummyDocumentUpdate):
+    async def fake_update_document(
+        db, document_id: int, document: dummies.DummyDocumentUpdate, reservation_id=None
+    ):
+        events.append(("commit", document.version))
         return dummies.DummyDocumentComplex(
             id=document_id,
             name=document.name,
-            url=document.url,
+            object_key=document.object_key,
             project_id=1
         )
 
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
     monkeypatch.setattr(
-        crud_user_project, "is_project_from_user", fake_is_project_from_user
+        crud_documents, "get_document_for_user", fake_get_document_for_user
+    )
+    monkeypatch.setattr(crud_blob, "store_file", fake_store_file)
+    monkeypatch.setattr(crud_version, "archive_document", fake_archive_document)
+    monkeypatch.setattr(crud_documents, "update_document", fake_update_document)
+
+    result = asyncio.run(
+        update_document(
+            document_id=document_id,
+            file=file,
+            user=dummies.DummyUser(id=1, name="alice", password="secret"),
+            db=None,
+        )
     )
-    monkeypatch.setattr(controller, "delete_file_from_s3", fake_delete_file_from_s3)
+
+    assert result.object_key == "mydoc.txt"
+    assert events == ["upload", ("archive", "doc1.txt", 1), ("commit", 2)]
+
+
+def test_update_document_upload_failure_keeps_old_file(monkeypatch):
+    """Update document: failed upload -> 500, old file untouched"""
+    document_id = 1
+    file = dummies.DummyUploadFile("mydoc.txt", b"hello world")
+    archived = []
+
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        document = dummies.DummyDocumentComplex(
+            id=document_id, name="Doc1", object_key="doc1.txt", project_id=1
+        )
+        return document, True
+
+    async def fake_archive_document(db, db_document):
+        archived.append(db_document.object_key)
+
+    async def fake_store_file(db, file, db_lock=None):
+        raise Exception("S3 Error")
+
     monkeypatch.setattr(
-        controller, "upload_file_to_s3", fake_upload_file_to_s3
+        crud_documents, "get_document_for_user", fake_get_document_for_user
     )
-    monkeypatch.setattr(crud_documents, "update_document", fake_update_document)
+    monkeypatch.setattr(crud_blob, "store_file", fake_store_file)
+    monkeypatch.setattr(crud_version, "archive_document", fake_archive_document)
 
     with pytest.raises(HTTPException) as excinfo:
         asyncio.run(
@@ -468,36 +434,41 @@ def test_update_document_exception_delete_aws(monkeypatch):
         )
 
     assert excinfo.value.status_code == 500
-    assert "Failed to update document:" in excinfo.value.detail
+    assert archived == []
 
 
 def test_delete_document_success(monkeypatch):
     """Delete document for a user: OK"""
     document_id = 1
 
-    async def fake_get_document_by_id(db, document_id: int):
-        return dummies.DummyDocumentComplex(
-            id=document_id, name="Doc1", url="http://example.com/doc1", project_id=1
-        )
-
-    async def fake_is_project_from_user(db, user_id: int, document_id: int):
-        return dummies.DummyUserProject(
-            is_owner=True,
-            project=dummies.DummyProject(id=1, name="Project1", description="Desc"),
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        document = dummies.DummyDocumentComplex(
+            id=document_id, name="Doc1", object_key="doc1.txt", project_id=1
         )
+        return document, True
 
-    async def fake_delete_file_from_s3(url):
+    async def fake_enqueue_deletions(db, object_keys):
         return True
 
+    async def fake_get_document_version_keys(db, document_id: int):
+        return []
+
     async def fake_delete_document(db, document_id: int):
         return True
 
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
     monkeypatch.setattr(
-        crud_user_project, "is_project_from_user", fake_is_project_from_user
+        crud_documents, "get_document_for_user", fake_get_document_for_user
     )
-    monkeypatch.setattr(controller, "delete_file_from_s3", fake_delete_file_from_s3)
+
+    async def fake_release_blobs(db, object_keys):
+        return list(object_keys)
+
+    monkeypatch.setattr(crud_blob, "release_blobs", fake_release_blobs)
+    monkeypatch.setattr(crud_deletion, "enqueue_deletions", fake_enqueue_deletions)
     monkeypatch.setattr(crud_documents, "delete_document", fake_delete_document)
+    monkeypatch.setattr(
+        crud_version, "get_document_version_keys", fake_get_document_version_keys
+    )
 
     result = asyncio.run(
         delete_document(
@@ -514,10 +485,12 @@ def test_delete_document_not_found(monkeypatch):
     """Delete document: document not found -> 404"""
     document_id = 1
 
-    async def fake_get_document_by_id(db, document_id: int):
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
         return None
 
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
+    monkeypatch.setattr(
+        crud_documents, "get_document_for_user", fake_get_document_for_user
+    )
 
     with pytest.raises(HTTPException) as excinfo:
         asyncio.run(
@@ -536,17 +509,11 @@ def test_delete_document_not_project_user(monkeypatch):
     """Delete document: project not associated with user -> 404"""
     document_id = 1
 
-    async def fake_get_document_by_id(db, document_id: int):
-        return dummies.DummyDocumentComplex(
-            id=document_id, name="Doc1", url="http://example.com/doc1", project_id=1
-        )
-
-    async def fake_is_project_from_user(db, user_id: int, document_id: int):
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
         return None
 
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
     monkeypatch.setattr(
-        crud_user_project, "is_project_from_user", fake_is_project_from_user
+        crud_documents, "get_document_for_user", fake_get_document_for_user
     )
     with pytest.raises(HTTPException) as excinfo:
         asyncio.run(
@@ -565,10 +532,12 @@ def test_delete_document_get_document_exception(monkeypatch):
     """Delete document DB error when fetching -> 500"""
     document_id = 1
 
-    async def fake_get_document_by_id(db, document_id: int):
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
         raise Exception("Database error")
 
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
+    monkeypatch.setattr(
+        crud_documents, "get_document_for_user", fake_get_document_for_user
+    )
 
     with pytest.raises(HTTPException) as excinfo:
         asyncio.run(
@@ -583,21 +552,36 @@ def test_delete_document_get_document_exception(monkeypatch):
     assert "Failed to delete document:" in excinfo.value.detail
 
 
-def test_delete_document_is_project_from_user_exception(monkeypatch):
-    """Delete document DB error when checking project -> 500"""
+def test_delete_document_delete_document_exception(monkeypatch):
+    """Delete document DB error when deleting -> 500"""
     document_id = 1
 
-    async def fake_get_document_by_id(db, document_id: int):
-        return dummies.DummyDocumentComplex(
-            id=document_id, name="Doc1", url="http://example.com/doc1", project_id=1
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        document = dummies.DummyDocumentComplex(
+            id=document_id, name="Doc1", object_key="doc1.txt", project_id=1
         )
+        return document, True
+
+    async def fake_get_document_version_keys(db, document_id: int):
+        return []
 
-    async def fake_is_project_from_user(db, user_id: int, document_id: int):
+    async def fake_delete_document(db, document_id: int):
         raise Exception("Database error")
 
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
+    async def fake_enqueue_deletions(db, object_keys):
+        raise Exception("DB Error")
+
+    async def fake_release_blobs(db, object_keys):
+        return list(object_keys)
+
+    monkeypatch.setattr(crud_blob, "release_blobs", fake_release_blobs)
+    monkeypatch.setattr(crud_deletion, "enqueue_deletions", fake_enqueue_deletions)
+    monkeypatch.setattr(
+        crud_documents, "get_document_for_user", fake_get_document_for_user
+    )
+    monkeypatch.setattr(crud_documents, "delete_document", fake_delete_document)
     monkeypatch.setattr(
-        crud_user_project, "is_project_from_user", fake_is_project_from_user
+        crud_version, "get_document_version_keys", fake_get_document_version_keys
     )
 
     with pytest.raises(HTTPException) as excinfo:
@@ -613,33 +597,37 @@ def test_delete_document_is_project_from_user_exception(monkeypatch):
     assert "Failed to delete document:" in excinfo.value.detail
 
 
-def test_delete_document_delete_document_exception(monkeypatch):
-    """Delete document DB error when deleting -> 500"""
+def test_delete_document_enqueue_deletion_exception(monkeypatch):
+    """Delete document error while queueing the file deletion -> 500"""
     document_id = 1
 
-    async def fake_get_document_by_id(db, document_id: int):
-        return dummies.DummyDocumentComplex(
-            id=document_id, name="Doc1", url="http://example.com/doc1", project_id=1
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        document = dummies.DummyDocumentComplex(
+            id=document_id, name="Doc1", object_key="doc1.txt", project_id=1
         )
+        return document, True
 
-    async def fake_is_project_from_user(db, user_id: int, document_id: int):
-        return dummies.DummyUserProject(
-            is_owner=True,
-            project=dummies.DummyProject(id=1, name="Project1", description="Desc"),
-        )
+    async def fake_get_document_version_keys(db, document_id: int):
+        return []
 
     async def fake_delete_document(db, document_id: int):
-        raise Exception("Database error")
+        return True
 
-    async def fake_delete_file_from_s3(url):
+    async def fake_enqueue_deletions(db, object_keys):
         raise Exception("DB Error")
 
-    monkeypatch.setattr(controller, "delete_file_from_s3", fake_delete_file_from_s3)
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
+    async def fake_release_blobs(db, object_keys):
+        return list(object_keys)
+
+    monkeypatch.setattr(crud_blob, "release_blobs", fake_release_blobs)
+    monkeypatch.setattr(crud_deletion, "enqueue_deletions", fake_enqueue_deletions)
     monkeypatch.setattr(
-        crud_user_project, "is_project_from_user", fake_is_project_from_user
+        crud_documents, "get_document_for_user", fake_get_document_for_user
     )
     monkeypatch.setattr(crud_documents, "delete_document", fake_delete_document)
+    monkeypatch.setattr(
+        crud_version, "get_document_version_keys", fake_get_document_version_keys
+    )
 
     with pytest.raises(HTTPException) as excinfo:
         asyncio.run(
@@ -654,42 +642,716 @@ def test_delete_document_delete_document_exception(monkeypatch):
     assert "Failed to delete document:" in excinfo.value.detail
 
 
-def test_delete_document_delete_document_aws_exception(monkeypatch):
-    """Delete document AWS delete error -> 500"""
-    document_id = 1
+def test_download_document_redirects_to_presigned_url(monkeypatch):
+    """Download document: 302 to a presigned URL with a cacheable redirect"""
 
-    async def fake_get_document_by_id(db, document_id: int):
-        return dummies.DummyDocumentComplex(
-            id=document_id, name="Doc1", url="http://example.com/doc1", project_id=1
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        document = dummies.DummyDocumentComplex(
+            id=document_id, name="Doc1", object_key="doc1.txt", project_id=1
+        )
+        return document, True
+
+    def fake_create_presigned_download(key):
+        return f"https://bucket.s3.amazonaws.com/{key}?sig", 240
+
+    monkeypatch.setattr(
+        crud_documents, "get_document_for_user", fake_get_document_for_user
+    )
+    monkeypatch.setattr(
+        controller, "create_presigned_download", fake_create_presigned_download
+    )
+
+    response = asyncio.run(
+        download_document(
+            document_id=1,
+            user=dummies.DummyUser(id=1, name="alice", password="secret"),
+            db=None,
+        )
+    )
+
+    assert response.status_code == 302
+    assert response.headers["location"] == "https://bucket.s3.amazonaws.com/doc1.txt?sig"
+    assert response.headers["cache-control"] == "private, max-age=240"
+
+
+def test_download_document_not_project_from_user(monkeypatch):
+    """Download document: project not associated with user -> 404"""
+
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        return None
+
+    monkeypatch.setattr(
+        crud_documents, "get_document_for_user", fake_get_document_for_user
+    )
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            download_document(
+                document_id=1,
+                user=dummies.DummyUser(id=1, name="alice", password="secret"),
+                db=None,
+            )
+        )
+
+    assert excinfo.value.status_code == 404
+
+
+def test_stream_document_partial_content(monkeypatch):
+    """Stream document with Range: 206 with range, length and ETag headers"""
+
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        document = dummies.DummyDocumentComplex(
+            id=document_id, name="Doc1.txt", object_key="doc1.txt", project_id=1
+        )
+        return document, True
+
+    async def fake_open_file_stream(key, range_header, if_range):
+        assert range_header == "bytes=0-4"
+        return {
+            "body": dummies.DummyStreamingBody(b"hello"),
+            "content_length": 5,
+            "content_range": "bytes 0-4/11",
+            "etag": '"abc"',
+            "content_type": "text/plain",
+        }
+
+    monkeypatch.setattr(
+        crud_documents, "get_document_for_user", fake_get_document_for_user
+    )
+    monkeypatch.setattr(
+        controller, "open_file_stream", fake_open_file_stream
+    )
+
+    response = asyncio.run(
+        stream_document(
+            document_id=1,
+            range_header="bytes=0-4",
+            if_range=None,
+            user=dummies.DummyUser(id=1, name="alice", password="secret"),
+            db=None,
+        )
+    )
+
+    assert response.status_code == 206
+    assert response.headers["content-range"] == "bytes 0-4/11"
+    assert response.headers["content-length"] == "5"
+    assert response.headers["etag"] == '"abc"'
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+def test_stream_document_range_not_satisfiable(monkeypatch):
+    """Stream document with a range past the end -> 416"""
+
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        document = dummies.DummyDocumentComplex(
+            id=document_id, name="Doc1.txt", object_key="doc1.txt", project_id=1
+        )
+        return document, True
+
+    async def fake_open_file_stream(key, range_header, if_range):
+        raise controller.InvalidRangeError("InvalidRange")
+
+    monkeypatch.setattr(
+        crud_documents, "get_document_for_user", fake_get_document_for_user
+    )
+    monkeypatch.setattr(
+        controller, "open_file_stream", fake_open_file_stream
+    )
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            stream_document(
+                document_id=1,
+                range_header="bytes=100-",
+                if_range=None,
+                user=dummies.DummyUser(id=1, name="alice", password="secret"),
+                db=None,
+            )
+        )
+
+    assert excinfo.value.status_code == 416
+
+
+def _patch_compressed_document(monkeypatch, calls):
+    content = b"hello world\n" * 100
+
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        document = dummies.DummyDocumentComplex(
+            id=document_id,
+            name="notes.txt",
+            object_key="blobs/abc",
+            project_id=1,
+            content_encoding="zstd",
         )
+        return document, True
+
+    async def fake_open_file_stream(key, range_header, if_range):
+        calls.append(range_header)
+        compressed = zstandard.ZstdCompressor().compress(content)
+        return {
+            "body": dummies.DummyStreamingBody(compressed),
+            "content_length": len(compressed),
+            "content_range": None,
+            "etag": '"abc"',
+            "content_type": "text/plain",
+        }
+
+    monkeypatch.setattr(
+        crud_documents, "get_document_for_user", fake_get_document_for_user
+    )
+    monkeypatch.setattr(
+        controller, "open_file_stream", fake_open_file_stream
+    )
+    monkeypatch.setattr(
+        controller,
+        "create_presigned_download",
+        lambda key: (f"https://bucket.s3.amazonaws.com/{key}?sig", 240),
+    )
+    return content
+
+
+def _read_body(response):
+    async def scenario():
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    return asyncio.run(scenario())
 
-    async def fake_is_project_from_user(db, user_id: int, document_id: int):
-        return dummies.DummyUserProject(
-            is_owner=True,
-            project=dummies.DummyProject(id=1, name="Project1", description="Desc"),
+
+def test_stream_document_compressed_passthrough(monkeypatch):
+    """Stream document: a client accepting zstd gets the stored bytes with Content-Encoding"""
+    calls = []
+    _patch_compressed_document(monkeypatch, calls)
+
+    response = asyncio.run(
+        stream_document(
+            document_id=1,
+            range_header="bytes=0-4",
+            if_range=None,
+            accept_encoding="gzip, zstd",
+            user=dummies.DummyUser(id=1, name="alice", password="secret"),
+            db=None,
         )
+    )
+
+    assert calls == ["bytes=0-4"]
+    assert response.headers["content-encoding"] == "zstd"
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_stream_document_compressed_decoded(monkeypatch):
+    """Stream document: other clients get the file decompressed, without ranges"""
+    calls = []
+    content = _patch_compressed_document(monkeypatch, calls)
+
+    response = asyncio.run(
+        stream_document(
+            document_id=1,
+            range_header="bytes=0-4",
+            if_range=None,
+            accept_encoding="gzip",
+            user=dummies.DummyUser(id=1, name="alice", password="secret"),
+            db=None,
+        )
+    )
+
+    assert calls == [None]
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert "content-length" not in response.headers
+    assert _read_body(response) == content
+
+
+def test_download_document_compressed_redirects_to_content(monkeypatch):
+    """Download document: compressed files go through the API unless zstd is accepted"""
+    _patch_compressed_document(monkeypatch, [])
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+
+    decoded = asyncio.run(download_document(document_id=1, user=user, db=None))
+    direct = asyncio.run(
+        download_document(document_id=1, accept_encoding="zstd", user=user, db=None)
+    )
+
+    assert decoded.headers["location"] == "/document/1/content"
+    assert direct.headers["location"] == "https://bucket.s3.amazonaws.com/blobs/abc?sig"
+    assert direct.headers["vary"] == "Accept-Encoding"
+
+
+def test_delete_document_releases_versions(monkeypatch):
+    """Delete document: current and past files released, unreferenced ones queued"""
+    document_id = 1
+    queued = []
+
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        document = dummies.DummyDocumentComplex(
+            id=document_id, name="Doc1", object_key="blobs/c", project_id=1, version=3
+        )
+        return document, True
+
+    async def fake_get_document_version_keys(db, document_id: int):
+        return ["blobs/b", "blobs/a"]
+
+    async def fake_release_blobs(db, object_keys):
+        return [object_key for object_key in object_keys if object_key != "blobs/b"]
+
+    async def fake_enqueue_deletions(db, object_keys):
+        queued.extend(object_keys)
 
     async def fake_delete_document(db, document_id: int):
         return True
 
-    async def fake_delete_file_from_s3(url):
-        raise Exception("DB Error")
-
-    monkeypatch.setattr(controller, "delete_file_from_s3", fake_delete_file_from_s3)
-    monkeypatch.setattr(crud_documents, "get_document_by_id", fake_get_document_by_id)
     monkeypatch.setattr(
-        crud_user_project, "is_project_from_user", fake_is_project_from_user
+        crud_documents, "get_document_for_user", fake_get_document_for_user
+    )
+    monkeypatch.setattr(
+        crud_version, "get_document_version_keys", fake_get_document_version_keys
     )
+    monkeypatch.setattr(crud_blob, "release_blobs", fake_release_blobs)
+    monkeypatch.setattr(crud_deletion, "enqueue_deletions", fake_enqueue_deletions)
     monkeypatch.setattr(crud_documents, "delete_document", fake_delete_document)
 
+    asyncio.run(
+        delete_document(
+            document_id=document_id,
+            user=dummies.DummyUser(id=1, name="alice", password="secret"),
+            db=None,
+        )
+    )
+
+    assert queued == ["blobs/c", "blobs/a"]
+
+
+def test_get_document_versions_success(monkeypatch):
+    """Get document versions: returns the page requested with the keyset cursor"""
+    document_id = 1
+    pages = []
+
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        document = dummies.DummyDocumentComplex(
+            id=document_id, name="Doc1", object_key="doc1.txt", project_id=1, version=3
+        )
+        return document, True
+
+    async def fake_get_document_versions(db, document_id: int, before, limit):
+        pages.append((before, limit))
+        return [dummies.DummyDocumentVersion(7, document_id, 1, "Doc0", "doc0.txt")]
+
+    monkeypatch.setattr(
+        crud_documents, "get_document_for_user", fake_get_document_for_user
+    )
+    monkeypatch.setattr(crud_version, "get_document_versions", fake_get_document_versions)
+
+    result = asyncio.run(
+        get_document_versions(
+            document_id=document_id,
+            before=8,
+            limit=10,
+            user=dummies.DummyUser(id=1, name="alice", password="secret"),
+            db=None,
+        )
+    )
+
+    assert [version.id for version in result] == [7]
+    assert pages == [(8, 10)]
+
+
+def test_get_document_versions_not_project_from_user(monkeypatch):
+    """Get document versions: document not in the user's projects -> 404"""
+
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        return None
+
+    monkeypatch.setattr(
+        crud_documents, "get_document_for_user", fake_get_document_for_user
+    )
+
     with pytest.raises(HTTPException) as excinfo:
         asyncio.run(
-            delete_document(
-                document_id=document_id,
+            get_document_versions(
+                document_id=1,
+                before=None,
+                limit=50,
                 user=dummies.DummyUser(id=1, name="alice", password="secret"),
                 db=None,
             )
         )
 
-    assert excinfo.value.status_code == 500
-    assert "Failed to delete document:" in excinfo.value.detail
+    assert excinfo.value.status_code == 404
+
+
+def patch_restore(monkeypatch, version_key: str, shared: bool):
+    events = []
+
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        document = dummies.DummyDocumentComplex(
+            id=document_id, name="Doc2", object_key="blobs/new", project_id=1, version=2
+        )
+        return document, True
+
+    async def fake_get_document_version(db, document_id: int, version_id: int):
+        if version_id != 5:
+            return None
+        return dummies.DummyDocumentVersion(5, document_id, 1, "Doc1.txt", version_key)
+
+    async def fake_retain_blob(db, object_key):
+        events.append(("retain", object_key))
+        return shared
+
+    async def fake_copy_file(source_key, key):
+        events.append(("copy", source_key))
+        return key
+
+    async def fake_archive_document(db, db_document):
+        events.append(("archive", db_document.object_key))
+
+    async def fake_update_document(
+        db, document_id: int, document: dummies.DummyDocumentUpdate, reservation_id=None
+    ):
+        return dummies.DummyDocumentComplex(
+            id=document_id,
+            name=document.name,
+            object_key=document.object_key,
+            project_id=1,
+            version=document.version,
+        )
+
+    monkeypatch.setattr(
+        crud_documents, "get_document_for_user", fake_get_document_for_user
+    )
+    monkeypatch.setattr(crud_version, "get_document_version", fake_get_document_version)
+    monkeypatch.setattr(crud_blob, "retain_blob", fake_retain_blob)
+    monkeypatch.setattr(controller, "copy_file", fake_copy_file)
+    monkeypatch.setattr(crud_version, "archive_document", fake_archive_document)
+    monkeypatch.setattr(crud_documents, "update_document", fake_update_document)
+    return events
+
+
+def test_restore_document_version_shares_blob(monkeypatch):
+    """Restore version: content-addressed file is shared, current one archived"""
+    events = patch_restore(monkeypatch, "blobs/old", shared=True)
+
+    result = asyncio.run(
+        restore_document_version(
+            document_id=1,
+            version_id=5,
+            user=dummies.DummyUser(id=1, name="alice", password="secret"),
+            db=None,
+        )
+    )
+
+    assert result.object_key == "blobs/old"
+    assert result.name == "Doc1.txt"
+    assert result.version == 3
+    assert events == [("retain", "blobs/old"), ("archive", "blobs/new")]
+
+
+def test_restore_document_version_copies_owned_file(monkeypatch):
+    """Restore version: a file owned by the version is copied to a new key"""
+    events = patch_restore(monkeypatch, "projects/1/old.txt", shared=False)
+
+    result = asyncio.run(
+        restore_document_version(
+            document_id=1,
+            version_id=5,
+            user=dummies.DummyUser(id=1, name="alice", password="secret"),
+            db=None,
+        )
+    )
+
+    assert result.object_key.startswith("projects/1/")
+    assert result.object_key != "projects/1/old.txt"
+    assert ("copy", "projects/1/old.txt") in events
+
+
+def test_restore_document_version_not_found(monkeypatch):
+    """Restore version: unknown version -> 404"""
+    patch_restore(monkeypatch, "blobs/old", shared=True)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            restore_document_version(
+                document_id=1,
+                version_id=6,
+                user=dummies.DummyUser(id=1, name="alice", password="secret"),
+                db=None,
+            )
+        )
+
+    assert excinfo.value.status_code == 404
+    assert excinfo.value.detail == "Version not found"
+
+
+def test_update_document_writes_explicit_nulls(monkeypatch):
+    """Update document row: fields set to None are cleared, unset fields are kept"""
+    db_document = dummies.DummyDocumentComplex(
+        id=1, name="Doc2", object_key="blobs/new", project_id=1, version=2, size=100
+    )
+    db_document.content_type = "text/plain"
+    db_document.checksum = "abc"
+    usage = []
+
+    class Session(dummies.DummySession):
+        async def get(self, model, document_id):
+            return db_document
+
+        async def refresh(self, instance):
+            pass
+
+    async def fake_apply_usage(db, project_id, documents, size):
+        usage.append(size)
+
+    async def fake_consume_reservation(db, reservation_id):
+        pass
+
+    async def fake_record_event(db, project_id, event_type, data):
+        pass
+
+    monkeypatch.setattr(crud_documents, "apply_usage", fake_apply_usage)
+    monkeypatch.setattr(crud_documents, "consume_reservation", fake_consume_reservation)
+    monkeypatch.setattr(crud_documents, "record_event", fake_record_event)
+
+    result = asyncio.run(
+        crud_documents.update_document(
+            Session(),
+            1,
+            DocumentUpdate(object_key="blobs/old", size=None, checksum=None, content_type=None),
+        )
+    )
+
+    assert result.object_key == "blobs/old"
+    assert (result.size, result.checksum, result.content_type) == (None, None, None)
+    assert result.name == "Doc2"
+    assert result.version == 2
+    assert usage == [-100]
+
+
+def patch_transfer(monkeypatch, object_key: str, shared: bool):
+    events = []
+
+    async def fake_get_document_for_transfer(
+        db, document_id: int, user_id: int, project_id: int
+    ):
+        events.append(("document", document_id, project_id))
+        document = dummies.DummyDocumentComplex(
+            id=document_id, name="Doc1.png", object_key=object_key, project_id=1
+        )
+        document.content_type = "image/png"
+        document.size = 3
+        document.checksum = "abc"
+        document.preview_status = "ready"
+        return document, project_id in (1, 2)
+
+    async def fake_lock_project_usages(db, project_ids):
+        events.append(("lock", project_ids))
+
+    async def fake_move_document(db, document_id: int, project_id: int):
+        events.append(("move", project_id))
+        return dummies.DummyDocumentComplex(
+            id=document_id, name="Doc1.png", object_key=object_key, project_id=project_id
+        )
+
+    async def fake_retain_blob(db, object_key):
+        events.append(("retain", object_key))
+        return shared
+
+    async def fake_copy_file(source_key, key):
+        events.append(("copy", source_key))
+        return key
+
+    async def fake_create_document(db, project_id, name, object_key, **fields):
+        events.append(("create", fields["preview_status"]))
+        return dummies.DummyDocumentComplex(
+            id=9, name=name, object_key=object_key, project_id=project_id
+        )
+
+    monkeypatch.setattr(
+        crud_documents, "get_document_for_transfer", fake_get_document_for_transfer
+    )
+    monkeypatch.setattr(crud_usage, "lock_project_usages", fake_lock_project_usages)
+    monkeypatch.setattr(crud_documents, "move_document", fake_move_document)
+    monkeypatch.setattr(crud_blob, "retain_blob", fake_retain_blob)
+    monkeypatch.setattr(controller, "copy_file", fake_copy_file)
+    monkeypatch.setattr(crud_documents, "create_document", fake_create_document)
+    return events
+
+
+def test_move_document_updates_project_only(monkeypatch):
+    """Move document: document and destination membership checked, file untouched"""
+    events = patch_transfer(monkeypatch, "projects/1/a.png", shared=False)
+
+    result = asyncio.run(
+        move_document(
+            document_id=1,
+            transfer=DocumentTransfer(project_id=2),
+            user=dummies.DummyUser(id=1, name="alice", password="secret"),
+            db=None,
+        )
+    )
+
+    assert result.project_id == 2
+    assert result.object_key == "projects/1/a.png"
+    assert events == [("document", 1, 2), ("lock", [1, 2]), ("move", 2)]
+
+
+def test_move_document_foreign_project(monkeypatch):
+    """Move document: destination the user is not a member of -> 404"""
+    events = patch_transfer(monkeypatch, "blobs/a", shared=True)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            move_document(
+                document_id=1,
+                transfer=DocumentTransfer(project_id=3),
+                user=dummies.DummyUser(id=1, name="alice", password="secret"),
+                db=None,
+            )
+        )
+
+    assert excinfo.value.status_code == 404
+    assert excinfo.value.detail == "Project not found"
+    assert ("move", 3) not in events
+
+
+def test_copy_document_shares_blob(monkeypatch):
+    """Copy document: content-addressed file gains a reference, preview reused"""
+    events = patch_transfer(monkeypatch, "blobs/a", shared=True)
+
+    result = asyncio.run(
+        copy_document(
+            document_id=1,
+            transfer=DocumentTransfer(project_id=2),
+            user=dummies.DummyUser(id=1, name="alice", password="secret"),
+            db=None,
+        )
+    )
+
+    assert result.project_id == 2
+    assert result.object_key == "blobs/a"
+    assert events[1:] == [("retain", "blobs/a"), ("create", "ready")]
+
+
+def test_copy_document_copies_owned_file(monkeypatch):
+    """Copy document: a file owned by the document is copied server-side"""
+    events = patch_transfer(monkeypatch, "projects/1/a.png", shared=False)
+
+    result = asyncio.run(
+        copy_document(
+            document_id=1,
+            transfer=DocumentTransfer(project_id=2),
+            user=dummies.DummyUser(id=1, name="alice", password="secret"),
+            db=None,
+        )
+    )
+
+    assert result.object_key.startswith("projects/2/")
+    assert ("copy", "projects/1/a.png") in events
+    assert events[-1] == ("create", "pending")
+
+
+def test_preview_document_redirects_when_ready(monkeypatch):
+    """Preview document: ready preview -> 302 to the preview stored next to the file"""
+    signed = []
+
+    async def fake_get_document_for_user(db, document_id: int, user_id: int):
+        document = dummies.DummyDocumentComplex(
+            id=document_id, name="a.png", object_key="blobs/a", project_id=1
+        )
+        document.preview_status = "ready" if document_id == 1 else "pending"
+        return document, True
+
+    def fake_create_presigned_download(key):
+        signed.append(key)
+        return f"https://bucket/{key}?sig", 60
+
+    monkeypatch.setattr(
+        crud_documents, "get_document_for_user", fake_get_document_for_user
+    )
+    monkeypatch.setattr(controller, "create_presigned_download", fake_create_presigned_download)
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+
+    response = asyncio.run(preview_document(document_id=1, user=user, db=None))
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(preview_document(document_id=2, user=user, db=None))
+
+    assert response.status_code == 302
+    assert signed == ["blobs/a.preview.jpg"]
+    assert excinfo.value.status_code == 404
+    assert excinfo.value.detail == "Preview not available"
+
+
+def test_get_recent_documents_next_page_cursor(monkeypatch):
+    """Recent documents: cursor decoded, extra row turned into X-Next-Cursor"""
+    seen = {}
+
+    async def fake_get_recent_documents_for_user(db, user_id: int, after=None, limit=50):
+        seen.update(user_id=user_id, after=after, limit=limit)
+        return [
+            dummies.DummyDocument(id=i, name=f"doc{i}", object_key=f"doc{i}.txt")
+            for i in (3, 2, 1)
+        ]
+
+    monkeypatch.setattr(
+        crud_documents,
+        "get_recent_documents_for_user",
+        fake_get_recent_documents_for_user,
+    )
+    cursor = crud_documents.encode_document_cursor(
+        dummies.DummyDocument(id=4, name="doc4", object_key="doc4.txt")
+    )
+    response = Response()
+
+    result = asyncio.run(
+        get_recent_documents(
+            query=RecentDocumentsQuery(cursor=cursor, limit=2),
+            response=response,
+            user=dummies.DummyUser(id=7, name="alice", password="secret"),
+            db=None,
+        )
+    )
+
+    assert [d.id for d in result] == [3, 2]
+    assert seen == {"user_id": 7, "after": (datetime(2024, 1, 1, 12, 0), 4), "limit": 3}
+    assert crud_documents.decode_document_cursor(response.headers["X-Next-Cursor"]) == (
+        datetime(2024, 1, 1, 12, 0),
+        2,
+    )
+
+
+def test_get_recent_documents_last_page(monkeypatch):
+    """Recent documents: no cursor header when the page is not full"""
+
+    async def fake_get_recent_documents_for_user(db, user_id: int, after=None, limit=50):
+        return [dummies.DummyDocument(id=1, name="doc1", object_key="doc1.txt")]
+
+    monkeypatch.setattr(
+        crud_documents,
+        "get_recent_documents_for_user",
+        fake_get_recent_documents_for_user,
+    )
+    response = Response()
+
+    result = asyncio.run(
+        get_recent_documents(
+            query=RecentDocumentsQuery(),
+            response=response,
+            user=dummies.DummyUser(id=1, name="alice", password="secret"),
+            db=None,
+        )
+    )
+
+    assert len(result) == 1
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_recent_documents_invalid_cursor():
+    """Recent documents: malformed cursor -> 400"""
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            get_recent_documents(
+                query=RecentDocumentsQuery(cursor="not-a-cursor"),
+                response=Response(),
+                user=dummies.DummyUser(id=1, name="alice", password="secret"),
+                db=None,
+            )
+        )
+
+    assert excinfo.value.status_code == 400
@@ -0,0 +1,147 @@
+import asyncio
+import io
+import os
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from urllib.parse import urlsplit
+from app.crud import aws_crud
+from app.routers import storage_route
+from app.services.local_storage import LocalStorageBackend
+from app.services.storage_backend import InvalidRangeError, UnsupportedOperationError
+
+
+def _backend(tmp_path):
+    return LocalStorageBackend(str(tmp_path), "/storage", "secret")
+
+
+def test_put_and_open_with_range(tmp_path):
+    """Local storage: written objects read back whole or by byte range, with metadata"""
+    storage = _backend(tmp_path)
+
+    async def scenario():
+        await storage.put("projects/1/a.txt", io.BytesIO(b"0123456789"), "text/plain")
+        whole = await storage.open("projects/1/a.txt")
+        part = await storage.open("projects/1/a.txt", "bytes=2-4")
+        suffix = await storage.open("projects/1/a.txt", "bytes=-3")
+        stale = await storage.open("projects/1/a.txt", "bytes=2-4", '"old"')
+        missing = await storage.open("projects/1/missing.txt")
+        return whole, part, suffix, stale, missing
+
+    whole, part, suffix, stale, missing = asyncio.run(scenario())
+
+    assert whole["body"].read() == b"0123456789"
+    assert whole["content_type"] == "text/plain"
+    assert whole["content_range"] is None
+    assert part["body"].read() == b"234"
+    assert part["content_range"] == "bytes 2-4/10"
+    assert suffix["body"].read() == b"789"
+    assert stale["content_length"] == 10
+    assert missing is None
+    assert [p.name for p in (tmp_path / "projects" / "1").iterdir()] == ["a.txt"]
+    for stream in (whole, part, suffix, stale):
+        stream["body"].close()
+
+
+def test_open_range_past_end(tmp_path):
+    """Local storage: a range starting past the end raises InvalidRangeError"""
+    storage = _backend(tmp_path)
+
+    async def scenario():
+        await storage.put("blobs/a", io.BytesIO(b"abc"), "text/plain")
+        await storage.open("blobs/a", "bytes=5-")
+
+    with pytest.raises(InvalidRangeError):
+        asyncio.run(scenario())
+
+
+
+def test_requires_secret(tmp_path):
+    """Local storage: without a secret, download URLs could be forged, so it refuses to start"""
+    with pytest.raises(ValueError):
+        LocalStorageBackend(str(tmp_path), "/storage", "")
+    with pytest.raises(ValueError):
+        LocalStorageBackend(str(tmp_path), "/storage", None)
+
+
+def test_presigned_upload_unsupported(tmp_path, monkeypatch):
+    """Local storage: direct uploads raise UnsupportedOperationError, not a generic error"""
+    monkeypatch.setattr(aws_crud, "storage", _backend(tmp_path))
+
+    with pytest.raises(UnsupportedOperationError):
+        asyncio.run(aws_crud.create_presigned_upload("projects/1/a.txt", "text/plain", 3))
+
+def test_invalid_keys_rejected(tmp_path):
+    """Local storage: keys cannot escape the root or reach metadata files"""
+    storage = _backend(tmp_path)
+
+    for key in ["../etc/passwd", "/abs", "a//b", ".meta/x.json", "a/./b", ""]:
+        with pytest.raises(ValueError):
+            storage.object_path(key)
+
+
+def test_copy_and_delete(tmp_path):
+    """Local storage: copies share data and survive deletion of the source"""
+    storage = _backend(tmp_path)
+
+    async def scenario():
+        await storage.put("blobs/a", io.BytesIO(b"abc"), "text/plain", "zstd")
+        await storage.copy("blobs/a", "projects/2/b.txt")
+        errors = await storage.delete_many(["blobs/a", "blobs/missing"])
+        return errors, await storage.head("projects/2/b.txt"), await storage.head("blobs/a")
+
+    errors, copied, deleted = asyncio.run(scenario())
+
+    assert errors == {}
+    assert copied["size"] == 3
+    assert storage.read_metadata("projects/2/b.txt")["content_encoding"] == "zstd"
+    assert deleted is None
+
+
+def test_multipart_upload(tmp_path):
+    """Local storage: parts are assembled in order and the staging area is removed"""
+    storage = _backend(tmp_path)
+
+    async def scenario():
+        upload_id = await storage.create_multipart_upload("projects/1/big.bin", "application/pdf")
+        parts = []
+        for number, data in [(1, b"hello "), (2, b"world")]:
+            etag = await storage.upload_part(
+                "projects/1/big.bin", upload_id, number, io.BytesIO(data), len(data)
+            )
+            parts.append({"PartNumber": number, "ETag": etag})
+        await storage.complete_multipart_upload("projects/1/big.bin", upload_id, parts)
+        # A retried completion succeeds because the object exists
+        await storage.complete_multipart_upload("projects/1/big.bin", upload_id, parts)
+        return await storage.open("projects/1/big.bin")
+
+    stream = asyncio.run(scenario())
+
+    assert stream["body"].read() == b"hello world"
+    assert stream["content_type"] == "application/pdf"
+    assert os.listdir(tmp_path / ".uploads") == []
+    stream["body"].close()
+
+
+def test_signed_download_served_with_file_response(tmp_path, monkeypatch):
+    """Local storage: presigned URLs are served by the API; tampered ones get 403"""
+    storage = _backend(tmp_path)
+    monkeypatch.setattr(aws_crud, "storage", storage)
+    monkeypatch.setattr(aws_crud, "_presigned_download_cache", aws_crud.OrderedDict())
+    asyncio.run(storage.put("blobs/a", io.BytesIO(b"0123456789"), "text/plain"))
+    app = FastAPI()
+    app.include_router(storage_route.router)
+    client = TestClient(app)
+
+    url, _ = aws_crud.create_presigned_download("blobs/a")
+    parts = urlsplit(url)
+    response = client.get(f"{parts.path}?{parts.query}")
+    ranged = client.get(f"{parts.path}?{parts.query}", headers={"Range": "bytes=0-3"})
+    tampered = client.get(f"/storage/blobs/b?{parts.query}")
+
+    assert response.status_code == 200
+    assert response.content == b"0123456789"
+    assert response.headers["content-type"].startswith("text/plain")
+    assert ranged.status_code == 206
+    assert ranged.content == b"0123"
+    assert tampered.status_code == 403
@@ -0,0 +1,75 @@
+import asyncio
+import time
+from app.services import metadata_backfill
+from app.services.rate_limit import RateLimiter
+import tests.dummies as dummies
+
+SHA = "a" * 64
+
+
+def test_backfill_metadata_batch_records_head_results(monkeypatch):
+    """Metadata backfill: HEAD results stored, missing objects marked, failed HEADs left for retry"""
+    session = dummies.DummySession()
+    updates = []
+    missing = []
+    documents = [
+        dummies.DummyDocument(id=1, name="a.txt", object_key=f"blobs/{SHA}"),
+        dummies.DummyDocument(id=2, name="b.txt", object_key="gone.txt"),
+        dummies.DummyDocument(id=3, name="c.txt", object_key="projects/1/c.txt"),
+        dummies.DummyDocument(id=4, name="d.txt", object_key="projects/1/d.txt"),
+    ]
+
+    async def fake_get_documents_missing_metadata(db, after_id, limit):
+        return [document for document in documents if document.id > after_id]
+
+    async def fake_head_object(key):
+        if key == "gone.txt":
+            return None
+        if key == "projects/1/d.txt":
+            raise Exception("S3 unavailable")
+        return {"size": 5, "content_type": "text/plain", "etag": '"x"'}
+
+    async def fake_update_document_metadata(db, document_id, size, content_type, checksum):
+        updates.append((document_id, size, checksum))
+
+    async def fake_mark_documents_object_missing(db, document_ids):
+        missing.extend(document_ids)
+
+    monkeypatch.setattr(metadata_backfill, "AsyncSessionLocal", lambda: session)
+    monkeypatch.setattr(
+        metadata_backfill.crud_documents,
+        "get_documents_missing_metadata",
+        fake_get_documents_missing_metadata,
+    )
+    monkeypatch.setattr(
+        metadata_backfill.crud_documents,
+        "update_document_metadata",
+        fake_update_document_metadata,
+    )
+    monkeypatch.setattr(
+        metadata_backfill.crud_documents,
+        "mark_documents_object_missing",
+        fake_mark_documents_object_missing,
+    )
+    monkeypatch.setattr(metadata_backfill, "head_object", fake_head_object)
+
+    last_id = asyncio.run(metadata_backfill.backfill_metadata_batch(0, RateLimiter(0)))
+
+    assert last_id == 4
+    assert updates == [(1, 5, SHA), (3, 5, None)]
+    assert missing == [2]
+    assert session.commits == 1
+
+
+def test_rate_limiter_spaces_calls():
+    """Rate limiter: calls start no faster than the configured rate"""
+    limiter = RateLimiter(50)
+
+    async def scenario():
+        start = time.perf_counter()
+        await asyncio.gather(*(limiter.acquire() for _ in range(6)))
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(scenario())
+
+    assert elapsed >= 0.09
@@ -0,0 +1,74 @@
+import asyncio
+import io
+from PIL import Image
+from app.services import preview_worker
+from app.services import previews
+import tests.dummies as dummies
+
+
+def test_make_thumbnail_fits_box():
+    """Thumbnail: JPEG scaled down to fit the box, aspect ratio kept"""
+    source = io.BytesIO()
+    Image.new("RGBA", (1200, 600), (255, 0, 0, 128)).save(source, "PNG")
+
+    thumbnail = previews.make_thumbnail(source.getvalue(), 256)
+
+    with Image.open(io.BytesIO(thumbnail)) as image:
+        assert image.format == "JPEG"
+        assert image.size == (256, 128)
+
+
+def test_initial_preview_status():
+    """Preview status: only raster images are queued for rendering"""
+    assert previews.initial_preview_status("image/png") == "pending"
+    assert previews.initial_preview_status("image/svg+xml") == "unsupported"
+    assert previews.initial_preview_status("application/pdf") == "unsupported"
+    assert previews.initial_preview_status(None) == "unsupported"
+
+
+def test_generate_previews_records_outcomes(monkeypatch):
+    """Preview worker: stores thumbnails next to originals and records each outcome"""
+    session = dummies.DummySession()
+    statuses = {}
+    stored = {}
+    documents = [
+        dummies.DummyDocument(id=1, name="a.png", object_key="blobs/a"),
+        dummies.DummyDocument(id=2, name="huge.png", object_key="blobs/huge"),
+        dummies.DummyDocument(id=3, name="bad.png", object_key="blobs/bad"),
+    ]
+
+    async def fake_claim_pending_previews(db, limit):
+        return documents
+
+    async def fake_read_file(key, max_size):
+        return None if key == "blobs/huge" else key.encode()
+
+    def fake_make_thumbnail(data, size):
+        if data == b"blobs/bad":
+            raise ValueError("cannot identify image file")
+        return b"thumb:" + data
+
+    async def fake_put_file(key, data, content_type):
+        stored[key] = data
+
+    async def fake_set_preview_status(db, document_id, preview_status):
+        statuses[document_id] = preview_status
+
+    monkeypatch.setattr(preview_worker, "AsyncSessionLocal", lambda: session)
+    monkeypatch.setattr(
+        preview_worker.crud_documents, "claim_pending_previews", fake_claim_pending_previews
+    )
+    monkeypatch.setattr(
+        preview_worker.crud_documents, "set_preview_status", fake_set_preview_status
+    )
+    monkeypatch.setattr(preview_worker, "read_file", fake_read_file)
+    monkeypatch.setattr(preview_worker, "put_file", fake_put_file)
+    monkeypatch.setattr(preview_worker, "make_thumbnail", fake_make_thumbnail)
+    monkeypatch.setattr(preview_worker, "preview_executor", None)
+
+    processed = asyncio.run(preview_worker.generate_previews())
+
+    assert processed == 3
+    assert stored == {"blobs/a.preview.jpg": b"thumb:blobs/a"}
+    assert statuses == {1: "ready", 2: "unsupported", 3: "failed"}
+    assert session.commits == 1
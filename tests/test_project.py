@@ -1,6 +1,9 @@
 import asyncio
 import pytest
-from fastapi import HTTPException
+import time
+from datetime import datetime
+from fastapi import HTTPException, Response
+from sqlalchemy.exc import IntegrityError
 from app.routers.project_route import (
     create_project,
     delete_project,
@@ -8,13 +11,32 @@ from app.routers.project_route import (
     get_project_info,
     get_projects,
     get_project_documents,
+    search_project_documents,
+    delete_project_documents,
+    add_project_document_tags,
+    remove_project_document_tags,
     create_project_document,
+    create_project_documents,
+    create_document_upload,
+    complete_document_upload,
     invite_user_to_project,
 )
+from app.schemas.document_schema import (
+    DocumentBulkDelete,
+    DocumentListQuery,
+    DocumentSearchQuery,
+    DocumentTagsUpdate,
+    DocumentUploadComplete,
+    DocumentUploadRequest,
+)
 from app.crud import user_project_crud as crud_user_project
 from app.crud import project_crud as crud_project
 from app.crud import document_crud as crud_documents
+from app.crud import blob_crud as crud_blob
+from app.crud import document_version_crud as crud_version
+from app.crud import storage_deletion_crud as crud_deletion
 import app.controllers.project_controller as controller
+from app.services.storage_backend import UnsupportedOperationError
 import tests.dummies as dummies
 
 
@@ -434,12 +456,37 @@ def test_delete_project_success(monkeypatch):
             project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
         )
 
+    events = []
+
+    async def fake_lock_project_document_keys(db, project_id: int):
+        events.append("lock")
+        return ["blobs/a", "projects/1/b.txt"]
+
+    async def fake_get_project_version_keys(db, project_id: int):
+        return ["blobs/a", "blobs/old"]
+
+    async def fake_release_blobs(db, object_keys):
+        events.append(("release", object_keys))
+        return ["projects/1/b.txt", "blobs/old"]
+
+    async def fake_enqueue_deletions(db, object_keys):
+        events.append(("enqueue", object_keys))
+
     async def fake_delete_project(db, project_id: int):
+        events.append("delete")
         return dummies.DummyProject(id=project_id, name="Project1", description="Desc1")
 
     monkeypatch.setattr(
         crud_user_project, "is_project_from_user", fake_is_project_from_user
     )
+    monkeypatch.setattr(
+        crud_documents, "lock_project_document_keys", fake_lock_project_document_keys
+    )
+    monkeypatch.setattr(
+        crud_version, "get_project_version_keys", fake_get_project_version_keys
+    )
+    monkeypatch.setattr(crud_blob, "release_blobs", fake_release_blobs)
+    monkeypatch.setattr(crud_deletion, "enqueue_deletions", fake_enqueue_deletions)
     monkeypatch.setattr(crud_project, "delete_project", fake_delete_project)
 
     result = asyncio.run(
@@ -448,6 +495,12 @@ def test_delete_project_success(monkeypatch):
 
     assert isinstance(result, dict)
     assert result.get("message") == f"Project with ID {project_id} deleted successfully"
+    assert events == [
+        "lock",
+        ("release", ["blobs/a", "projects/1/b.txt", "blobs/a", "blobs/old"]),
+        ("enqueue", ["projects/1/b.txt", "blobs/old"]),
+        "delete",
+    ]
 
 
 def test_delete_project_not_found(monkeypatch):
@@ -563,10 +616,10 @@ def test_get_project_documents_success(monkeypatch):
             project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
         )
 
-    async def fake_get_documents_by_project(db, project_id: int):
+    async def fake_get_documents_by_project(db, project_id: int, **filters):
         return [
-            dummies.DummyDocument(id=1, name="doc1", url="url1"),
-            dummies.DummyDocument(id=2, name="doc2", url="url2"),
+            dummies.DummyDocument(id=1, name="doc1", object_key="doc1.txt"),
+            dummies.DummyDocument(id=2, name="doc2", object_key="doc2.txt"),
         ]
 
     monkeypatch.setattr(
@@ -577,7 +630,13 @@ def test_get_project_documents_success(monkeypatch):
     )
 
     result = asyncio.run(
-        get_project_documents(project_id=project_id, user=user, db=None)
+        get_project_documents(
+            project_id=project_id,
+            query=DocumentListQuery(),
+            response=Response(),
+            user=user,
+            db=None,
+        )
     )
 
     assert isinstance(result, list)
@@ -597,10 +656,10 @@ def test_get_project_documents_success_not_owner(monkeypatch):
             project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
         )
 
-    async def fake_get_documents_by_project(db, project_id: int):
+    async def fake_get_documents_by_project(db, project_id: int, **filters):
         return [
-            dummies.DummyDocument(id=1, name="doc1", url="url1"),
-            dummies.DummyDocument(id=2, name="doc2", url="url2"),
+            dummies.DummyDocument(id=1, name="doc1", object_key="doc1.txt"),
+            dummies.DummyDocument(id=2, name="doc2", object_key="doc2.txt"),
         ]
 
     monkeypatch.setattr(
@@ -611,7 +670,13 @@ def test_get_project_documents_success_not_owner(monkeypatch):
     )
 
     result = asyncio.run(
-        get_project_documents(project_id=project_id, user=user, db=None)
+        get_project_documents(
+            project_id=project_id,
+            query=DocumentListQuery(),
+            response=Response(),
+            user=user,
+            db=None,
+        )
     )
 
     assert isinstance(result, list)
@@ -634,14 +699,80 @@ def test_get_project_documents_not_found(monkeypatch):
 
     with pytest.raises(HTTPException) as excinfo:
         asyncio.run(
-            get_project_documents(project_id=project_id, user=user, db=None)
+            get_project_documents(
+                project_id=project_id,
+                query=DocumentListQuery(),
+                response=Response(),
+                user=user,
+                db=None,
+            )
+        )
+
+    assert excinfo.value.status_code == 404
+
+
+def test_search_project_documents_success(monkeypatch):
+    """Search a user's project: returns ranked matches with snippets"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+    searched = []
+
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        return dummies.DummyUserProject(
+            is_owner=False,
+            project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
+        )
+
+    async def fake_search_documents(db, project_id: int, query: str, limit: int):
+        searched.append((project_id, query, limit))
+        document = dummies.DummyDocument(id=1, name="report.txt", object_key="blobs/a")
+        document.rank = 0.5
+        document.snippet = "quarterly <b>revenue</b>"
+        return [document]
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+    monkeypatch.setattr(crud_documents, "search_documents", fake_search_documents)
+
+    result = asyncio.run(
+        search_project_documents(
+            project_id=1,
+            query=DocumentSearchQuery(q="revenue"),
+            user=user,
+            db=None,
+        )
+    )
+
+    assert searched == [(1, "revenue", 20)]
+    assert result[0].snippet == "quarterly <b>revenue</b>"
+
+
+def test_search_project_documents_not_found(monkeypatch):
+    """Search a project the user does not belong to -> 404"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        return None
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            search_project_documents(
+                project_id=1,
+                query=DocumentSearchQuery(q="revenue"),
+                user=user,
+                db=None,
+            )
         )
 
     assert excinfo.value.status_code == 404
 
 
 def test_get_project_documents_no_documents(monkeypatch):
-    """Get documents for a user's project with no documents -> 404"""
+    """Get documents for a user's project with no matching documents -> empty page"""
     user = dummies.DummyUser(id=1, name="alice", password="secret")
     project_id = 1
 
@@ -651,7 +782,7 @@ def test_get_project_documents_no_documents(monkeypatch):
             project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
         )
 
-    async def fake_get_documents_by_project(db, project_id: int):
+    async def fake_get_documents_by_project(db, project_id: int, **filters):
         return []
 
     monkeypatch.setattr(
@@ -661,12 +792,36 @@ def test_get_project_documents_no_documents(monkeypatch):
         crud_documents, "get_documents_by_project", fake_get_documents_by_project
     )
 
-    with pytest.raises(HTTPException) as excinfo:
-        asyncio.run(
-            get_project_documents(project_id=project_id, user=user, db=None)
+    response = Response()
+
+    result = asyncio.run(
+        get_project_documents(
+            project_id=project_id,
+            query=DocumentListQuery(content_type="image/png"),
+            response=response,
+            user=user,
+            db=None,
         )
+    )
 
-    assert excinfo.value.status_code == 404
+    assert result == []
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_document_list_query_naive_local_dates(monkeypatch):
+    """Listing filters: timezone-aware dates become naive server-local time, naive ones are kept"""
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        query = DocumentListQuery(
+            created_after="2024-05-01T12:00:00+02:00", created_before="2024-05-02T08:30:00"
+        )
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+    assert query.created_after == datetime(2024, 5, 1, 6, 0)
+    assert query.created_before == datetime(2024, 5, 2, 8, 30)
 
 
 def test_get_project_documents_exception_is_project_from_user(monkeypatch):
@@ -683,7 +838,13 @@ def test_get_project_documents_exception_is_project_from_user(monkeypatch):
 
     with pytest.raises(HTTPException) as excinfo:
         asyncio.run(
-            get_project_documents(project_id=project_id, user=user, db=None)
+            get_project_documents(
+                project_id=project_id,
+                query=DocumentListQuery(),
+                response=Response(),
+                user=user,
+                db=None,
+            )
         )
 
     assert excinfo.value.status_code == 500
@@ -700,7 +861,7 @@ def test_get_project_documents_exception_get_documents_by_project(monkeypatch):
             project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
         )
 
-    async def fake_get_documents_by_project(db, project_id: int):
+    async def fake_get_documents_by_project(db, project_id: int, **filters):
         raise Exception("DB error")
 
     monkeypatch.setattr(
@@ -712,12 +873,84 @@ def test_get_project_documents_exception_get_documents_by_project(monkeypatch):
 
     with pytest.raises(HTTPException) as excinfo:
         asyncio.run(
-            get_project_documents(project_id=project_id, user=user, db=None)
+            get_project_documents(
+                project_id=project_id,
+                query=DocumentListQuery(),
+                response=Response(),
+                user=user,
+                db=None,
+            )
         )
 
     assert excinfo.value.status_code == 500
 
 
+def test_get_project_documents_next_page_cursor(monkeypatch):
+    """Get documents: filters forwarded, extra row turned into X-Next-Cursor"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+    seen = {}
+
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        return dummies.DummyUserProject(
+            is_owner=True,
+            project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
+        )
+
+    async def fake_get_documents_by_project(db, project_id: int, **filters):
+        seen.update(filters)
+        return [
+            dummies.DummyDocument(id=i, name=f"doc{i}", object_key=f"doc{i}.txt")
+            for i in (3, 2, 1)
+        ]
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+    monkeypatch.setattr(
+        crud_documents, "get_documents_by_project", fake_get_documents_by_project
+    )
+    cursor = crud_documents.encode_document_cursor(
+        dummies.DummyDocument(id=4, name="doc4", object_key="doc4.txt")
+    )
+    response = Response()
+
+    result = asyncio.run(
+        get_project_documents(
+            project_id=1,
+            query=DocumentListQuery(name_prefix="doc", cursor=cursor, limit=2),
+            response=response,
+            user=user,
+            db=None,
+        )
+    )
+
+    assert [document.id for document in result] == [3, 2]
+    assert seen["name_prefix"] == "doc"
+    assert seen["after"][1] == 4
+    assert seen["limit"] == 3
+    assert crud_documents.decode_document_cursor(
+        response.headers["X-Next-Cursor"]
+    )[1] == 2
+
+
+def test_get_project_documents_invalid_cursor():
+    """Get documents: malformed cursor -> 400"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            get_project_documents(
+                project_id=1,
+                query=DocumentListQuery(cursor="not-a-cursor"),
+                response=Response(),
+                user=user,
+                db=None,
+            )
+        )
+
+    assert excinfo.value.status_code == 400
+
+
 def test_post_projects_documents_success(monkeypatch):
     """Upload document to a project: returns created document"""
     user = dummies.DummyUser(id=1, name="alice", password="secret")
@@ -730,16 +963,16 @@ def test_post_projects_documents_success(monkeypatch):
             project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
         )
 
-    async def fake_upload_file_to_s3(file):
-        return "https://bucket.s3.amazonaws.com/mydoc.txt"
+    async def fake_store_file(db, file, db_lock=None):
+        return dummies.dummy_stored_file("mydoc.txt")
 
-    async def fake_create_document(db, document_id: int, name: str, url: str):
-        return dummies.DummyDocument(id=3, name=name, url=url)
+    async def fake_create_document(db, document_id: int, name: str, object_key: str, **metadata):
+        return dummies.DummyDocument(id=3, name=name, object_key=object_key)
 
     monkeypatch.setattr(
         crud_user_project, "is_project_from_user", fake_is_project_from_user
     )
-    monkeypatch.setattr(controller, "upload_file_to_s3", fake_upload_file_to_s3)
+    monkeypatch.setattr(crud_blob, "store_file", fake_store_file)
     monkeypatch.setattr(
         crud_documents, "create_document", fake_create_document
     )
@@ -750,7 +983,7 @@ def test_post_projects_documents_success(monkeypatch):
 
     assert response.id == 3
     assert response.name == file.filename
-    assert response.url == "https://bucket.s3.amazonaws.com/mydoc.txt"
+    assert response.object_key == "mydoc.txt"
 
 
 def test_post_projects_documents_not_found_project(monkeypatch):
@@ -786,7 +1019,7 @@ def test_post_projects_documents_fail_create_document(monkeypatch):
             project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
         )
 
-    async def fake_create_document(db, document_id: int, name: str, url: str):
+    async def fake_create_document(db, document_id: int, name: str, object_key: str, **metadata):
         return []
 
     monkeypatch.setattr(
@@ -841,7 +1074,7 @@ def test_post_projects_documents_exception_create_document(monkeypatch):
             project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
         )
 
-    async def fake_create_document(db, document_id: int, name: str, url: str):
+    async def fake_create_document(db, document_id: int, name: str, object_key: str, **metadata):
         raise Exception("DB error")
 
     monkeypatch.setattr(
@@ -875,16 +1108,16 @@ def test_post_projects_documents_exception_aws(monkeypatch):
             project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
         )
 
-    async def fake_upload_file_to_s3(file):
+    async def fake_store_file(db, file, db_lock=None):
         raise Exception("DB Error")
 
-    async def fake_create_document(db, document_id: int, name: str, url: str):
-        return dummies.DummyDocument(id=3, name=name, url=url)
+    async def fake_create_document(db, document_id: int, name: str, object_key: str, **metadata):
+        return dummies.DummyDocument(id=3, name=name, object_key=object_key)
 
     monkeypatch.setattr(
         crud_user_project, "is_project_from_user", fake_is_project_from_user
     )
-    monkeypatch.setattr(controller, "upload_file_to_s3", fake_upload_file_to_s3)
+    monkeypatch.setattr(crud_blob, "store_file", fake_store_file)
     monkeypatch.setattr(
         crud_documents, "create_document", fake_create_document
     )
@@ -1179,3 +1412,534 @@ def test_invite_user_to_project_exception_create_user_project(monkeypatch):
             )
         )
     assert excinfo.value.status_code == 500
+
+
+def test_create_document_upload_success(monkeypatch):
+    """Start direct upload: returns presigned ticket scoped to the project"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+    upload = DocumentUploadRequest(filename="mydoc.pdf", content_type="application/pdf", size=10)
+
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        return dummies.DummyUserProject(
+            is_owner=False,
+            project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
+        )
+
+    async def fake_create_presigned_upload(key, content_type, size):
+        return {"url": "https://bucket.s3.amazonaws.com", "fields": {"key": key}}
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+    monkeypatch.setattr(controller, "create_presigned_upload", fake_create_presigned_upload)
+
+    response = asyncio.run(
+        create_document_upload(project_id=1, upload=upload, user=user, db=None)
+    )
+
+    assert response["url"] == "https://bucket.s3.amazonaws.com"
+    assert response["key"].startswith("projects/1/")
+    assert response["key"].endswith(".pdf")
+    assert response["fields"] == {"key": response["key"]}
+
+
+
+def test_create_document_upload_unsupported_backend(monkeypatch):
+    """Start direct upload: storage backend without direct uploads -> 501"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+    upload = DocumentUploadRequest(filename="mydoc.pdf", content_type="application/pdf", size=10)
+
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        return dummies.DummyUserProject(
+            is_owner=False,
+            project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
+        )
+
+    async def fake_create_presigned_upload(key, content_type, size):
+        raise UnsupportedOperationError("Direct uploads are not supported")
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+    monkeypatch.setattr(controller, "create_presigned_upload", fake_create_presigned_upload)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(create_document_upload(project_id=1, upload=upload, user=user, db=None))
+
+    assert excinfo.value.status_code == 501
+
+def test_create_document_upload_too_large(monkeypatch):
+    """Start direct upload: declared size over the limit -> 413"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+    monkeypatch.setattr(controller, "UPLOAD_MAX_SIZE", 5)
+    upload = DocumentUploadRequest(filename="mydoc.pdf", content_type="application/pdf", size=10)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(create_document_upload(project_id=1, upload=upload, user=user, db=None))
+
+    assert excinfo.value.status_code == 413
+
+
+def test_create_document_upload_not_found_project(monkeypatch):
+    """Start direct upload: project not found -> 404"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+    upload = DocumentUploadRequest(filename="mydoc.pdf", content_type="application/pdf", size=10)
+
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        return None
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(create_document_upload(project_id=1, upload=upload, user=user, db=None))
+
+    assert excinfo.value.status_code == 404
+
+
+def _completed_upload(monkeypatch, db_document=None):
+    async def fake_get_document_by_object_key(db, object_key: str):
+        return db_document
+
+    monkeypatch.setattr(
+        crud_documents, "get_document_by_object_key", fake_get_document_by_object_key
+    )
+
+
+def test_complete_document_upload_success(monkeypatch):
+    """Complete direct upload: object exists -> document created"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+    upload = DocumentUploadComplete(key="projects/1/abc.pdf", name="mydoc.pdf")
+
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        return dummies.DummyUserProject(
+            is_owner=False,
+            project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
+        )
+
+    async def fake_head_object(key):
+        return {"size": 10, "content_type": "application/pdf", "etag": "abc"}
+
+    async def fake_create_document(db, project_id: int, name: str, object_key: str, **metadata):
+        return dummies.DummyDocument(id=3, name=name, object_key=object_key)
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+    monkeypatch.setattr(controller, "head_object", fake_head_object)
+    _completed_upload(monkeypatch)
+    monkeypatch.setattr(crud_documents, "create_document", fake_create_document)
+
+    response = asyncio.run(
+        complete_document_upload(project_id=1, upload=upload, user=user, db=None)
+    )
+
+    assert response.id == 3
+    assert response.name == "mydoc.pdf"
+    assert response.object_key == "projects/1/abc.pdf"
+
+
+def test_complete_document_upload_replayed(monkeypatch):
+    """Complete direct upload twice: the first document is returned, no second one shares the file"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+    upload = DocumentUploadComplete(key="projects/1/abc.pdf", name="mydoc.pdf")
+    existing = dummies.DummyDocumentComplex(
+        id=3, name="mydoc.pdf", object_key="projects/1/abc.pdf", project_id=1
+    )
+
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        return dummies.DummyUserProject(
+            is_owner=False,
+            project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
+        )
+
+    async def fake_head_object(key):
+        return {"size": 10, "content_type": "application/pdf", "etag": "abc"}
+
+    async def fake_create_document(db, project_id: int, name: str, object_key: str, **metadata):
+        raise AssertionError("document created twice")
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+    monkeypatch.setattr(controller, "head_object", fake_head_object)
+    _completed_upload(monkeypatch, existing)
+    monkeypatch.setattr(crud_documents, "create_document", fake_create_document)
+
+    response = asyncio.run(
+        complete_document_upload(project_id=1, upload=upload, user=user, db=None)
+    )
+    assert response is existing
+
+    existing.project_id = 2
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            complete_document_upload(project_id=1, upload=upload, user=user, db=None)
+        )
+    assert excinfo.value.status_code == 409
+
+
+
+def test_complete_document_upload_concurrent_replay(monkeypatch):
+    """Complete direct upload racing a replay: the unique key violation returns the winner"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+    upload = DocumentUploadComplete(key="projects/1/abc.pdf", name="mydoc.pdf")
+    winner = dummies.DummyDocumentComplex(
+        id=3, name="mydoc.pdf", object_key="projects/1/abc.pdf", project_id=1
+    )
+    lookups = []
+
+    class Session(dummies.DummySession):
+        rollbacks = 0
+
+        async def rollback(self):
+            self.rollbacks += 1
+
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        return dummies.DummyUserProject(
+            is_owner=False,
+            project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
+        )
+
+    async def fake_head_object(key):
+        return {"size": 10, "content_type": "application/pdf", "etag": "abc"}
+
+    async def fake_get_document_by_object_key(db, object_key: str):
+        lookups.append(object_key)
+        return winner if len(lookups) > 1 else None
+
+    async def fake_create_document(db, project_id: int, name: str, object_key: str, **metadata):
+        raise IntegrityError("INSERT", {}, Exception("duplicate key"))
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+    monkeypatch.setattr(controller, "head_object", fake_head_object)
+    monkeypatch.setattr(
+        crud_documents, "get_document_by_object_key", fake_get_document_by_object_key
+    )
+    monkeypatch.setattr(crud_documents, "create_document", fake_create_document)
+    db = Session()
+
+    response = asyncio.run(
+        complete_document_upload(project_id=1, upload=upload, user=user, db=db)
+    )
+
+    assert response is winner
+    assert db.rollbacks == 1
+    assert lookups == ["projects/1/abc.pdf", "projects/1/abc.pdf"]
+
+def test_complete_document_upload_foreign_key():
+    """Complete direct upload: key from another project -> 400"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+    upload = DocumentUploadComplete(key="projects/2/abc.pdf", name="mydoc.pdf")
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(complete_document_upload(project_id=1, upload=upload, user=user, db=None))
+
+    assert excinfo.value.status_code == 400
+
+
+def test_complete_document_upload_missing_object(monkeypatch):
+    """Complete direct upload: object never uploaded -> 400"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+    upload = DocumentUploadComplete(key="projects/1/abc.pdf", name="mydoc.pdf")
+
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        return dummies.DummyUserProject(
+            is_owner=False,
+            project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
+        )
+
+    async def fake_head_object(key):
+        return None
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+    monkeypatch.setattr(controller, "head_object", fake_head_object)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(complete_document_upload(project_id=1, upload=upload, user=user, db=None))
+
+    assert excinfo.value.status_code == 400
+    assert excinfo.value.detail == "Upload not found"
+
+
+def test_create_project_documents_partial_failure(monkeypatch):
+    """Batch upload: one failed upload does not abort the others"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+    files = [
+        dummies.DummyUploadFile("a.txt", b"a"),
+        dummies.DummyUploadFile("broken.txt", b"b"),
+        dummies.DummyUploadFile("c.txt", b"c"),
+    ]
+    calls = {"membership": 0, "inserts": []}
+
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        calls["membership"] += 1
+        return dummies.DummyUserProject(
+            is_owner=False,
+            project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
+        )
+
+    async def fake_store_file(db, file, db_lock=None):
+        if file.filename == "broken.txt":
+            raise Exception("S3 error")
+        return dummies.dummy_stored_file(f"key-{file.filename}")
+
+    async def fake_create_documents(db, project_id: int, documents, reservation_id=None):
+        calls["inserts"].append(documents)
+        return [
+            dummies.DummyDocument(id=i, name=d["name"], object_key=d["object_key"])
+            for i, d in enumerate(documents, start=10)
+        ]
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+    monkeypatch.setattr(crud_blob, "store_file", fake_store_file)
+    monkeypatch.setattr(crud_documents, "create_documents", fake_create_documents)
+
+    results = asyncio.run(
+        create_project_documents(project_id=1, files=files, user=user, db=None)
+    )
+
+    assert calls["membership"] == 1
+    assert [
+        [(d["name"], d["object_key"], d["size"]) for d in insert]
+        for insert in calls["inserts"]
+    ] == [[("a.txt", "key-a.txt", 11), ("c.txt", "key-c.txt", 11)]]
+    assert [r["status"] for r in results] == ["created", "failed", "created"]
+    assert results[0]["document"].id == 10
+    assert results[2]["document"].object_key == "key-c.txt"
+    assert "S3 error" in results[1]["error"]
+
+
+def test_create_project_documents_too_many_files(monkeypatch):
+    """Batch upload: more files than allowed -> 400"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+    monkeypatch.setattr(controller, "UPLOAD_BATCH_MAX_FILES", 1)
+    files = [dummies.DummyUploadFile("a.txt", b"a"), dummies.DummyUploadFile("b.txt", b"b")]
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(create_project_documents(project_id=1, files=files, user=user, db=None))
+
+    assert excinfo.value.status_code == 400
+
+
+def test_create_project_documents_insert_failure(monkeypatch):
+    """Batch upload: DB error -> 500, shared content objects are kept"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+    files = [dummies.DummyUploadFile("a.txt", b"a")]
+    deleted = []
+
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        return dummies.DummyUserProject(
+            is_owner=False,
+            project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
+        )
+
+    async def fake_store_file(db, file, db_lock=None):
+        return dummies.dummy_stored_file(f"key-{file.filename}")
+
+    async def fake_create_documents(db, project_id: int, documents, reservation_id=None):
+        raise Exception("DB error")
+
+    async def fake_delete_file(object_key):
+        deleted.append(object_key)
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+    monkeypatch.setattr(crud_blob, "store_file", fake_store_file)
+    monkeypatch.setattr(controller, "delete_file", fake_delete_file)
+    monkeypatch.setattr(crud_documents, "create_documents", fake_create_documents)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(create_project_documents(project_id=1, files=files, user=user, db=None))
+
+    assert excinfo.value.status_code == 500
+    assert deleted == []
+
+
+def test_delete_project_documents_bulk(monkeypatch):
+    """Bulk delete: one membership check, unreferenced files queued, missing IDs reported"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+    session = dummies.DummySession()
+    membership_checks = []
+    released = []
+    queued = []
+
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        membership_checks.append(project_id)
+        return dummies.DummyUserProject(
+            is_owner=False,
+            project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
+        )
+
+    async def fake_delete_versions_of_documents(db, project_id, document_ids):
+        return ["blobs/old"]
+
+    async def fake_delete_project_documents(db, project_id, document_ids):
+        assert document_ids == [3, 1, 2]
+        return [(1, "blobs/a"), (3, "projects/1/c.txt")]
+
+    async def fake_release_blobs(db, object_keys):
+        released.extend(object_keys)
+        return ["projects/1/c.txt", "blobs/old"]
+
+    async def fake_enqueue_deletions(db, object_keys):
+        queued.extend(object_keys)
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+    monkeypatch.setattr(
+        crud_version, "delete_versions_of_documents", fake_delete_versions_of_documents
+    )
+    monkeypatch.setattr(
+        crud_documents, "delete_project_documents", fake_delete_project_documents
+    )
+    monkeypatch.setattr(crud_blob, "release_blobs", fake_release_blobs)
+    monkeypatch.setattr(crud_deletion, "enqueue_deletions", fake_enqueue_deletions)
+
+    result = asyncio.run(
+        delete_project_documents(
+            project_id=1,
+            request=DocumentBulkDelete(ids=[3, 1, 2, 3]),
+            user=user,
+            db=session,
+        )
+    )
+
+    assert result == {"deleted": [3, 1], "not_found": [2]}
+    assert membership_checks == [1]
+    assert released == ["blobs/a", "projects/1/c.txt", "blobs/old"]
+    assert queued == ["projects/1/c.txt", "blobs/old"]
+    assert session.commits == 1
+
+
+def test_delete_project_documents_not_member(monkeypatch):
+    """Bulk delete on a project the user does not belong to -> 404"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        return None
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            delete_project_documents(
+                project_id=1,
+                request=DocumentBulkDelete(ids=[1]),
+                user=user,
+                db=None,
+            )
+        )
+
+    assert excinfo.value.status_code == 404
+
+
+def test_get_project_documents_tag_filter(monkeypatch):
+    """Listing by tag: tags are normalized and deduplicated before the query"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+    seen = {}
+
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        return dummies.DummyUserProject(
+            is_owner=True,
+            project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
+        )
+
+    async def fake_get_documents_by_project(db, project_id: int, **filters):
+        seen.update(filters)
+        return [dummies.DummyDocument(id=1, name="doc1", object_key="doc1.txt")]
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+    monkeypatch.setattr(
+        crud_documents, "get_documents_by_project", fake_get_documents_by_project
+    )
+
+    asyncio.run(
+        get_project_documents(
+            project_id=1,
+            query=DocumentListQuery(tag=[" Invoices", "invoices", "2024 "]),
+            response=Response(),
+            user=user,
+            db=None,
+        )
+    )
+
+    assert seen["tags"] == ["invoices", "2024"]
+
+
+def test_add_project_document_tags(monkeypatch):
+    """Bulk tagging: one statement for all documents, changed IDs reported, committed"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+    session = dummies.DummySession()
+    calls = []
+
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        return dummies.DummyUserProject(
+            is_owner=False,
+            project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
+        )
+
+    async def fake_add_document_tags(db, project_id, document_ids, tags):
+        calls.append((project_id, document_ids, tags))
+        return [3]
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+    monkeypatch.setattr(crud_documents, "add_document_tags", fake_add_document_tags)
+
+    result = asyncio.run(
+        add_project_document_tags(
+            project_id=1,
+            request=DocumentTagsUpdate(ids=[3, 1, 3], tags=["Urgent", " urgent "]),
+            user=user,
+            db=session,
+        )
+    )
+
+    assert result == {"updated": [3]}
+    assert calls == [(1, [3, 1], ["urgent"])]
+    assert session.commits == 1
+
+
+def test_remove_project_document_tags_not_member(monkeypatch):
+    """Bulk untagging on a project the user does not belong to -> 404"""
+    user = dummies.DummyUser(id=1, name="alice", password="secret")
+
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        return None
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            remove_project_document_tags(
+                project_id=1,
+                request=DocumentTagsUpdate(ids=[1], tags=["urgent"]),
+                user=user,
+                db=None,
+            )
+        )
+
+    assert excinfo.value.status_code == 404
+
+
+def test_document_tags_update_rejects_blank_tag():
+    """Bulk tagging: a tag that is empty once trimmed is rejected"""
+    with pytest.raises(ValueError):
+        DocumentTagsUpdate(ids=[1], tags=["  "])
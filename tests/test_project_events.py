@@ -0,0 +1,187 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.controllers import event_controller
+from app.crud import project_event_crud as crud_events
+from app.crud import user_project_crud as crud_user_project
+from app.routers.event_route import stream_project_events
+from app.services.project_events import ProjectEventHub, format_event
+import tests.dummies as dummies
+
+
+def _member(monkeypatch, is_member: bool = True):
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        if not is_member:
+            return None
+        return dummies.DummyUserProject(
+            is_owner=False,
+            project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
+        )
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+
+
+def test_format_event():
+    """Events: serialized as an SSE message with id, type and JSON data"""
+    event = dummies.DummyEvent(7, 1, "document.created", {"id": 3, "name": "a.txt"})
+
+    assert format_event(event) == (
+        "id: 7\nevent: document.created\n"
+        'data: {"project_id": 1, "id": 3, "name": "a.txt"}\n\n'
+    )
+
+
+def test_hub_fans_out_by_project():
+    """Events hub: subscribers only get their project's events"""
+    hub = ProjectEventHub(queue_size=10)
+
+    async def scenario():
+        first = hub.subscribe(1)
+        second = hub.subscribe(1)
+        other = hub.subscribe(2)
+        hub.publish([dummies.DummyEvent(1, 1, "document.created", {"id": 3})])
+        return first, second, other
+
+    first, second, other = asyncio.run(scenario())
+
+    assert first.queue.get_nowait().id == 1
+    assert second.queue.get_nowait().id == 1
+    assert other.queue.empty()
+
+
+def test_hub_drops_lagging_subscriber():
+    """Events hub: a subscriber with a full queue is marked lagged and unsubscribed"""
+    hub = ProjectEventHub(queue_size=1)
+
+    async def scenario():
+        subscription = hub.subscribe(1)
+        hub.publish([
+            dummies.DummyEvent(1, 1, "document.created", {"id": 3}),
+            dummies.DummyEvent(2, 1, "document.created", {"id": 4}),
+            dummies.DummyEvent(3, 1, "document.created", {"id": 5}),
+        ])
+        return subscription
+
+    subscription = asyncio.run(scenario())
+
+    assert subscription.lagged
+    assert subscription.queue.qsize() == 1
+    assert hub._subscriptions == {}
+
+
+def test_hub_ignores_unwatched_notifications():
+    """Events hub: notifications for projects nobody follows are not fetched"""
+    hub = ProjectEventHub(queue_size=10)
+
+    async def scenario():
+        hub.subscribe(1)
+        hub._on_notification(None, 1, crud_events.EVENTS_CHANNEL, '{"id": 5, "project_id": 2}')
+        hub._on_notification(None, 1, crud_events.EVENTS_CHANNEL, '{"id": 6, "project_id": 1}')
+        hub._on_notification(None, 1, crud_events.EVENTS_CHANNEL, "not json")
+        return [hub._notifications.get_nowait() for _ in range(hub._notifications.qsize())]
+
+    assert asyncio.run(scenario()) == [6]
+
+
+def test_event_stream_replays_then_streams_live(monkeypatch):
+    """Event stream: missed events first, then live ones without duplicates"""
+    monkeypatch.setattr(event_controller, "EVENTS_KEEPALIVE_INTERVAL", 0.01)
+    hub = ProjectEventHub(queue_size=10)
+    monkeypatch.setattr(event_controller, "project_event_hub", hub)
+    replay = [dummies.DummyEvent(5, 1, "document.deleted", {"id": 3})]
+
+    async def scenario():
+        subscription = hub.subscribe(1)
+        # Recorded during the replay query: also delivered live
+        hub.publish([
+            dummies.DummyEvent(5, 1, "document.deleted", {"id": 3}),
+            dummies.DummyEvent(6, 1, "document.created", {"id": 4}),
+        ])
+        stream = event_controller.event_stream(subscription, replay, reset=False)
+        messages = [await stream.__anext__() for _ in range(3)]
+        await stream.aclose()
+        return messages
+
+    messages = asyncio.run(scenario())
+
+    assert [m.split("\n")[0] for m in messages] == ["id: 5", "id: 6", ": keepalive"]
+    assert hub._subscriptions == {}
+
+
+def test_event_stream_ends_when_lagged(monkeypatch):
+    """Event stream: after dropped events the stream drains and ends so the client resumes"""
+    hub = ProjectEventHub(queue_size=1)
+    monkeypatch.setattr(event_controller, "project_event_hub", hub)
+
+    async def scenario():
+        subscription = hub.subscribe(1)
+        hub.publish([
+            dummies.DummyEvent(1, 1, "document.created", {"id": 3}),
+            dummies.DummyEvent(2, 1, "document.created", {"id": 4}),
+        ])
+        return [m async for m in event_controller.event_stream(subscription, [], True)]
+
+    messages = asyncio.run(scenario())
+
+    assert messages[0] == event_controller.RESET_MESSAGE
+    assert messages[1].startswith("id: 1\n")
+    assert len(messages) == 2
+
+
+def test_stream_project_events_not_member(monkeypatch):
+    """Project events: project not associated with user -> 404"""
+    _member(monkeypatch, is_member=False)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            stream_project_events(
+                project_id=1,
+                last_event_id=None,
+                user=dummies.DummyUser(id=1, name="alice", password="secret"),
+                db=dummies.DummySession(),
+            )
+        )
+
+    assert excinfo.value.status_code == 404
+
+
+def test_stream_project_events_resume(monkeypatch):
+    """Project events: Last-Event-ID replays missed events; a pruned one asks for a reset"""
+    _member(monkeypatch)
+    hub = ProjectEventHub(queue_size=10)
+    monkeypatch.setattr(event_controller, "project_event_hub", hub)
+    calls = []
+
+    async def fake_get_oldest_event_id(db):
+        return 100
+
+    async def fake_get_project_events_after(db, project_id: int, after_id: int, limit: int):
+        calls.append((project_id, after_id))
+        return [dummies.DummyEvent(after_id + 1, project_id, "document.created", {"id": 3})]
+
+    monkeypatch.setattr(crud_events, "get_oldest_event_id", fake_get_oldest_event_id)
+    monkeypatch.setattr(
+        crud_events, "get_project_events_after", fake_get_project_events_after
+    )
+
+    async def first_message(last_event_id):
+        response = await stream_project_events(
+            project_id=1,
+            last_event_id=last_event_id,
+            user=dummies.DummyUser(id=1, name="alice", password="secret"),
+            db=dummies.DummySession(),
+        )
+        message = await response.body_iterator.__anext__()
+        await response.body_iterator.aclose()
+        return response, message
+
+    response, resumed = asyncio.run(first_message(150))
+    _, pruned = asyncio.run(first_message(10))
+
+    assert response.media_type == "text/event-stream"
+    assert resumed.startswith("id: 151\n")
+    assert pruned == event_controller.RESET_MESSAGE
+    assert calls == [(1, 150)]
+    assert hub._subscriptions == {}
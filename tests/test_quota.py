@@ -0,0 +1,157 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.crud import blob_crud as crud_blob
+from app.crud import project_usage_crud as crud_usage
+from app.crud import user_project_crud as crud_user_project
+from app.routers.project_route import create_project_document
+import tests.dummies as dummies
+
+
+class QuotaSession(dummies.DummySession):
+    def __init__(self):
+        super().__init__()
+        self.rollbacks = 0
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+def _usage(total_bytes: int, reserved_bytes: int):
+    async def fake_get_project_usage(db, project_id: int):
+        return {
+            "document_count": 3,
+            "total_bytes": total_bytes,
+            "reserved_documents": 1,
+            "reserved_bytes": reserved_bytes,
+        }
+
+    return fake_get_project_usage
+
+
+def _member(monkeypatch):
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        return dummies.DummyUserProject(
+            is_owner=True,
+            project=dummies.DummyProject(id=project_id, name="Project1", description="Desc1"),
+        )
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+
+
+def _locks(monkeypatch):
+    locked = []
+
+    async def fake_lock_project_usage(db, project_id: int):
+        locked.append(project_id)
+
+    monkeypatch.setattr(crud_usage, "lock_project_usage", fake_lock_project_usage)
+    return locked
+
+
+def test_quotas_disabled_skip_database():
+    """Quotas: with no limit configured, nothing touches the database"""
+    asyncio.run(crud_usage.check_quota(None, 1, 1, 10**12))
+
+    assert asyncio.run(crud_usage.reserve_usage(None, 1, 1, 10**12)) is None
+
+
+def test_check_quota_counts_reserved_usage(monkeypatch):
+    """Quotas: stored and reserved bytes both count against the limit"""
+    monkeypatch.setattr(crud_usage, "PROJECT_MAX_BYTES", 100)
+    monkeypatch.setattr(crud_usage, "get_project_usage", _usage(60, 30))
+    locked = _locks(monkeypatch)
+
+    asyncio.run(crud_usage.check_quota(None, 1, 1, 10))
+    with pytest.raises(crud_usage.QuotaExceededError):
+        asyncio.run(crud_usage.check_quota(None, 1, 1, 11))
+
+    assert locked == [1, 1]
+
+
+def test_check_quota_document_limit(monkeypatch):
+    """Quotas: reserved documents count against the document limit"""
+    monkeypatch.setattr(crud_usage, "PROJECT_MAX_DOCUMENTS", 5)
+    monkeypatch.setattr(crud_usage, "get_project_usage", _usage(0, 0))
+    _locks(monkeypatch)
+
+    asyncio.run(crud_usage.check_quota(None, 1, 1, 10))
+    with pytest.raises(crud_usage.QuotaExceededError):
+        asyncio.run(crud_usage.check_quota(None, 1, 2, 0))
+
+
+def test_reserve_usage_over_quota_rolls_back(monkeypatch):
+    """Quotas: a reservation over the limit releases the row lock and raises"""
+    monkeypatch.setattr(crud_usage, "PROJECT_MAX_DOCUMENTS", 4)
+    monkeypatch.setattr(crud_usage, "get_project_usage", _usage(0, 0))
+    _locks(monkeypatch)
+    db = QuotaSession()
+
+    with pytest.raises(crud_usage.QuotaExceededError):
+        asyncio.run(crud_usage.reserve_usage(db, 1, 1, 10))
+
+    assert db.rollbacks == 1
+    assert db.commits == 0
+
+
+def test_upload_over_quota_rejected_before_transfer(monkeypatch):
+    """Create document: a full project gets 507 and the file is never stored"""
+    _member(monkeypatch)
+    stored = []
+
+    async def fake_reserve_usage(db, project_id: int, documents: int, size: int):
+        assert (documents, size) == (1, 5)
+        raise crud_usage.QuotaExceededError("Project storage limit of 4 bytes reached")
+
+    async def fake_store_file(db, file, db_lock=None):
+        stored.append(file.filename)
+
+    monkeypatch.setattr(crud_usage, "reserve_usage", fake_reserve_usage)
+    monkeypatch.setattr(crud_blob, "store_file", fake_store_file)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            create_project_document(
+                project_id=1,
+                file=dummies.DummyUploadFile("a.txt", b"hello"),
+                user=dummies.DummyUser(id=1, name="alice", password="secret"),
+                db=None,
+            )
+        )
+
+    assert excinfo.value.status_code == 507
+    assert stored == []
+
+
+def test_failed_upload_releases_reservation(monkeypatch):
+    """Create document: a failed transfer gives its reservation back"""
+    _member(monkeypatch)
+    released = []
+
+    async def fake_reserve_usage(db, project_id: int, documents: int, size: int):
+        return 7
+
+    async def fake_release_reservation(db, reservation_id):
+        released.append(reservation_id)
+
+    async def fake_store_file(db, file, db_lock=None):
+        raise Exception("S3 error")
+
+    monkeypatch.setattr(crud_usage, "reserve_usage", fake_reserve_usage)
+    monkeypatch.setattr(crud_usage, "release_reservation", fake_release_reservation)
+    monkeypatch.setattr(crud_blob, "store_file", fake_store_file)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            create_project_document(
+                project_id=1,
+                file=dummies.DummyUploadFile("a.txt", b"hello"),
+                user=dummies.DummyUser(id=1, name="alice", password="secret"),
+                db=None,
+            )
+        )
+
+    assert excinfo.value.status_code == 500
+    assert released == [7]
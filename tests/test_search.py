@@ -0,0 +1,85 @@
+import asyncio
+import io
+import zipfile
+import zstandard
+from app.services import search_indexer
+from app.services import text_extraction
+import tests.dummies as dummies
+
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def _docx(*paragraphs: str) -> bytes:
+    body = "".join(
+        f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>" for text in paragraphs
+    )
+    document = (
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w") as archive:
+        archive.writestr("word/document.xml", document)
+    return output.getvalue()
+
+
+def test_extract_text_office_and_plain():
+    """Text extraction: Office paragraphs become lines, plain text is decoded"""
+    assert text_extraction.extract_text(_docx("Quarterly report", "Revenue grew"), DOCX) == (
+        "Quarterly report\nRevenue grew\n"
+    )
+    assert text_extraction.extract_text("héllo\x00".encode(), "text/plain") == "héllo"
+
+
+def test_initial_search_status():
+    """Search status: text, Office and PDF files are queued; images are not"""
+    assert text_extraction.initial_search_status("text/csv") == "pending"
+    assert text_extraction.initial_search_status(DOCX) == "pending"
+    assert text_extraction.initial_search_status("image/png") == "unsupported"
+    assert text_extraction.initial_search_status(None) == "unsupported"
+
+
+def test_index_documents_records_outcomes(monkeypatch):
+    """Search indexer: extracts text (decompressing stored files) and records each outcome"""
+    session = dummies.DummySession()
+    indexed = {}
+    documents = [
+        dummies.DummyDocument(id=1, name="a.txt", object_key="blobs/a"),
+        dummies.DummyDocument(id=2, name="b.png", object_key="blobs/b"),
+        dummies.DummyDocument(id=3, name="c.docx", object_key="blobs/c"),
+    ]
+    for document, content_type in zip(documents, ["text/plain", "image/png", DOCX]):
+        document.content_type = content_type
+        document.content_encoding = None
+    documents[0].content_encoding = "zstd"
+
+    async def fake_claim_pending_search(db, limit):
+        return documents
+
+    async def fake_read_file(key, max_size):
+        if key == "blobs/a":
+            return zstandard.ZstdCompressor().compress(b"searchable words")
+        return b"not a zip"
+
+    async def fake_set_search_text(db, document_id, search_status, content_text):
+        indexed[document_id] = (search_status, content_text)
+
+    monkeypatch.setattr(search_indexer, "AsyncSessionLocal", lambda: session)
+    monkeypatch.setattr(
+        search_indexer.crud_documents, "claim_pending_search", fake_claim_pending_search
+    )
+    monkeypatch.setattr(
+        search_indexer.crud_documents, "set_search_text", fake_set_search_text
+    )
+    monkeypatch.setattr(search_indexer, "read_file", fake_read_file)
+    monkeypatch.setattr(search_indexer, "extraction_executor", None)
+
+    processed = asyncio.run(search_indexer.index_documents())
+
+    assert processed == 3
+    assert indexed == {
+        1: ("ready", "searchable words"),
+        2: ("unsupported", None),
+        3: ("failed", None),
+    }
+    assert session.commits == 1
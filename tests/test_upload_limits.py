@@ -0,0 +1,152 @@
+import asyncio
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from app.middleware import UploadLimitMiddleware, upload_client_key
+from app.services.metrics import metrics
+from app.services.upload_admission import UploadAdmission
+from app.services.upload_budget import ByteBudget
+
+
+def _client(max_size: int = 1000, budget: int = 10_000, wait: float = 0):
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    middleware = UploadLimitMiddleware(app, max_size=max_size, budget=budget, wait=wait)
+    return TestClient(middleware), middleware
+
+
+def test_upload_within_limits_passes_through():
+    """Upload limits: small multipart uploads reach the endpoint"""
+    client, _ = _client()
+
+    response = client.post("/upload", files={"file": ("a.txt", b"hello")})
+
+    assert response.status_code == 200
+    assert response.json() == {"size": 5}
+
+
+def test_upload_over_max_size_rejected_from_content_length():
+    """Upload limits: a declared size above the cap is rejected with 413"""
+    client, _ = _client(max_size=100)
+
+    response = client.post("/upload", files={"file": ("a.txt", b"x" * 500)})
+
+    assert response.status_code == 413
+
+
+def test_upload_budget_exhausted_returns_503():
+    """Upload limits: with the in-flight budget used up, uploads get 503 and Retry-After"""
+    client, middleware = _client(budget=10_000)
+    middleware.budget.in_use = middleware.budget.capacity
+
+    response = client.post("/upload", files={"file": ("a.txt", b"hello")})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_byte_budget_waits_in_order_and_times_out():
+    """Byte budget: waiters are served in order once bytes are released"""
+
+    async def scenario():
+        budget = ByteBudget(100)
+        assert await budget.acquire(80, 0)
+        assert not await budget.acquire(50, 0)
+        waiting = asyncio.create_task(budget.acquire(50, 1))
+        await asyncio.sleep(0.01)
+        budget.release(80)
+        granted = await waiting
+        timed_out = await budget.acquire(60, 0.05)
+        return granted, timed_out, budget.in_use
+
+    granted, timed_out, in_use = asyncio.run(scenario())
+
+    assert granted is True
+    assert timed_out is False
+    assert in_use == 50
+
+
+def test_admission_round_robin_between_users():
+    """Upload admission: freed slots alternate between waiting users"""
+
+    async def scenario():
+        admission = UploadAdmission(limit=1, per_user_limit=1, max_queue=10)
+        assert await admission.acquire("user:a", 0)
+        order = []
+
+        async def upload(user_key):
+            assert await admission.acquire(user_key, 1)
+            order.append(user_key)
+            await asyncio.sleep(0)
+            admission.release(user_key)
+
+        tasks = [asyncio.create_task(upload(key)) for key in ("user:a", "user:a", "user:b")]
+        await asyncio.sleep(0.01)
+        depth = metrics["upload_queue_depth"]
+        admission.release("user:a")
+        await asyncio.gather(*tasks)
+        return order, depth, admission.active
+
+    order, depth, active = asyncio.run(scenario())
+
+    assert order == ["user:a", "user:b", "user:a"]
+    assert depth == 3
+    assert active == 0
+
+
+def test_admission_bounded_queue_and_timeout():
+    """Upload admission: a full queue refuses at once, a long wait times out"""
+
+    async def scenario():
+        admission = UploadAdmission(limit=1, per_user_limit=1, max_queue=1)
+        assert await admission.acquire("user:a", 0)
+        waiting = asyncio.create_task(admission.acquire("user:b", 0.05))
+        await asyncio.sleep(0.01)
+        queue_full = await admission.acquire("user:c", 1)
+        timed_out = await waiting
+        return queue_full, timed_out, admission.queued
+
+    queue_full, timed_out, queued = asyncio.run(scenario())
+
+    assert queue_full is False
+    assert timed_out is False
+    assert queued == 0
+    assert metrics["upload_queue_wait_seconds_total"] > 0
+
+
+def test_upload_admission_full_returns_503():
+    """Upload limits: with every upload slot taken, uploads get 503 and Retry-After"""
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    admission = UploadAdmission(limit=1, per_user_limit=1, max_queue=0)
+    admission.active = 1
+    client = TestClient(
+        UploadLimitMiddleware(app, max_size=1000, budget=10_000, wait=0, admission=admission)
+    )
+
+    response = client.post("/upload", files={"file": ("a.txt", b"hello")})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_upload_client_key_uses_token_or_address(monkeypatch):
+    """Upload admission: uploads are charged to the token's user, else to the client address"""
+    import jwt
+    from starlette.datastructures import Headers
+    import app.middleware as middleware
+
+    monkeypatch.setattr(middleware, "SECRET_KEY", "secret")
+    token = jwt.encode({"user_id": 7, "username": "alice"}, "secret", algorithm="HS256")
+    scope = {"client": ("10.0.0.1", 1234)}
+
+    assert upload_client_key(scope, Headers({"authorization": f"Bearer {token}"})) == "user:7"
+    assert upload_client_key(scope, Headers({"cookie": f"session_token={token}"})) == "user:7"
+    assert upload_client_key(scope, Headers({"authorization": "Bearer forged"})) == "ip:10.0.0.1"
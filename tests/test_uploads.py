@@ -0,0 +1,293 @@
+import asyncio
+import pytest
+from fastapi import HTTPException, Response
+from app.routers.upload_route import (
+    create_upload_session,
+    delete_upload_session,
+    upload_chunk,
+)
+from app.schemas.document_schema import ResumableUploadCreate
+from app.controllers import upload_controller as controller
+from app.crud import upload_session_crud as crud_upload
+from app.crud import user_project_crud as crud_user_project
+from app.crud import document_crud as crud_documents
+from app.services import upload_session_sweeper
+import tests.dummies as dummies
+
+USER = dummies.DummyUser(id=1, name="alice", password="secret")
+
+
+def _patch_member(monkeypatch):
+    async def fake_is_project_from_user(db, user_id: int, project_id: int):
+        return dummies.DummyUserProject(
+            is_owner=True,
+            project=dummies.DummyProject(id=project_id, name="Project1", description="Desc"),
+        )
+
+    monkeypatch.setattr(
+        crud_user_project, "is_project_from_user", fake_is_project_from_user
+    )
+
+
+def _patch_session(monkeypatch, session, parts_uploaded, advanced=True):
+    async def fake_get_upload_session(db, upload_id):
+        return session if upload_id == session.id else None
+
+    async def fake_upload_part(key, upload_id, part_number, fileobj, size):
+        parts_uploaded.append((part_number, fileobj.read()))
+        return f'"etag{part_number}"'
+
+    async def fake_advance_upload_session(db, upload_id, offset, length, part, content_type):
+        return advanced
+
+    monkeypatch.setattr(crud_upload, "get_upload_session", fake_get_upload_session)
+    monkeypatch.setattr(crud_upload, "advance_upload_session", fake_advance_upload_session)
+    monkeypatch.setattr(controller, "upload_part", fake_upload_part)
+    monkeypatch.setattr(controller, "UPLOAD_CHUNK_MIN_SIZE", 4)
+
+
+def test_create_upload_session_success(monkeypatch):
+    """Resumable upload: starts a multipart upload and returns the session location"""
+    _patch_member(monkeypatch)
+
+    async def fake_create_multipart_upload(key, content_type):
+        assert content_type == "text/plain"
+        return "mpu-1"
+
+    async def fake_create_upload_session(db, upload_id, project_id, user_id, filename, key, s3_upload_id, size):
+        return dummies.DummyUploadSession(id=upload_id, size=size)
+
+    monkeypatch.setattr(
+        controller, "create_multipart_upload", fake_create_multipart_upload
+    )
+    monkeypatch.setattr(crud_upload, "create_upload_session", fake_create_upload_session)
+    response = Response()
+
+    result = asyncio.run(
+        create_upload_session(
+            project_id=1,
+            upload=ResumableUploadCreate(filename="big.txt", size=100),
+            response=response,
+            user=USER,
+            db=None,
+        )
+    )
+
+    assert result["upload_offset"] == 0
+    assert response.headers["location"] == f"/project/1/documents/resumable/{result['id']}"
+
+
+def test_create_upload_session_too_large(monkeypatch):
+    """Resumable upload: a declared size above the limit -> 413"""
+    monkeypatch.setattr(controller, "UPLOAD_MAX_SIZE", 10)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            create_upload_session(
+                project_id=1,
+                upload=ResumableUploadCreate(filename="big.txt", size=11),
+                response=Response(),
+                user=USER,
+                db=None,
+            )
+        )
+
+    assert excinfo.value.status_code == 413
+
+
+def test_upload_chunk_offset_mismatch(monkeypatch):
+    """Resumable upload: a chunk at the wrong offset -> 409 without touching S3"""
+    _patch_member(monkeypatch)
+    uploaded = []
+    _patch_session(monkeypatch, dummies.DummyUploadSession(id="u1", size=10, upload_offset=4), uploaded)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            upload_chunk(
+                project_id=1,
+                upload_id="u1",
+                request=dummies.DummyChunkRequest(b"abcd"),
+                upload_offset=0,
+                user=USER,
+                db=None,
+            )
+        )
+
+    assert excinfo.value.status_code == 409
+    assert uploaded == []
+
+
+def test_upload_chunk_too_small(monkeypatch):
+    """Resumable upload: a non-final chunk below the minimum part size -> 400"""
+    _patch_member(monkeypatch)
+    _patch_session(monkeypatch, dummies.DummyUploadSession(id="u1", size=10), [])
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            upload_chunk(
+                project_id=1,
+                upload_id="u1",
+                request=dummies.DummyChunkRequest(b"ab"),
+                upload_offset=0,
+                user=USER,
+                db=None,
+            )
+        )
+
+    assert excinfo.value.status_code == 400
+
+
+def test_upload_chunk_advances_offset(monkeypatch):
+    """Resumable upload: a middle chunk becomes the next S3 part -> 204 with the new offset"""
+    _patch_member(monkeypatch)
+    uploaded = []
+    _patch_session(monkeypatch, dummies.DummyUploadSession(id="u1", size=10), uploaded)
+
+    response = asyncio.run(
+        upload_chunk(
+            project_id=1,
+            upload_id="u1",
+            request=dummies.DummyChunkRequest(b"hello"),
+            upload_offset=0,
+            user=USER,
+            db=None,
+        )
+    )
+
+    assert response.status_code == 204
+    assert response.headers["upload-offset"] == "5"
+    assert uploaded == [(1, b"hello")]
+
+
+def test_upload_chunk_last_chunk_creates_document(monkeypatch):
+    """Resumable upload: the last chunk completes the upload and creates the document"""
+    _patch_member(monkeypatch)
+    uploaded = []
+    completed = []
+    session = dummies.DummyUploadSession(
+        id="u1", size=10, upload_offset=5, parts=[{"PartNumber": 1, "ETag": '"etag1"'}]
+    )
+    session.content_type = "text/plain"
+    _patch_session(monkeypatch, session, uploaded)
+
+    async def fake_complete_multipart_upload(key, upload_id, parts):
+        completed.append(parts)
+        return key
+
+    async def fake_delete_upload_session(db, upload_id):
+        return True
+
+    async def fake_create_document(db, project_id, name, object_key, **metadata):
+        return dummies.DummyDocumentComplex(
+            id=7, name=name, object_key=object_key, project_id=project_id
+        )
+
+    monkeypatch.setattr(
+        controller, "complete_multipart_upload", fake_complete_multipart_upload
+    )
+    monkeypatch.setattr(crud_upload, "delete_upload_session", fake_delete_upload_session)
+    monkeypatch.setattr(crud_documents, "create_document", fake_create_document)
+
+    document = asyncio.run(
+        upload_chunk(
+            project_id=1,
+            upload_id="u1",
+            request=dummies.DummyChunkRequest(b"world"),
+            upload_offset=5,
+            user=USER,
+            db=None,
+        )
+    )
+
+    assert document.id == 7
+    assert completed == [
+        [{"PartNumber": 1, "ETag": '"etag1"'}, {"PartNumber": 2, "ETag": '"etag2"'}]
+    ]
+
+
+def test_upload_chunk_other_user_not_found(monkeypatch):
+    """Resumable upload: another user's session -> 404"""
+    _patch_member(monkeypatch)
+    session = dummies.DummyUploadSession(id="u1", size=10)
+    session.user_id = 2
+    _patch_session(monkeypatch, session, [])
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(
+            upload_chunk(
+                project_id=1,
+                upload_id="u1",
+                request=dummies.DummyChunkRequest(b"hello"),
+                upload_offset=0,
+                user=USER,
+                db=None,
+            )
+        )
+
+    assert excinfo.value.status_code == 404
+
+
+def test_delete_upload_session_aborts(monkeypatch):
+    """Resumable upload: cancelling aborts the multipart upload and removes the session"""
+    _patch_member(monkeypatch)
+    _patch_session(monkeypatch, dummies.DummyUploadSession(id="u1", size=10), [])
+    aborted = []
+    session = dummies.DummySession()
+
+    async def fake_abort_multipart_upload(key, upload_id):
+        aborted.append(upload_id)
+        return True
+
+    async def fake_delete_upload_session(db, upload_id):
+        return True
+
+    monkeypatch.setattr(
+        controller, "abort_multipart_upload", fake_abort_multipart_upload
+    )
+    monkeypatch.setattr(crud_upload, "delete_upload_session", fake_delete_upload_session)
+
+    asyncio.run(delete_upload_session(project_id=1, upload_id="u1", user=USER, db=session))
+
+    assert aborted == ["mpu-1"]
+    assert session.commits == 1
+
+
+def test_sweep_expired_upload_sessions_keeps_failed_aborts(monkeypatch):
+    """Upload sweeper: expired sessions are aborted and removed; failed aborts are retried later"""
+    session = dummies.DummySession()
+    removed = []
+    sessions = [
+        dummies.DummyUploadSession(id="u1", size=10),
+        dummies.DummyUploadSession(id="u2", size=10),
+    ]
+    sessions[1].s3_upload_id = "mpu-broken"
+
+    async def fake_claim_expired_upload_sessions(db, limit):
+        return sessions
+
+    async def fake_abort_multipart_upload(key, upload_id):
+        if upload_id == "mpu-broken":
+            raise Exception("S3 unavailable")
+        return True
+
+    async def fake_delete_upload_sessions(db, upload_ids):
+        removed.extend(upload_ids)
+
+    monkeypatch.setattr(upload_session_sweeper, "AsyncSessionLocal", lambda: session)
+    monkeypatch.setattr(
+        upload_session_sweeper.crud_upload,
+        "claim_expired_upload_sessions",
+        fake_claim_expired_upload_sessions,
+    )
+    monkeypatch.setattr(
+        upload_session_sweeper.crud_upload, "delete_upload_sessions", fake_delete_upload_sessions
+    )
+    monkeypatch.setattr(
+        upload_session_sweeper, "abort_multipart_upload", fake_abort_multipart_upload
+    )
+
+    processed = asyncio.run(upload_session_sweeper.sweep_expired_upload_sessions())
+
+    assert processed == 2
+    assert removed == ["u1"]
+    assert session.commits == 1
@@ -0,0 +1,37 @@
+import asyncio
+from app.services import version_pruner
+from app.services import metrics
+import tests.dummies as dummies
+
+
+def test_prune_document_versions_queues_unreferenced_files(monkeypatch):
+    """Version pruner: expired versions released, only unreferenced files queued"""
+    session = dummies.DummySession()
+    queued = []
+
+    async def fake_prune_document_versions(db, keep, max_age_days, limit):
+        return ["blobs/a", "blobs/b", "projects/1/c.txt"]
+
+    async def fake_release_blobs(db, object_keys):
+        return [object_key for object_key in object_keys if object_key != "blobs/b"]
+
+    async def fake_enqueue_deletions(db, object_keys):
+        queued.extend(object_keys)
+
+    monkeypatch.setattr(version_pruner, "AsyncSessionLocal", lambda: session)
+    monkeypatch.setattr(
+        version_pruner.crud_version, "prune_document_versions", fake_prune_document_versions
+    )
+    monkeypatch.setattr(version_pruner.crud_blob, "release_blobs", fake_release_blobs)
+    monkeypatch.setattr(
+        version_pruner.crud_deletion, "enqueue_deletions", fake_enqueue_deletions
+    )
+    monkeypatch.setattr(metrics, "metrics", {})
+    monkeypatch.setattr(version_pruner, "increment", metrics.increment)
+
+    pruned = asyncio.run(version_pruner.prune_document_versions())
+
+    assert pruned == 3
+    assert queued == ["blobs/a", "projects/1/c.txt"]
+    assert session.commits == 1
+    assert metrics.metrics["document_versions_pruned_total"] == 3